@@ -1,7 +1,8 @@
 from app import create_app
 from app.extensions import db
 
-app = create_app()
+# The web server is the one entry point that runs the background workers
+app = create_app(background_tasks=True)
 
 with app.app_context():
     db.create_all()
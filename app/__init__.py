@@ -3,7 +3,13 @@ from .extensions import db
 import os
 from datetime import timedelta
 
-def create_app():
+def create_app(background_tasks=False):
+    """Build the app. Only the web server passes `background_tasks=True`.
+
+    That starts the in-process outbox relay, statistics refresher and
+    slow-query flusher (each still subject to its own config switch), so
+    CLI scripts and tests never run them by accident.
+    """
     app = Flask(__name__)
     
     # Load config from root config.py
@@ -32,5 +38,60 @@ def create_app():
     # Create tables if they don't exist
     with app.app_context():
         db.create_all()
+        
+        # Columns and indexes added to models after their tables were created
+        from .repositories.schema import ensure_columns, ensure_indexes, backfill_sort_keys
+        ensure_columns()
+        ensure_indexes()
+        backfill_sort_keys()
+        
+        # Full-text search index for the book catalog
+        from .repositories.search_index import search_index
+        search_index.install()
+    
+    # Per-request SQL query counts, timing and N+1 detection
+    from .services.query_monitor import query_monitor
+    query_monitor.init_app(app)
+    
+    # Prometheus-format /metrics: route latency, orders, stock-outs, sync and queue health
+    from .services.metrics import metrics
+    metrics.init_app(app)
+    
+    # Admin-triggered sampling and per-request cProfile (idle unless asked)
+    from .services.profiler import profiler
+    profiler.init_app(app)
+    
+    # Statements over SLOW_QUERY_THRESHOLD_MS, stored with their query plans
+    from .services.slow_query_log import slow_query_log
+    slow_query_log.init_app(app)
+    
+    if not background_tasks:
+        return app
+    
+    # Background relay that mirrors outbox events to DynamoDB
+    if app.config.get('OUTBOX_RELAY_ENABLED'):
+        from .services.outbox_relay import OutboxRelay
+        relay = OutboxRelay(
+            app,
+            batch_size=app.config.get('OUTBOX_BATCH_SIZE', 100),
+            poll_interval=app.config.get('OUTBOX_POLL_INTERVAL', 1.0),
+            alert_after=app.config.get('OUTBOX_ALERT_AFTER', 10)
+        )
+        relay.start()
+        app.extensions['outbox_relay'] = relay
+    
+    # Periodic full recompute of the admin dashboard statistics
+    if app.config.get('STATS_REFRESH_INTERVAL'):
+        from .services.statistics import StatisticsRefresher
+        refresher = StatisticsRefresher(app, app.config['STATS_REFRESH_INTERVAL'])
+        refresher.start()
+        app.extensions['statistics_refresher'] = refresher
+    
+    # Writes buffered slow queries (and their EXPLAIN output) to the database
+    if app.config.get('SLOW_QUERY_LOG_ENABLED') and app.config.get('SLOW_QUERY_FLUSH_INTERVAL'):
+        from .services.slow_query_log import SlowQueryFlusher
+        flusher = SlowQueryFlusher(app, app.config['SLOW_QUERY_FLUSH_INTERVAL'])
+        flusher.start()
+        app.extensions['slow_query_flusher'] = flusher
     
     return app
\ No newline at end of file
@@ -10,7 +10,21 @@ class Book(db.Model):
     stock = db.Column(db.Integer, default=0)
     seller_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # Books can be owned by sellers
     image_url = db.Column(db.String(500))
+    isbn = db.Column(db.String(13))
+    # Dedupe key for catalog imports: ISBN when known, else normalized title+author
+    natural_key = db.Column(db.String(64))
     
     # Relationships
     seller = db.relationship('User', backref=db.backref('books', lazy=True))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # keyset sort key
+
+    __table_args__ = (
+        # Supports keyset pagination of the catalog (newest first)
+        db.Index('ix_book_created_at_id', 'created_at', 'id'),
+        # Low-stock list on the admin dashboard
+        db.Index('ix_book_stock', 'stock'),
+        # Seller inventory and sales analytics
+        db.Index('ix_book_seller_id_created_at', 'seller_id', 'created_at', 'id'),
+        # Conflict target for upsert imports; books added by hand have no key
+        db.Index('ux_book_natural_key', 'natural_key', unique=True),
+    )
\ No newline at end of file
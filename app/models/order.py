@@ -8,9 +8,16 @@ class Order(db.Model):
     quantity = db.Column(db.Integer, default=1)
     total_price = db.Column(db.Float, nullable=False)
     status = db.Column(db.String(30), default='Placed')
-    order_date = db.Column(db.DateTime, default=datetime.utcnow)
+    order_date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # keyset sort key
     
     # Relationships
     user = db.relationship('User', backref=db.backref('orders', lazy=True))
     book = db.relationship('Book', backref=db.backref('orders', lazy=True))
-    
\ No newline at end of file
+
+    __table_args__ = (
+        # Newest-first listings (admin dashboard and keyset-paginated order list)
+        db.Index('ix_order_order_date_id', 'order_date', 'id'),
+        db.Index('ix_order_status_order_date_id', 'status', 'order_date', 'id'),
+        # Joins from a seller's books to their orders
+        db.Index('ix_order_book_id_order_date', 'book_id', 'order_date'),
+    )
@@ -0,0 +1,16 @@
+from app.extensions import db
+from datetime import datetime
+
+class OutboxEvent(db.Model):
+    """A pending DynamoDB write, committed in the same transaction as the SQL change."""
+    __tablename__ = 'outbox_event'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    target = db.Column(db.String(100), nullable=False)  # DynamoDB table name
+    payload = db.Column(db.Text, nullable=False)  # JSON-encoded item
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text)
+    available_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # Set when DynamoDB keeps rejecting the item; the relay skips it until re-driven
+    dead_lettered_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,27 @@
+from app.extensions import db
+from datetime import datetime
+
+class SlowQuery(db.Model):
+    """Aggregated executions of one slow statement shape, with its query plan."""
+    __tablename__ = 'slow_query'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint_hash = db.Column(db.String(40), unique=True, nullable=False)  # sha1 of fingerprint
+    fingerprint = db.Column(db.Text, nullable=False)  # statement with literals normalized
+    dialect = db.Column(db.String(20), nullable=False)
+    plan = db.Column(db.Text)  # EXPLAIN / EXPLAIN QUERY PLAN output
+    endpoint = db.Column(db.String(200))  # where it was last seen
+    count = db.Column(db.Integer, default=0, nullable=False)
+    total_seconds = db.Column(db.Float, default=0, nullable=False)
+    max_seconds = db.Column(db.Float, default=0, nullable=False)
+    first_seen = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_seen = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        # Admin page: worst offenders first
+        db.Index('ix_slow_query_total_seconds', 'total_seconds'),
+    )
+    
+    @property
+    def average_seconds(self):
+        return self.total_seconds / self.count if self.count else 0.0
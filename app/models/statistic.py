@@ -0,0 +1,11 @@
+from app.extensions import db
+from datetime import datetime
+
+class StoreStatistic(db.Model):
+    """One pre-computed aggregate shown on the admin dashboard."""
+    __tablename__ = 'store_statistic'
+    
+    name = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Float, default=0, nullable=False)
+    payload = db.Column(db.Text)  # JSON for list-valued statistics (e.g. top books)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,17 +1,65 @@
+import time
+import threading
+from flask import current_app
+from sqlalchemy import event, update
+from sqlalchemy.orm import joinedload
 from app.extensions import db
 from app.models.book import Book
-from app_aws import DynamoBookRepository
+from app.repositories.keyset import keyset_paginate
+from app.repositories.outbox_repo import OutboxRepository
+from app.repositories.search_index import search_index
+from app.repositories.statistics_repo import StatisticsRepository
+from app.services.metrics import STOCK_OUTS
+from app_aws import DYNAMODB_BOOKS_TABLE
+
+# Books sold out in the session's open transaction, counted once it commits
+PENDING_SOLD_OUT = 'sold_out_books'
+
+# Process-wide cached catalog size: {'value': int, 'expires': monotonic time}
+_count_cache = {'value': None, 'expires': 0.0}
+_count_lock = threading.Lock()
 
 class BookRepository:
     def get_all_paginated(self, page, per_page):
         """Get paginated books from database."""
-        return Book.query.order_by(Book.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        return Book.query.options(joinedload(Book.seller)).order_by(Book.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
     
+    def get_all_keyset(self, per_page, cursor=None, direction="next", with_total=True):
+        """Get a page of books newest-first using an opaque cursor instead of OFFSET."""
+        # Listings show "Sold by", so load sellers with the page instead of per book
+        return keyset_paginate(
+            Book.query.options(joinedload(Book.seller)),
+            [Book.created_at, Book.id],
+            key=lambda book: (book.created_at, book.id),
+            per_page=per_page,
+            cursor=cursor,
+            direction=direction,
+            total=self.estimated_count() if with_total else None
+        )
+
+    def estimated_count(self):
+        """Total number of books, recomputed at most every CATALOG_COUNT_TTL seconds."""
+        now = time.monotonic()
+        if _count_cache['value'] is not None and now < _count_cache['expires']:
+            return _count_cache['value']
+        with _count_lock:
+            if _count_cache['value'] is None or now >= _count_cache['expires']:
+                ttl = current_app.config.get('CATALOG_COUNT_TTL', 60)
+                _count_cache['value'] = Book.query.count()
+                _count_cache['expires'] = now + ttl
+            return _count_cache['value']
+
     def search_paginated(self, query, page, per_page):
-        """Search books with pagination."""
+        """Search books with pagination, ranked by full-text relevance."""
         if not query:
             return self.get_all_paginated(page, per_page)
-        return Book.query.filter(
+
+        statement = search_index.search_statement(query)
+        if statement is not None:
+            return db.paginate(statement.options(joinedload(Book.seller)), page=page, per_page=per_page, error_out=False)
+
+        # Fallback for databases without a full-text index
+        return Book.query.options(joinedload(Book.seller)).filter(
             (Book.title.ilike(f"%{query}%")) | 
             (Book.author.ilike(f"%{query}%"))
         ).order_by(Book.id.desc()).paginate(page=page, per_page=per_page, error_out=False)
@@ -19,31 +67,74 @@ class BookRepository:
     def get_by_id(self, book_id):
         """Get a book by ID."""
         return Book.query.get(book_id)
+
+    def get_many(self, book_ids):
+        """Get several books by ID in a single IN query."""
+        book_ids = list(set(book_ids))
+        if not book_ids:
+            return []
+        return Book.query.filter(Book.id.in_(book_ids)).all()
     
     def add(self, book):
-        """Add a new book to database and DynamoDB."""
+        """Add a new book to database and queue its DynamoDB mirror write."""
         db.session.add(book)
-        db.session.commit()
+        db.session.flush()
         
-        # Sync to DynamoDB
-        try:
-            dynamo = DynamoBookRepository()
-            dynamo.add({
-                'id': str(book.id),
-                'title': book.title,
-                'author': book.author,
-                'price': book.price,
-                'stock': book.stock,
-                'seller_id': str(book.seller_id) if book.seller_id else "system",
-                'image_url': book.image_url or ""
-            })
-        except Exception as e:
-            print(f"DynamoDB Sync Error: {e}")
-            
+        # Written in the same transaction; the outbox relay syncs DynamoDB
+        OutboxRepository().enqueue(DYNAMODB_BOOKS_TABLE, {
+            'id': str(book.id),
+            'type': 'book',
+            'title': book.title,
+            'author': book.author,
+            'price': book.price,
+            'stock': book.stock,
+            'seller_id': str(book.seller_id) if book.seller_id else "system",
+            'image_url': book.image_url or ""
+        })
+        db.session.commit()
         return book
     
     def update(self, book):
         """Update an existing book."""
         db.session.commit()
         return book
-    
\ No newline at end of file
+
+    def decrement_stock(self, book_id, quantity):
+        """Atomically take `quantity` units of a book within the current transaction.
+        
+        Uses a conditional UPDATE so concurrent buyers cannot oversell.
+        Returns False (and changes nothing) if there is not enough stock.
+        The caller is responsible for committing.
+        """
+        statement = (
+            update(Book)
+            .where(Book.id == book_id, Book.stock >= quantity)
+            .values(stock=Book.stock - quantity)
+        )
+        if db.engine.dialect.update_returning:
+            remaining = db.session.execute(statement.returning(Book.stock)).scalar()
+            if remaining is None:
+                return False
+        else:
+            if db.session.execute(statement).rowcount != 1:
+                return False
+            remaining = db.session.query(Book.stock).filter(Book.id == book_id).scalar()
+        
+        # Bulk UPDATEs bypass the ORM flush hooks, so adjust the stock counters here
+        StatisticsRepository().stock_changed(remaining + quantity, remaining)
+        if remaining == 0:
+            db.session.info[PENDING_SOLD_OUT] = db.session.info.get(PENDING_SOLD_OUT, 0) + 1
+        return True
+    
+
+
+@event.listens_for(db.session, 'after_commit')
+def _count_sold_out(session):
+    sold_out = session.info.pop(PENDING_SOLD_OUT, 0)
+    if sold_out:
+        STOCK_OUTS.labels('sold_out').inc(sold_out)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_sold_out(session):
+    session.info.pop(PENDING_SOLD_OUT, None)
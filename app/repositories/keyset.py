@@ -0,0 +1,125 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(values):
+    """Serialize a tuple of sort-key values into an opaque URL-safe token."""
+    payload = []
+    for value in values:
+        if isinstance(value, datetime):
+            payload.append({"dt": value.isoformat()})
+        else:
+            payload.append(value)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _matches(value, expected):
+    if value is None or isinstance(value, bool):
+        return False
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+
+def decode_cursor(token, types=None):
+    """Inverse of encode_cursor. Returns None for a missing or malformed token.
+
+    With ``types``, the token must hold exactly one value of each type, in
+    order; anything else (a tampered or stale cursor) is treated as malformed.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list):
+            return None
+        values = []
+        for value in payload:
+            if isinstance(value, dict):
+                value = datetime.fromisoformat(value["dt"])
+            values.append(value)
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+    if types is not None and (
+        len(values) != len(types) or not all(_matches(v, t) for v, t in zip(values, types))
+    ):
+        return None
+    return tuple(values)
+
+
+def _after(columns, values, descending):
+    """Row-value comparison (c1, c2, ...) < / > (v1, v2, ...) spelled out so
+    every backend can use a composite index on the same columns."""
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+class KeysetPage:
+    """One page of a cursor-paginated listing."""
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def keyset_paginate(query, columns, key, per_page, cursor=None, direction="next", total=None):
+    """Paginate a query newest-first on ``columns`` without OFFSET.
+
+    The columns must be NOT NULL: the row-value comparison never matches
+    a NULL, so such rows could not be reached past the first page.
+
+    ``key`` maps a result row to its sort-key tuple. ``cursor`` is a token
+    produced by a previous page; ``direction`` is ``"next"`` (older rows) or
+    ``"prev"`` (newer rows).
+    """
+    values = decode_cursor(cursor, [column.type.python_type for column in columns])
+    backwards = values is not None and direction == "prev"
+
+    if values is not None:
+        query = query.filter(_after(columns, values, descending=not backwards))
+    if backwards:
+        query = query.order_by(*[c.asc() for c in columns])
+    else:
+        query = query.order_by(*[c.desc() for c in columns])
+
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    if not rows:
+        return KeysetPage([], per_page, total=total)
+
+    if backwards:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, values is not None
+
+    return KeysetPage(
+        rows,
+        per_page,
+        next_cursor=encode_cursor(key(rows[-1])) if has_next else None,
+        prev_cursor=encode_cursor(key(rows[0])) if has_prev else None,
+        total=total
+    )
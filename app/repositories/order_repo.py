@@ -1,38 +1,83 @@
+from sqlalchemy.orm import joinedload
 from app.extensions import db
+from app.models.book import Book
 from app.models.order import Order
-from app_aws import DynamoOrderRepository
+from app.repositories.keyset import keyset_paginate
+from app.repositories.outbox_repo import OutboxRepository
+from app_aws import DYNAMODB_ORDERS_TABLE
 
 class OrderRepository:
     def create(self, order):
-        """Create a new order in SQL and DynamoDB."""
-        db.session.add(order)
+        """Create a new order in SQL and queue its DynamoDB mirror write."""
+        self.add_many([order])
         db.session.commit()
-        
-        # Sync to DynamoDB
-        try:
-            dynamo = DynamoOrderRepository()
-            dynamo.add({
-                'id': str(order.id),
-                'user_id': str(order.user_id),
-                'book_id': str(order.book_id),
-                'seller_id': str(order.book.seller_id) if order.book and order.book.seller_id else "system",
-                'quantity': order.quantity,
-                'total_price': order.total_price,
-                'status': order.status,
-                'order_date': order.order_date.isoformat()
-            })
-        except Exception as e:
-            print(f"DynamoDB Sync Error: {e}")
-            
         return order
     
+    def add_many(self, orders):
+        """Add several orders to the current transaction without committing.
+        
+        The rows are flushed in one batch so their IDs are available, and a
+        DynamoDB outbox event is staged for each. The caller owns the commit
+        (or rollback).
+        """
+        db.session.add_all(orders)
+        db.session.flush()
+        
+        outbox = OutboxRepository()
+        for order in orders:
+            outbox.enqueue(DYNAMODB_ORDERS_TABLE, self.to_dynamo_item(order))
+        return orders
+    
+    def to_dynamo_item(self, order):
+        """Build the DynamoDB mirror item for an order."""
+        return {
+            'id': str(order.id),
+            'user_id': str(order.user_id),
+            'book_id': str(order.book_id),
+            'seller_id': str(order.book.seller_id) if order.book and order.book.seller_id else "system",
+            'quantity': order.quantity,
+            'total_price': order.total_price,
+            'status': order.status,
+            'order_date': order.order_date.isoformat()
+        }
+    
     def get_by_id(self, order_id):
         """Get an order by ID."""
         return Order.query.get(order_id)
     
+    def list_for_admin(self, per_page, cursor=None, direction="next", status=None, start=None, end=None):
+        """Get a page of all orders newest-first, filtered by status and order date.
+        
+        The customer, book and seller are joined into the same query so
+        rendering a page never lazy-loads per row. ``end`` is exclusive.
+        """
+        query = Order.query.options(
+            joinedload(Order.user),
+            joinedload(Order.book).joinedload(Book.seller)
+        )
+        if status:
+            query = query.filter(Order.status == status)
+        if start:
+            query = query.filter(Order.order_date >= start)
+        if end:
+            query = query.filter(Order.order_date < end)
+        return keyset_paginate(
+            query,
+            [Order.order_date, Order.id],
+            key=lambda order: (order.order_date, order.id),
+            per_page=per_page,
+            cursor=cursor,
+            direction=direction
+        )
+    
     def get_user_orders(self, user_id):
-        """Get all orders for a specific user."""
-        return Order.query.filter_by(user_id=user_id).order_by(Order.order_date.desc()).all()
+        """Get all orders for a specific user, with each book and its seller loaded in the same query."""
+        return (
+            Order.query.options(joinedload(Order.book).joinedload(Book.seller))
+            .filter_by(user_id=user_id)
+            .order_by(Order.order_date.desc())
+            .all()
+        )
 
     def update(self, order):
         """Update an existing order."""
@@ -0,0 +1,55 @@
+import json
+from datetime import datetime
+from sqlalchemy import func
+from app.extensions import db
+from app.models.outbox import OutboxEvent
+
+class OutboxRepository:
+    def enqueue(self, target, item):
+        """Stage a DynamoDB put in the current transaction. The caller commits."""
+        event = OutboxEvent(target=target, payload=json.dumps(item, default=str))
+        db.session.add(event)
+        return event
+    
+    def get_due(self, limit):
+        """Oldest events that are ready to be (re)tried."""
+        return (
+            OutboxEvent.query
+            .filter(OutboxEvent.dead_lettered_at.is_(None), OutboxEvent.available_at <= datetime.utcnow())
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+            # Lets several relays share a MySQL outbox; ignored by SQLite
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+    
+    def pending_count(self):
+        return OutboxEvent.query.filter(OutboxEvent.dead_lettered_at.is_(None)).count()
+    
+    def dead_letter_count(self):
+        return OutboxEvent.query.filter(OutboxEvent.dead_lettered_at.isnot(None)).count()
+    
+    def stuck_count(self, min_attempts):
+        """Events still being retried after at least `min_attempts` failures."""
+        return OutboxEvent.query.filter(
+            OutboxEvent.dead_lettered_at.is_(None), OutboxEvent.attempts >= min_attempts
+        ).count()
+    
+    def redrive(self):
+        """Queue every parked event for immediate delivery again. Returns how many."""
+        count = (
+            OutboxEvent.query
+            .filter(OutboxEvent.dead_lettered_at.isnot(None))
+            .update({'dead_lettered_at': None, 'attempts': 0, 'available_at': datetime.utcnow()},
+                    synchronize_session=False)
+        )
+        db.session.commit()
+        return count
+    
+    def oldest_created_at(self):
+        """Creation time of the oldest event still to be delivered (dead letters excluded)."""
+        return (
+            db.session.query(func.min(OutboxEvent.created_at))
+            .filter(OutboxEvent.dead_lettered_at.is_(None))
+            .scalar()
+        )
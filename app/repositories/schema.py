@@ -0,0 +1,61 @@
+from datetime import datetime
+from sqlalchemy import inspect, text, update
+from app.extensions import db
+
+
+def ensure_indexes(bind=None):
+    """Create model indexes missing from an existing database.
+
+    ``db.create_all()`` only creates missing tables, so indexes added to a
+    model after its table was first created would otherwise never appear.
+    """
+    bind = bind if bind is not None else db.engine
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+def ensure_columns(bind=None):
+    """Add nullable model columns missing from existing tables.
+
+    Like indexes, columns added to a model after its table was created are
+    not picked up by ``db.create_all()``. Only nullable columns can be added
+    this way; anything else needs a manual migration.
+    """
+    bind = bind if bind is not None else db.engine
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    preparer = bind.dialect.identifier_preparer
+    with bind.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                if not column.nullable:
+                    print(f"Schema: cannot add NOT NULL column {table.name}.{column.name} automatically")
+                    continue
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(bind.dialect)}"
+                ))
+
+
+# Keyset pagination sorts on these; databases created before they were
+# NOT NULL may still hold NULLs
+SORT_KEY_COLUMNS = (('book', 'created_at'), ('order', 'order_date'))
+UNKNOWN_DATE = datetime(1970, 1, 1)
+
+
+def backfill_sort_keys(bind=None):
+    """Date rows with a NULL sort key as the oldest, so listings can reach them."""
+    bind = bind if bind is not None else db.engine
+    with bind.begin() as conn:
+        for table_name, column_name in SORT_KEY_COLUMNS:
+            table = db.metadata.tables[table_name]
+            column = table.c[column_name]
+            result = conn.execute(update(table).where(column.is_(None)).values({column: UNKNOWN_DATE}))
+            if result.rowcount:
+                print(f"Schema: dated {result.rowcount} {table_name} rows with no {column_name}")
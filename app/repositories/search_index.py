@@ -0,0 +1,219 @@
+import re
+import weakref
+from contextlib import contextmanager
+from sqlalchemy import event, text, select, table, column
+from sqlalchemy.dialects.mysql import match
+from app.extensions import db
+from app.models.book import Book
+
+FTS_TABLE = "book_fts"
+MYSQL_FULLTEXT_INDEX = "ix_book_fulltext"
+
+# Tokens are reduced to word characters so user input can never inject
+# FTS5 / MySQL boolean-mode operators into the MATCH expression.
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# InnoDB's default stopword list. In BOOLEAN MODE every "+term" is
+# required, and a stopword or a term under innodb_ft_min_token_size is
+# never indexed, so leaving one in would make the search match nothing.
+MYSQL_STOPWORDS = frozenset("""
+    a about an are as at be by com de en for from how i in is it la of on or
+    that the this to was what when where who will with und www
+""".split())
+MYSQL_MIN_TOKEN_SIZE = 3  # InnoDB default
+
+_SQLITE_INSERT_TRIGGER = f"""CREATE TRIGGER IF NOT EXISTS book_fts_ai AFTER INSERT ON book BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, author, description)
+        VALUES (new.id, new.title, new.author, new.description);
+    END"""
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, author, description,
+        content='book', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    _SQLITE_INSERT_TRIGGER,
+    f"""CREATE TRIGGER IF NOT EXISTS book_fts_ad AFTER DELETE ON book BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author, description)
+        VALUES ('delete', old.id, old.title, old.author, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS book_fts_au AFTER UPDATE OF title, author, description ON book BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author, description)
+        VALUES ('delete', old.id, old.title, old.author, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, author, description)
+        VALUES (new.id, new.title, new.author, new.description);
+    END""",
+]
+
+
+class BookSearchIndex:
+    """Full-text index over book title, author and description.
+
+    SQLite uses an external-content FTS5 table kept in sync by triggers,
+    MySQL uses a FULLTEXT index maintained by InnoDB. Any other dialect
+    (or an SQLite build without FTS5) falls back to ILIKE matching.
+    """
+
+    def __init__(self):
+        self._mysql_min_token_size = weakref.WeakKeyDictionary()  # engine -> int
+
+    def dialect(self, bind=None):
+        bind = bind if bind is not None else db.engine
+        return bind.dialect.name
+
+    def install(self, bind=None):
+        """Create the index structures if they do not exist yet."""
+        bind = bind if bind is not None else db.engine
+        try:
+            with bind.begin() as conn:
+                self.install_on(conn)
+        except Exception as e:
+            print(f"Search index setup skipped: {e}")
+
+    def install_on(self, conn):
+        """Install the index using an already open connection."""
+        dialect = conn.dialect.name
+        if dialect == "sqlite":
+            # A missing insert trigger means a bulk load was interrupted
+            # inside deferred(); its rows were never indexed
+            complete = (self._sqlite_exists(conn, "table", FTS_TABLE)
+                        and self._sqlite_exists(conn, "trigger", "book_fts_ai"))
+            for statement in _SQLITE_DDL:
+                conn.execute(text(statement))
+            if not complete:
+                # Index rows that were written before the triggers existed
+                self._rebuild(conn)
+        elif dialect == "mysql":
+            exists = conn.execute(
+                text("SELECT 1 FROM information_schema.statistics "
+                     "WHERE table_schema = DATABASE() AND table_name = 'book' AND index_name = :name"),
+                {"name": MYSQL_FULLTEXT_INDEX}
+            ).first() is not None
+            if not exists:
+                conn.execute(text(
+                    f"CREATE FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} ON book (title, author, description)"
+                ))
+
+    def drop(self, conn):
+        """Drop the SQLite FTS table (triggers go away with the book table)."""
+        if conn.dialect.name == "sqlite":
+            conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+    @contextmanager
+    def deferred(self, conn):
+        """Index books inserted on `conn` in one pass instead of row by row.
+
+        For bulk loads on SQLite the per-row insert trigger is dropped, and
+        every book added meanwhile is copied into the FTS table with a single
+        INSERT ... SELECT afterwards. If the process dies before that, the
+        next install() or deferred() finds the trigger missing and rebuilds
+        the whole index. MySQL maintains its FULLTEXT index itself, so this
+        is a no-op there.
+        """
+        if conn.dialect.name != "sqlite" or not self._sqlite_exists(conn, "table", FTS_TABLE):
+            yield
+            return
+        if not self._sqlite_exists(conn, "trigger", "book_fts_ai"):
+            # Left behind by an earlier load that was killed mid-way
+            self._rebuild(conn)
+        start_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM book")).scalar()
+        conn.execute(text("DROP TRIGGER IF EXISTS book_fts_ai"))
+        conn.commit()
+        try:
+            yield
+        finally:
+            conn.rollback()
+            conn.execute(
+                text(f"INSERT INTO {FTS_TABLE}(rowid, title, author, description) "
+                     "SELECT id, title, author, description FROM book WHERE id > :start_id"),
+                {"start_id": start_id}
+            )
+            conn.execute(text(_SQLITE_INSERT_TRIGGER))
+            conn.commit()
+
+    def _sqlite_exists(self, conn, kind, name):
+        return conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type=:kind AND name=:name"),
+            {"kind": kind, "name": name}
+        ).first() is not None
+
+    def _rebuild(self, conn):
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+    def is_available(self):
+        dialect = self.dialect()
+        if dialect == "mysql":
+            return True
+        if dialect != "sqlite":
+            return False
+        return db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+            {"name": FTS_TABLE}
+        ).first() is not None
+
+    @staticmethod
+    def tokenize(query):
+        return _TOKEN_RE.findall(query or "")
+
+    def mysql_min_token_size(self):
+        """The server's innodb_ft_min_token_size, read once per engine."""
+        engine = db.engine
+        size = self._mysql_min_token_size.get(engine)
+        if size is None:
+            try:
+                size = int(db.session.execute(text("SELECT @@innodb_ft_min_token_size")).scalar())
+            except Exception:
+                size = MYSQL_MIN_TOKEN_SIZE
+            self._mysql_min_token_size[engine] = size
+        return size
+
+    @staticmethod
+    def mysql_terms(tokens, min_size=MYSQL_MIN_TOKEN_SIZE):
+        """Tokens MySQL can require: indexed length and not a stopword."""
+        return [token for token in tokens
+                if len(token) >= min_size and token.lower() not in MYSQL_STOPWORDS]
+
+    def search_statement(self, query):
+        """Build a ranked SELECT of books matching every term as a prefix."""
+        tokens = self.tokenize(query)
+        if not tokens or not self.is_available():
+            return None
+
+        if self.dialect() == "mysql":
+            tokens = self.mysql_terms(tokens, self.mysql_min_token_size())
+            if not tokens:
+                # Only stopwords or short terms ("the", "c++"): use ILIKE instead
+                return None
+            expression = " ".join(f"+{token}*" for token in tokens)
+            relevance = match(
+                Book.title, Book.author, Book.description, against=expression
+            ).in_boolean_mode()
+            return (
+                select(Book)
+                .where(relevance)
+                .order_by(relevance.desc(), Book.id.desc())
+            )
+
+        expression = " ".join(f'"{token}"*' for token in tokens)
+        fts = table(FTS_TABLE, column("rowid"))
+        return (
+            select(Book)
+            .join(fts, fts.c.rowid == Book.id)
+            .where(text(f"{FTS_TABLE} MATCH :q").bindparams(q=expression))
+            # bm25 is lower-is-better; weight title and author above description
+            .order_by(text(f"bm25({FTS_TABLE}, 10.0, 5.0, 1.0)"), Book.id.desc())
+        )
+
+
+search_index = BookSearchIndex()
+
+
+@event.listens_for(Book.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    search_index.install_on(connection)
+
+
+@event.listens_for(Book.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    search_index.drop(connection)
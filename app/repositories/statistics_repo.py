@@ -0,0 +1,127 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.extensions import db
+from app.models.statistic import StoreStatistic
+
+# Written by every full refresh; its presence means the counters are live
+REFRESHED_AT = 'stats.refreshed_at'
+
+# Session.info key holding counter deltas waiting for the commit
+PENDING_DELTAS = 'statistics_deltas'
+
+def stock_bucket(stock):
+    """Which stock counter a book with this stock level belongs to."""
+    stock = 0 if stock is None else stock
+    if stock > 0:
+        return 'books.in_stock'
+    if stock == 0:
+        return 'books.out_of_stock'
+    return None
+
+def _upsert(dialect_name, columns):
+    """INSERT into store_statistic that updates `columns` when the name exists.
+
+    Each column maps to a function of (current table, proposed row) giving
+    its new value, so counters can add to the stored value.
+    """
+    table = StoreStatistic.__table__
+    if dialect_name == 'mysql':
+        statement = mysql_insert(table)
+        return statement.on_duplicate_key_update(
+            {name: value(table.c, statement.inserted) for name, value in columns.items()})
+    if dialect_name in ('sqlite', 'postgresql'):
+        statement = (sqlite_insert if dialect_name == 'sqlite' else postgresql_insert)(table)
+        return statement.on_conflict_do_update(
+            index_elements=[table.c.name],
+            set_={name: value(table.c, statement.excluded) for name, value in columns.items()}
+        )
+    raise ValueError(f"Statistics are not supported on {dialect_name}")
+
+_ADD = {
+    'value': lambda current, new: current.value + new.value,
+    'updated_at': lambda current, new: new.updated_at,
+}
+_REPLACE = dict(_ADD, value=lambda current, new: new.value, payload=lambda current, new: new.payload)
+
+class StatisticsRepository:
+    def get_all(self):
+        """Every stored statistic in a single query."""
+        return StoreStatistic.query.all()
+    
+    def increment(self, deltas, connection=None):
+        """Add {name: delta} to the counters, creating any that do not exist yet.
+        
+        Counters written before the first full refresh are harmless: that
+        refresh overwrites every counter with computed values.
+        """
+        deltas = {name: delta for name, delta in Counter(deltas).items() if delta}
+        if not deltas:
+            return
+        execute = connection.execute if connection is not None else db.session.execute
+        dialect_name = (connection or db.engine).dialect.name
+        now = datetime.utcnow()
+        # Sorted so concurrent writers take the row locks in the same order
+        execute(_upsert(dialect_name, _ADD), [
+            {'name': name, 'value': delta, 'updated_at': now} for name, delta in sorted(deltas.items())
+        ])
+    
+    def defer(self, deltas, session=None):
+        """Queue {name: delta} until the session's transaction commits.
+        
+        The counters are shared by every request, so they are updated after
+        the commit in a short transaction of their own rather than holding
+        their row locks for the rest of, say, a checkout.
+        """
+        session = session if session is not None else db.session
+        session.info.setdefault(PENDING_DELTAS, Counter()).update(deltas)
+    
+    def apply_deferred(self, session):
+        """Apply deltas queued on a session that just committed."""
+        deltas = session.info.pop(PENDING_DELTAS, None)
+        if not deltas:
+            return
+        try:
+            with db.engine.begin() as connection:
+                self.increment(deltas, connection=connection)
+        except Exception as e:
+            # The next full refresh corrects the counters
+            print(f"[STATS] Could not apply counter changes: {e}")
+    
+    def discard_deferred(self, session):
+        session.info.pop(PENDING_DELTAS, None)
+    
+    def stock_changed(self, before, after):
+        """Move a book between the in/out-of-stock counters after a bulk UPDATE."""
+        old, new = stock_bucket(before), stock_bucket(after)
+        if old != new:
+            deltas = Counter()
+            if old:
+                deltas[old] -= 1
+            if new:
+                deltas[new] += 1
+            self.defer(deltas)
+    
+    def replace_all(self, values, payloads=None):
+        """Overwrite every statistic with freshly computed values.
+        
+        Rows are updated in place rather than deleted and re-inserted, and
+        counters that no longer apply (e.g. a status with no orders left)
+        are reset to zero.
+        """
+        payloads = payloads or {}
+        now = datetime.utcnow()
+        values = dict(values, **{REFRESHED_AT: now.timestamp()})
+        names = sorted(set(values) | set(payloads))
+        table = StoreStatistic.__table__
+        db.session.execute(_upsert(db.engine.dialect.name, _REPLACE), [
+            {'name': name, 'value': values.get(name, 0), 'payload': payloads.get(name), 'updated_at': now}
+            for name in names
+        ])
+        db.session.execute(
+            update(table).where(table.c.name.not_in(names)).values(value=0, payload=None, updated_at=now)
+        )
+        db.session.commit()
@@ -1,25 +1,23 @@
 from app.extensions import db
 from app.models.user import User
-from app_aws import DynamoUserRepository
+from app.repositories.outbox_repo import OutboxRepository
+from app_aws import DYNAMODB_USERS_TABLE
 
 class UserRepository:
     def create(self, user):
-        """Create a new user in SQL and DynamoDB."""
+        """Create a new user in SQL and queue its DynamoDB mirror write."""
         db.session.add(user)
-        db.session.commit()
+        db.session.flush()
         
-        # Sync to DynamoDB
-        try:
-            dynamo = DynamoUserRepository()
-            dynamo.add({
-                'id': str(user.id),
-                'username': user.username,
-                'email': user.email,
-                'role': user.role,
-                'password_hash': user.password_hash  # Consistent with cloud user mgmt
-            })
-        except Exception as e:
-            print(f"DynamoDB Sync Error: {e}")
+        # Written in the same transaction; the outbox relay syncs DynamoDB
+        OutboxRepository().enqueue(DYNAMODB_USERS_TABLE, {
+            'id': str(user.id),
+            'username': user.username,
+            'email': user.email,
+            'role': user.role,
+            'password_hash': user.password_hash  # Consistent with cloud user mgmt
+        })
+        db.session.commit()
         
     def get_by_email(self, email):
         return User.query.filter_by(email=email).first()
\ No newline at end of file
@@ -1,14 +1,33 @@
-from flask import Blueprint, render_template, redirect, url_for, session, flash, request
+from flask import Blueprint, render_template, redirect, url_for, session, flash, request, Response, abort, current_app
 from app.extensions import db
 from app.models.user import User
 from app.models.book import Book
 from app.models.order import Order
+from app.repositories.order_repo import OrderRepository
 from app.routes.auth import login_required
+from app.services.authorization import current_principal, role_cache
+from app.services.statistics import statistics
+from app.services.exports import ORDER_EXPORT_COLUMNS, order_export_statement, export_response, parse_date
+from app.services.profiler import profiler, pstats_text, PROFILE_HEADER
+from app.services.slow_query_log import slow_query_log, plan_warnings
+from app.models.slow_query import SlowQuery
 from functools import wraps
-from sqlalchemy import func
+from datetime import timedelta
+from sqlalchemy.orm import joinedload
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
+LOW_STOCK_LIMIT = 20
+ORDERS_PER_PAGE = 50
+# Order lifecycle, as shown on the buyer dashboard timeline
+ORDER_STATUSES = ['Placed', 'Processing', 'Shipped', 'Delivered', 'Cancelled']
+SLOW_QUERY_LIMIT = 50
+SLOW_QUERY_SORTS = {
+    'total': SlowQuery.total_seconds,
+    'count': SlowQuery.count,
+    'max': SlowQuery.max_seconds,
+}
+
 def admin_required(f):
     """Decorator to require admin role for routes."""
     @wraps(f)
@@ -17,8 +36,8 @@ def admin_required(f):
             flash('Please log in to access this page.', 'error')
             return redirect(url_for('auth.login'))
         
-        user = User.query.get(session.get('user_id'))
-        if not user or user.role != 'admin':
+        principal = current_principal()
+        if not principal or principal.role != 'admin':
             flash('Access denied. Admin privileges required.', 'error')
             return redirect(url_for('bookstore.books'))
         
@@ -29,48 +48,16 @@ def admin_required(f):
 @admin_required
 def dashboard():
     """Admin dashboard with statistics and tracking."""
-    
-    # Get statistics
-    total_users = User.query.filter_by(role='buyer').count()
-    total_sellers = User.query.filter_by(role='seller').count()
-    total_books = Book.query.count()
-    total_orders = Order.query.count()
-    
-    # Calculate total revenue
-    total_revenue = db.session.query(func.sum(Order.total_price)).scalar() or 0
+    # Counters, top books and status breakdown come from the summary table
+    stats, top_books, order_status_counts = statistics.snapshot()
     
     # Get recent orders (last 10)
-    recent_orders = Order.query.order_by(Order.order_date.desc()).limit(10).all()
-    
-    # Get low stock books (stock < 10)
-    low_stock_books = Book.query.filter(Book.stock < 10).order_by(Book.stock.asc()).all()
+    recent_orders = Order.query.options(
+        joinedload(Order.user), joinedload(Order.book)
+    ).order_by(Order.order_date.desc()).limit(10).all()
     
-    # Get books by status
-    out_of_stock = Book.query.filter_by(stock=0).count()
-    in_stock = Book.query.filter(Book.stock > 0).count()
-    
-    # Get top selling books (books with most orders)
-    top_books = db.session.query(
-        Book.title,
-        Book.author,
-        func.count(Order.id).label('order_count')
-    ).join(Order).group_by(Book.id).order_by(func.count(Order.id).desc()).limit(5).all()
-    
-    # Get order breakdown by status
-    order_status_counts = db.session.query(
-        Order.status,
-        func.count(Order.id).label('count')
-    ).group_by(Order.status).all()
-    
-    stats = {
-        'total_users': total_users,
-        'total_sellers': total_sellers,
-        'total_books': total_books,
-        'total_orders': total_orders,
-        'total_revenue': total_revenue,
-        'out_of_stock': out_of_stock,
-        'in_stock': in_stock
-    }
+    # Get low stock books (stock < 10), most urgent first
+    low_stock_books = Book.query.filter(Book.stock < 10).order_by(Book.stock.asc()).limit(LOW_STOCK_LIMIT).all()
     
     return render_template(
         "admin_dashboard.html",
@@ -112,7 +99,11 @@ def books():
     if query:
         pagination = book_repo.search_paginated(query, page, per_page)
     else:
-        pagination = book_repo.get_all_paginated(page, per_page)
+        pagination = book_repo.get_all_keyset(
+            per_page,
+            cursor=request.args.get('cursor'),
+            direction=request.args.get('dir', 'next')
+        )
         
     return render_template("admin_books.html", 
                          books=pagination.items, 
@@ -123,9 +114,110 @@ def books():
 @admin_bp.route("/orders")
 @admin_required
 def orders():
-    """View all orders."""
-    all_orders = Order.query.order_by(Order.order_date.desc()).all()
-    return render_template("admin_orders.html", orders=all_orders, username=session.get('username'))
+    """View all orders, filtered by status and date range, with cursor pagination."""
+    status = request.args.get('status') or None
+    start = parse_date(request.args.get('start'))
+    end = parse_date(request.args.get('end'))
+    
+    pagination = OrderRepository().list_for_admin(
+        ORDERS_PER_PAGE,
+        cursor=request.args.get('cursor'),
+        direction=request.args.get('dir', 'next'),
+        status=status,
+        start=start,
+        # The end date is inclusive in the form
+        end=end + timedelta(days=1) if end else None
+    )
+    filters = {
+        'status': status,
+        'start': start.strftime('%Y-%m-%d') if start else None,
+        'end': end.strftime('%Y-%m-%d') if end else None
+    }
+    return render_template("admin_orders.html",
+                         orders=pagination.items,
+                         pagination=pagination,
+                         filters=filters,
+                         statuses=ORDER_STATUSES,
+                         username=session.get('username'))
+
+@admin_bp.route("/orders/export")
+@admin_required
+def export_orders():
+    """Stream all orders matching the list filters as CSV or NDJSON."""
+    statement = order_export_statement(
+        status=request.args.get('status') or None,
+        start=parse_date(request.args.get('start')),
+        end=parse_date(request.args.get('end'))
+    )
+    return export_response(statement, ORDER_EXPORT_COLUMNS, request.args.get('format', 'csv'), 'orders')
+
+@admin_bp.route("/profiler")
+@admin_required
+def profiles():
+    """Recorded profiles of this worker and the form to start sampling."""
+    return render_template("admin_profiler.html",
+                         profiles=profiler.list(),
+                         sampling=profiler.sampling,
+                         max_seconds=current_app.config.get('PROFILER_MAX_SECONDS', 60),
+                         header=PROFILE_HEADER,
+                         username=session.get('username'))
+
+@admin_bp.route("/profiler/sample", methods=["POST"])
+@admin_required
+def start_sampling():
+    """Sample every thread of this worker for N seconds in the background."""
+    max_seconds = current_app.config.get('PROFILER_MAX_SECONDS', 60)
+    seconds = request.form.get('seconds', 10, type=float)
+    if not seconds or not 0 < seconds <= max_seconds:
+        flash(f'Sampling time must be between 1 and {max_seconds} seconds.', 'error')
+    elif profiler.start_sampling(seconds):
+        flash(f'Sampling this worker for {seconds:g} seconds. Refresh to download the result.', 'success')
+    else:
+        flash('A sampling run is already in progress.', 'warning')
+    return redirect(url_for('admin.profiles'))
+
+@admin_bp.route("/profiler/<profile_id>")
+@admin_required
+def download_profile(profile_id):
+    """Collapsed stacks for samples; pstats (binary or text) for request profiles."""
+    profile = profiler.get(profile_id)
+    if profile is None:
+        abort(404)
+    if profile.kind == 'sample':
+        body, mimetype, filename = profile.data, 'text/plain', f"profile-{profile.id}.collapsed.txt"
+    elif request.args.get('format') == 'text':
+        body, mimetype, filename = pstats_text(profile), 'text/plain', f"profile-{profile.id}.txt"
+    else:
+        body, mimetype, filename = profile.data, 'application/octet-stream', f"profile-{profile.id}.prof"
+    return Response(body, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@admin_bp.route("/slow-queries")
+@admin_required
+def slow_queries():
+    """Slowest statement shapes with their query plans, worst first."""
+    sort = request.args.get('sort', 'total')
+    if sort not in SLOW_QUERY_SORTS:
+        sort = 'total'
+    queries = SlowQuery.query.order_by(SLOW_QUERY_SORTS[sort].desc()).limit(SLOW_QUERY_LIMIT).all()
+    return render_template("admin_slow_queries.html",
+                         queries=queries,
+                         warnings={query.id: plan_warnings(query.plan) for query in queries},
+                         sort=sort,
+                         threshold=current_app.config.get('SLOW_QUERY_THRESHOLD_MS', 100),
+                         flush_interval=current_app.config.get('SLOW_QUERY_FLUSH_INTERVAL', 5),
+                         enabled='slow_query_log' in current_app.extensions,
+                         username=session.get('username'))
+
+@admin_bp.route("/slow-queries/clear", methods=["POST"])
+@admin_required
+def clear_slow_queries():
+    """Forget recorded slow queries, e.g. after adding an index."""
+    slow_query_log.clear()
+    deleted = SlowQuery.query.delete()
+    db.session.commit()
+    flash(f'Cleared {deleted} slow queries.', 'success')
+    return redirect(url_for('admin.slow_queries'))
 
 @admin_bp.route("/books/add", methods=["POST"])
 @admin_required
@@ -203,6 +295,7 @@ def promote_user(user_id):
             
         user.role = 'admin'
         db.session.commit()
+        role_cache.invalidate(user.id)
         flash(f"User {user.username} promoted to Admin successfully!", "success")
         return redirect(url_for("admin.users"))
     except Exception as e:
@@ -225,6 +318,7 @@ def promote_seller(user_id):
             
         user.role = 'seller'
         db.session.commit()
+        role_cache.invalidate(user.id)
         flash(f"User {user.username} promoted to Seller successfully!", "success")
         return redirect(url_for("admin.users"))
     except Exception as e:
@@ -252,6 +346,7 @@ def revoke_admin(user_id):
             
         user.role = 'buyer'
         db.session.commit()
+        role_cache.invalidate(user.id)
         flash(f"Admin status revoked for user {user.username}.", "success")
         return redirect(url_for("admin.users"))
     except Exception as e:
@@ -270,6 +365,7 @@ def validate_user(user_id):
             
         user.is_validated = not user.is_validated
         db.session.commit()
+        role_cache.invalidate(user.id)
         
         status = "validated" if user.is_validated else "unvalidated"
         flash(f"User {user.username} is now {status}.", "success")
@@ -289,6 +385,9 @@ def bulk_promote_sellers():
             "is_validated": True
         })
         db.session.commit()
+        role_cache.invalidate()
+        # Bulk UPDATEs bypass the incremental counters
+        statistics.refresh()
         flash(f"Success! {affected} users promoted to Validated Sellers.", "success")
         return redirect(url_for("admin.users"))
     except Exception as e:
@@ -308,6 +407,9 @@ def bulk_reset_buyers():
             "is_validated": False
         })
         db.session.commit()
+        role_cache.invalidate()
+        # Bulk UPDATEs bypass the incremental counters
+        statistics.refresh()
         flash(f"Success! {affected} users reset to Buyers.", "success")
         return redirect(url_for("admin.users"))
     except Exception as e:
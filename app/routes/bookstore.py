@@ -3,12 +3,15 @@ from app.repositories.book_repo import BookRepository
 from app.repositories.order_repo import OrderRepository
 from app.models.order import Order
 from app.services.notification import NotificationService
+from app.services.cart import price_cart
+from app.services.checkout import CheckoutService, InsufficientStockError
 from app.routes.auth import login_required
 
 bookstore_bp = Blueprint("bookstore", __name__)
 book_repo = BookRepository()
 order_repo = OrderRepository()
 notifier = NotificationService()
+checkout_service = CheckoutService()
 
 @bookstore_bp.route("/books", methods=["GET"])
 @login_required
@@ -21,7 +24,12 @@ def books():
     if query:
         pagination = book_repo.search_paginated(query, page, per_page)
     else:
-        pagination = book_repo.get_all_paginated(page, per_page)
+        # Cursor pagination: deep pages cost the same as the first one
+        pagination = book_repo.get_all_keyset(
+            per_page,
+            cursor=request.args.get('cursor'),
+            direction=request.args.get('dir', 'next')
+        )
     
     # Get cart count for display
     cart = session.get('cart', {})
@@ -61,19 +69,7 @@ def add_to_cart(book_id):
 def view_cart():
     """Display the contents of the shopping cart."""
     cart = session.get('cart', {})
-    cart_items = []
-    total_price = 0
-    
-    for book_id_str, quantity in cart.items():
-        book = book_repo.get_by_id(int(book_id_str))
-        if book:
-            item_total = book.price * quantity
-            total_price += item_total
-            cart_items.append({
-                'book': book,
-                'quantity': quantity,
-                'item_total': item_total
-            })
+    cart_items, total_price = price_cart(cart)
     
     return render_template("cart.html", cart_items=cart_items, total_price=total_price)
 
@@ -121,18 +117,7 @@ def checkout():
         flash('Your cart is empty.', 'error')
         return redirect(url_for('bookstore.books'))
     
-    cart_items = []
-    total_price = 0
-    for book_id_str, quantity in cart.items():
-        book = book_repo.get_by_id(int(book_id_str))
-        if book:
-            item_total = book.price * quantity
-            total_price += item_total
-            cart_items.append({
-                'book': book,
-                'quantity': quantity,
-                'item_total': item_total
-            })
+    cart_items, total_price = price_cart(cart)
 
     if request.method == "GET":
         return render_template("checkout.html", cart_items=cart_items, total_price=total_price)
@@ -140,31 +125,10 @@ def checkout():
     # POST logic - finalize order
     user_id = session.get('user_id')
     user_email = session.get('email')
-    orders_placed = []
+    orders_placed = [item['book'].title for item in cart_items]
     
     try:
-        for item in cart_items:
-            book = item['book']
-            quantity = item['quantity']
-            
-            if book.stock < quantity:
-                flash(f'Issue with book "{book.title}": insufficient stock.', 'error')
-                return redirect(url_for('bookstore.view_cart'))
-            
-            # Create order
-            order = Order(
-                user_id=user_id,
-                book_id=book.id,
-                quantity=quantity,
-                total_price=item['item_total'],
-                status='Placed'
-            )
-            order_repo.create(order)
-            
-            # Update stock
-            book.stock -= quantity
-            book_repo.update(book)
-            orders_placed.append(book.title)
+        checkout_service.place_order(user_id, cart_items)
         
         # Clear cart
         session['cart'] = {}
@@ -174,7 +138,10 @@ def checkout():
         notifier.send(user_email, f"Order placed for: {', '.join(orders_placed)}")
         flash('Your order has been placed successfully!', 'success')
         return redirect(url_for('auth.dashboard'))
-            
+    
+    except InsufficientStockError as e:
+        flash(f'Issue with book "{e.title}": insufficient stock.', 'error')
+        return redirect(url_for('bookstore.view_cart'))
     except Exception as e:
         flash('An error occurred during checkout.', 'error')
         return redirect(url_for('bookstore.view_cart'))
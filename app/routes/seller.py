@@ -1,14 +1,18 @@
 from flask import Blueprint, render_template, redirect, url_for, session, flash, request
 from app.extensions import db
-from app.models.user import User
 from app.models.book import Book
-from app.models.order import Order
 from app.routes.auth import login_required
 from functools import wraps
+from app.services.authorization import current_principal
+from app.services.seller_analytics import SellerAnalytics
+from app.services.exports import ORDER_EXPORT_COLUMNS, order_export_statement, export_response, parse_date
 from app_aws import aws_app
 
 seller_bp = Blueprint("seller", __name__, url_prefix="/seller")
 
+SELLER_PAGE_SIZE = 20
+analytics = SellerAnalytics()
+
 def seller_required(f):
     """Decorator to require seller role for routes."""
     @wraps(f)
@@ -17,8 +21,8 @@ def seller_required(f):
             flash('Please log in to access this page.', 'error')
             return redirect(url_for('auth.login'))
         
-        user = User.query.get(session.get('user_id'))
-        if not user or user.role != 'seller':
+        principal = current_principal()
+        if not principal or principal.role != 'seller':
             flash('Access denied. Seller privileges required.', 'error')
             return redirect(url_for('bookstore.books'))
         
@@ -30,16 +34,23 @@ def seller_required(f):
 def dashboard():
     """Seller dashboard with their own books."""
     user_id = session.get('user_id')
-    my_books = Book.query.filter_by(seller_id=user_id).all()
+    pagination = analytics.books_page(
+        user_id,
+        SELLER_PAGE_SIZE,
+        cursor=request.args.get('cursor'),
+        direction=request.args.get('dir', 'next')
+    )
     
     # Calculate some stats for the seller
-    total_stock = sum(book.stock for book in my_books)
+    inventory = analytics.inventory_summary(user_id)
     
     return render_template(
         "seller_dashboard.html",
-        books=my_books,
-        total_stock=total_stock,
-        user=User.query.get(user_id),
+        books=pagination.items,
+        pagination=pagination,
+        book_count=inventory['book_count'],
+        total_stock=inventory['total_stock'],
+        user=current_principal(),
         username=session.get('username')
     )
 
@@ -113,22 +124,34 @@ def sales():
     try:
         user_id = session.get('user_id')
         
-        # Get all books owned by this seller
-        my_book_ids = [b.id for b in Book.query.filter_by(seller_id=user_id).all()]
-        
-        # Get all orders for those books
-        my_sales = Order.query.filter(Order.book_id.in_(my_book_ids)).order_by(Order.order_date.desc()).all()
-        
-        # Calculate total revenue for this seller
-        total_revenue = sum(sale.total_price for sale in my_sales)
+        pagination = analytics.sales_page(
+            user_id,
+            SELLER_PAGE_SIZE,
+            cursor=request.args.get('cursor'),
+            direction=request.args.get('dir', 'next')
+        )
         
         return render_template(
             "seller_orders.html",
-            sales=my_sales,
-            total_revenue=total_revenue,
-            user=User.query.get(user_id),
+            sales=pagination.items,
+            pagination=pagination,
+            summary=analytics.sales_summary(user_id),
+            breakdown=analytics.book_breakdown(user_id),
+            user=current_principal(),
             username=session.get('username')
         )
     except Exception as e:
         flash("An error occurred while fetching sales data.", "error")
         return redirect(url_for("seller.dashboard"))
+
+@seller_bp.route("/sales/export")
+@seller_required
+def export_sales():
+    """Stream the seller's orders as CSV or NDJSON."""
+    statement = order_export_statement(
+        seller_id=session.get('user_id'),
+        status=request.args.get('status') or None,
+        start=parse_date(request.args.get('start')),
+        end=parse_date(request.args.get('end'))
+    )
+    return export_response(statement, ORDER_EXPORT_COLUMNS, request.args.get('format', 'csv'), 'sales')
@@ -0,0 +1,114 @@
+import os
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+from flask import current_app, session
+from app.extensions import db
+from app.models.user import User
+
+# What the role decorators need to know about the logged-in user
+Principal = namedtuple('Principal', ['user_id', 'role', 'is_validated'])
+
+class RoleCache:
+    """In-process LRU of user id -> Principal with a short TTL.
+
+    Admin routes that change a role or validation flag call invalidate(),
+    which drops the entry here and replaces a signal file that every worker
+    checks (one stat call) before reading its cache; a worker that sees a
+    new signal clears its whole cache, so changes apply immediately in all
+    workers on the host. The file defaults to one per database in the temp
+    directory; workers on several hosts need ROLE_CACHE_SIGNAL_FILE on
+    shared storage, or ROLE_CACHE_TTL=0. Roles changed outside the admin
+    routes (by hand in the database) still take up to ROLE_CACHE_TTL
+    seconds. A TTL of 0 disables caching.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._signal_seen = None
+
+    def _ttl(self):
+        return current_app.config.get('ROLE_CACHE_TTL', 30)
+
+    def _signal_path(self):
+        path = current_app.config.get('ROLE_CACHE_SIGNAL_FILE')
+        if not path:
+            uri = current_app.config.get('SQLALCHEMY_DATABASE_URI', '')
+            path = os.path.join(tempfile.gettempdir(), f"bookbazaar-roles-{hashlib.sha1(uri.encode()).hexdigest()[:12]}")
+        return path
+
+    def _signal_stamp(self):
+        try:
+            stat = os.stat(self._signal_path())
+        except FileNotFoundError:
+            return None
+        # A replaced file gets a new inode even within one mtime tick
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _check_signal(self):
+        """Clear the cache if another worker invalidated roles since the last check."""
+        stamp = self._signal_stamp()
+        with self._lock:
+            if stamp != self._signal_seen:
+                self._entries.clear()
+                self._signal_seen = stamp
+
+    def _send_signal(self):
+        path = self._signal_path()
+        try:
+            directory = os.path.dirname(path) or '.'
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.roles-')
+            os.write(fd, str(time.time()).encode())
+            os.close(fd)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"[AUTH] Could not signal role change to other workers: {e}")
+
+    def get(self, user_id):
+        """Principal for `user_id`, or None if the user does not exist."""
+        ttl = self._ttl()
+        now = time.monotonic()
+        if ttl > 0:
+            self._check_signal()
+            with self._lock:
+                entry = self._entries.get(user_id)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(user_id)
+                    return entry[0]
+
+        row = db.session.query(User.role, User.is_validated).filter(User.id == user_id).first()
+        principal = Principal(user_id, row.role, bool(row.is_validated)) if row else None
+
+        if ttl > 0:
+            with self._lock:
+                self._entries[user_id] = (principal, now + ttl)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, user_id=None):
+        """Drop one user's entry, or every entry when `user_id` is None, in every worker.
+
+        Call after the change is committed.
+        """
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+        if self._ttl() > 0:
+            self._send_signal()
+
+role_cache = RoleCache()
+
+def current_principal():
+    """Principal for the user in the session, or None if not logged in."""
+    user_id = session.get('user_id')
+    if user_id is None:
+        return None
+    return role_cache.get(user_id)
@@ -0,0 +1,33 @@
+from app.repositories.book_repo import BookRepository
+
+book_repo = BookRepository()
+
+def price_cart(cart):
+    """Resolve a session cart ({book_id_str: quantity}) into priced line items.
+
+    All books are loaded with one query; lines whose book no longer exists
+    are dropped. Returns (cart_items, total_price).
+    """
+    lines = []
+    for book_id_str, quantity in cart.items():
+        try:
+            lines.append((int(book_id_str), quantity))
+        except (TypeError, ValueError):
+            continue
+    
+    books = {book.id: book for book in book_repo.get_many(book_id for book_id, _ in lines)}
+    
+    cart_items = []
+    total_price = 0
+    for book_id, quantity in lines:
+        book = books.get(book_id)
+        if book:
+            item_total = book.price * quantity
+            total_price += item_total
+            cart_items.append({
+                'book': book,
+                'quantity': quantity,
+                'item_total': item_total
+            })
+    
+    return cart_items, total_price
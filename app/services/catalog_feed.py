@@ -0,0 +1,185 @@
+# Catalog feed parsing and validation, run in spawned worker processes.
+# The module itself has no database code, but importing it runs the app
+# package's __init__, so each worker still loads Flask and SQLAlchemy once
+# at startup. Workers never create the app or open a connection.
+import csv
+import hashlib
+import os
+import re
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+DEFAULT_STOCK = 50
+CHUNK_ROWS = 2000
+MAX_PRICE = 1_000_000
+
+_NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+_ISBN_STRIP_RE = re.compile(r'[\s-]')
+
+def validate_row(row):
+    """Clean one CSV row. Returns (values, None) or (None, reason)."""
+    title = (row.get('title') or '').strip()
+    if not title:
+        return None, 'missing title'
+    if len(title) > 150:
+        return None, 'title longer than 150 characters'
+
+    author = (row.get('author') or '').strip() or 'Unknown Author'
+    if len(author) > 200:
+        return None, 'author longer than 200 characters'
+
+    raw_price = (row.get('price') or '').strip().replace(',', '')
+    if not raw_price:
+        return None, 'missing price'
+    try:
+        price = float(raw_price)
+    except ValueError:
+        return None, f'invalid price {raw_price!r}'
+    if not 0 <= price <= MAX_PRICE:
+        return None, f'price out of range {raw_price!r}'
+
+    image_url, reason = normalize_image_url(row.get('image_url'))
+    if reason:
+        return None, reason
+
+    isbn, reason = normalize_isbn(row.get('isbn'))
+    if reason:
+        return None, reason
+
+    return {
+        'title': title,
+        'author': author,
+        'description': (row.get('description') or '').strip(),
+        'price': round(price, 2),
+        'stock': DEFAULT_STOCK,
+        'image_url': image_url,
+        'isbn': isbn,
+        'natural_key': natural_key(title, author, isbn)
+    }, None
+
+def normalize_isbn(value):
+    """Returns (ISBN-10/13 without separators or None, reason or None)."""
+    isbn = _ISBN_STRIP_RE.sub('', value or '').upper()
+    if not isbn:
+        return None, None
+    if re.fullmatch(r'\d{13}|\d{9}[\dX]', isbn):
+        return isbn, None
+    return None, f'invalid isbn {value.strip()[:20]!r}'
+
+def _normalize_text(value):
+    value = value or ''
+    if not value.isascii():
+        # Fold accents: "Café" and "Cafe" are the same book
+        value = unicodedata.normalize('NFKD', value)
+        value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return ' '.join(_NON_WORD_RE.sub(' ', value.casefold()).split())
+
+def natural_key(title, author, isbn=None):
+    """Dedupe key for a catalog entry: the ISBN, or a hash of normalized title and author."""
+    if isbn:
+        return f'isbn:{isbn}'
+    normalized = f'{_normalize_text(title)}|{_normalize_text(author)}'
+    return 'ta:' + hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+def normalize_image_url(value):
+    """Returns (url or None, reason or None)."""
+    url = (value or '').strip()
+    if not url:
+        return None, None
+    if url.startswith('//'):
+        url = 'https:' + url
+    elif url.lower().startswith('www.'):
+        url = 'https://' + url
+    if url.startswith('/') or url.lower().startswith(('http://', 'https://')):
+        if len(url) > 500:
+            return None, 'image_url longer than 500 characters'
+        return url, None
+    return None, f'invalid image_url {url[:80]!r}'
+
+def parse_chunk(header, records):
+    """Validate a list of (line_number, fields) records.
+
+    Returns (rows, rejects) where rejects are (line_number, fields, reason).
+    """
+    rows, rejects = [], []
+    for line_number, fields in records:
+        if len(fields) != len(header):
+            rejects.append((line_number, fields, f'expected {len(header)} fields, got {len(fields)}'))
+            continue
+        values, reason = validate_row(dict(zip(header, fields)))
+        if reason:
+            rejects.append((line_number, fields, reason))
+        else:
+            rows.append(values)
+    return rows, rejects
+
+def read_chunks(csv_file_path, chunk_rows=CHUNK_ROWS):
+    """Yield (header, records) chunks of raw CSV records with their line numbers."""
+    with open(csv_file_path, mode='r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        records = []
+        for fields in reader:
+            if not fields:
+                continue
+            records.append((reader.line_num, fields))
+            if len(records) >= chunk_rows:
+                yield header, records
+                records = []
+        if records:
+            yield header, records
+
+def parse_feed(csv_file_path, workers=None, chunk_rows=CHUNK_ROWS):
+    """Yield (rows, rejects) per chunk, in file order.
+
+    With more than one worker, chunks are validated in a process pool while
+    the caller consumes earlier results; at most two chunks per worker are
+    in flight so memory stays bounded on large feeds.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = read_chunks(csv_file_path, chunk_rows)
+    if workers <= 1:
+        for header, records in chunks:
+            yield parse_chunk(header, records)
+        return
+
+    # spawn: workers must not inherit the parent's DB connections and threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+        pending = deque()
+        for header, records in chunks:
+            pending.append(pool.submit(parse_chunk, header, records))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+class RejectFile:
+    """CSV of rows that failed validation, created on the first reject."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, rejects):
+        for line_number, fields, reason in rejects:
+            if self._writer is None:
+                self._file = open(self.path, 'w', encoding='utf-8', newline='')
+                self._writer = csv.writer(self._file)
+                self._writer.writerow(['line', 'reason', 'fields'])
+            self._writer.writerow([line_number, reason, *fields])
+            self.count += 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
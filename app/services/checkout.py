@@ -0,0 +1,51 @@
+from app.extensions import db
+from app.models.order import Order
+from app.repositories.book_repo import BookRepository
+from app.repositories.order_repo import OrderRepository
+from app.services.metrics import ORDERS_PLACED, STOCK_OUTS
+
+book_repo = BookRepository()
+order_repo = OrderRepository()
+
+class InsufficientStockError(Exception):
+    """Raised when a cart line asks for more units than are in stock."""
+    
+    def __init__(self, book):
+        super().__init__(f'Insufficient stock for "{book.title}"')
+        self.book_id = book.id
+        self.title = book.title
+
+class CheckoutService:
+    def place_order(self, user_id, cart_items):
+        """Turn priced cart items into orders in a single transaction.
+        
+        Stock for every line is taken with a conditional UPDATE, all orders
+        are inserted together and the whole basket is committed once. If any
+        line cannot be fulfilled nothing is written.
+        """
+        orders = []
+        try:
+            # Lock rows in a stable order so concurrent baskets cannot deadlock
+            for item in sorted(cart_items, key=lambda item: item['book'].id):
+                book = item['book']
+                if not book_repo.decrement_stock(book.id, item['quantity']):
+                    STOCK_OUTS.labels('insufficient_stock').inc()
+                    raise InsufficientStockError(book)
+                orders.append(Order(
+                    user_id=user_id,
+                    book_id=book.id,
+                    quantity=item['quantity'],
+                    total_price=item['item_total'],
+                    status='Placed'
+                ))
+            
+            # Orders and their DynamoDB outbox events share this commit
+            order_repo.add_many(orders)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        ORDERS_PLACED.inc(len(orders))
+        
+        return orders
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from flask import Response, stream_with_context
+from sqlalchemy import select, func
+from sqlalchemy.orm import aliased
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+
+ORDER_EXPORT_COLUMNS = [
+    'id', 'order_date', 'status', 'customer', 'book_id',
+    'book_title', 'seller', 'quantity', 'total_price'
+]
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+# Rows fetched per round trip, and bytes buffered before a chunk is sent
+FETCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD query argument, ignoring anything malformed."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d') if value else None
+    except ValueError:
+        return None
+
+def order_export_statement(seller_id=None, status=None, start=None, end=None):
+    """Flat newest-first SELECT of order rows, optionally for one seller's books.
+
+    ``start`` and ``end`` are dates; both are inclusive.
+    """
+    customer = aliased(User)
+    seller = aliased(User)
+    statement = (
+        select(
+            Order.id,
+            Order.order_date,
+            Order.status,
+            customer.username.label('customer'),
+            Order.book_id,
+            Book.title.label('book_title'),
+            func.coalesce(seller.username, 'System').label('seller'),
+            Order.quantity,
+            Order.total_price
+        )
+        # Outer joins keep orders whose customer or book has since been deleted
+        .outerjoin(customer, Order.user_id == customer.id)
+        .outerjoin(Book, Order.book_id == Book.id)
+        .outerjoin(seller, Book.seller_id == seller.id)
+    )
+    if seller_id is not None:
+        statement = statement.where(Book.seller_id == seller_id)
+    if status:
+        statement = statement.where(Order.status == status)
+    if start:
+        statement = statement.where(Order.order_date >= start)
+    if end:
+        statement = statement.where(Order.order_date < end + timedelta(days=1))
+    return statement.order_by(Order.order_date.desc(), Order.id.desc())
+
+def iter_rows(statement, fetch_size=FETCH_SIZE):
+    """Yield result rows as mappings through a server-side cursor.
+
+    ``yield_per`` turns on streaming results, so only one batch of rows is
+    held in memory at a time regardless of the size of the result.
+    """
+    result = db.session.execute(statement.execution_options(yield_per=fetch_size))
+    for partition in result.mappings().partitions():
+        yield from partition
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+# Leading characters spreadsheets treat as the start of a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def _csv_value(value):
+    # Titles and usernames are user-supplied; stop Excel evaluating "=HYPERLINK(...)"
+    value = _export_value(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def stream_csv(rows, columns):
+    """Encode rows as CSV, yielding roughly CHUNK_SIZE pieces."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_csv_value(row[column]) for column in columns])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def stream_ndjson(rows, columns):
+    """Encode rows as newline-delimited JSON, yielding roughly CHUNK_SIZE pieces."""
+    chunk, size = [], 0
+    for row in rows:
+        line = json.dumps({column: _export_value(row[column]) for column in columns}) + "\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk, size = [], 0
+    yield "".join(chunk)
+
+def export_response(statement, columns, export_format, filename):
+    """Stream the rows of `statement` as a CSV or NDJSON download."""
+    encode = stream_ndjson if export_format == 'ndjson' else stream_csv
+    export_format = 'ndjson' if export_format == 'ndjson' else 'csv'
+    # The request context (and its DB session) stays open until the last chunk
+    body = stream_with_context(encode(iter_rows(statement), columns))
+    return Response(
+        body,
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{export_format}"'}
+    )
@@ -0,0 +1,329 @@
+# In-process metrics in the Prometheus text format. Recording is a dict
+# lookup and a locked increment, cheap enough to leave on in production.
+# Values are per process: with several gunicorn workers each one serves
+# its own /metrics, so scrape them individually or sum them.
+import hmac
+import math
+import time
+import threading
+from bisect import bisect_left
+
+# Seconds; covers fast cached pages up to slow exports
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _label_text(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """The series for these label values, created on first use."""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _series(self):
+        with self._lock:
+            return sorted(self._children.items())
+
+    def _samples(self):
+        """(suffix, label text, value) for every series."""
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return '\n'.join(lines)
+
+class _Value:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set(self, value):
+        self.value = float(value)
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for key, child in self._series():
+            yield '', _label_text(self.labelnames, key), child.value
+
+class Gauge(_Metric):
+    """A value that goes up and down; `function` is read at scrape time instead."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def dec(self, amount=1):
+        self.labels().dec(amount)
+
+    def _samples(self):
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception as e:
+                print(f"[METRICS] Could not read {self.name}: {e}")
+                return
+            if value is not None:
+                yield '', '', value
+            return
+        for key, child in self._series():
+            yield '', _label_text(self.labelnames, key), child.value
+
+class _HistogramValue:
+    __slots__ = ('buckets', 'counts', 'sum', '_lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self):
+        return _Timer(self)
+
+class _Timer:
+    def __init__(self, target):
+        self.target = target
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.target.observe(time.perf_counter() - self.started)
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self):
+        """Context manager that observes the duration of its block."""
+        return self.labels().time()
+
+    def _samples(self):
+        for key, child in self._series():
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield '_bucket', _label_text(self.labelnames, key, ('le', _format_value(bound))), cumulative
+            yield '_sum', _label_text(self.labelnames, key), total
+            yield '_count', _label_text(self.labelnames, key), cumulative
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), function=None):
+        return self._register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    'bookbazaar_http_request_duration_seconds', 'Request latency.', ['blueprint', 'endpoint', 'method'])
+REQUESTS = registry.counter(
+    'bookbazaar_http_requests_total', 'Requests by response status.', ['blueprint', 'endpoint', 'method', 'status'])
+REQUEST_DB_TIME = registry.histogram(
+    'bookbazaar_http_request_db_seconds', 'Time spent in SQL per request.', ['blueprint', 'endpoint'])
+ORDERS_PLACED = registry.counter('bookbazaar_orders_placed_total', 'Orders created at checkout.')
+STOCK_OUTS = registry.counter(
+    'bookbazaar_stock_outs_total',
+    'Checkout lines rejected for insufficient stock, and books sold down to zero.', ['reason'])
+DYNAMODB_SYNC_TIME = registry.histogram(
+    'bookbazaar_dynamodb_sync_duration_seconds', 'Outbox batch writes to DynamoDB.', ['table'])
+DYNAMODB_SYNC_FAILURES = registry.counter(
+    'bookbazaar_dynamodb_sync_failures_total', 'Outbox events whose DynamoDB write failed.', ['table'])
+SNS_PUBLISH_TIME = registry.histogram(
+    'bookbazaar_sns_publish_duration_seconds', 'Notification batch publish calls.')
+NOTIFICATIONS = registry.counter(
+    'bookbazaar_notifications_total', 'Notifications by outcome (sent, failed, dropped).', ['result'])
+
+class MetricsExtension:
+    """Records request metrics and serves /metrics for a Flask app.
+
+    Set METRICS_TOKEN to require ``Authorization: Bearer <token>`` on the
+    endpoint when it is reachable from outside the load balancer. With
+    METRICS_REQUIRE_TOKEN (the production default) nothing is recorded or
+    served until METRICS_TOKEN is set.
+    """
+
+    # Endpoints not worth a latency series of their own
+    SKIP_ENDPOINTS = ('metrics', 'static')
+
+    def init_app(self, app):
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        if app.config.get('METRICS_REQUIRE_TOKEN') and not app.config.get('METRICS_TOKEN'):
+            print("[METRICS] /metrics disabled: set METRICS_TOKEN to serve it")
+            return
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/metrics', 'metrics', self.view)
+        self._register_gauges(app)
+        app.extensions['metrics'] = self
+
+    def _register_gauges(self, app):
+        from app.repositories.outbox_repo import OutboxRepository
+        from app.services.notification import queue_depth
+
+        def outbox_pending():
+            with app.app_context():
+                return OutboxRepository().pending_count()
+
+        def outbox_dead_letters():
+            with app.app_context():
+                return OutboxRepository().dead_letter_count()
+
+        def outbox_stuck():
+            with app.app_context():
+                return OutboxRepository().stuck_count(app.config.get('OUTBOX_ALERT_AFTER', 10))
+
+        def outbox_lag():
+            relay = app.extensions.get('outbox_relay')
+            return relay.stats['lag_seconds'] if relay else None
+
+        # The registry is process-wide; point the gauges at the latest app
+        registry.gauge('bookbazaar_notification_queue_depth',
+                       'Notifications waiting to be sent.').function = queue_depth
+        registry.gauge('bookbazaar_outbox_pending',
+                       'Outbox events not yet written to DynamoDB.').function = outbox_pending
+        registry.gauge('bookbazaar_outbox_dead_letters',
+                       'Outbox events parked because DynamoDB rejected them.').function = outbox_dead_letters
+        registry.gauge('bookbazaar_outbox_stuck',
+                       'Outbox events still retrying after OUTBOX_ALERT_AFTER failures.').function = outbox_stuck
+        registry.gauge('bookbazaar_outbox_lag_seconds',
+                       'Age of the oldest outbox event at the last relay pass.').function = outbox_lag
+
+    def _start_request(self):
+        from flask import request
+        request.metrics_started = time.perf_counter()
+
+    def _record(self, status):
+        from flask import request
+        started = getattr(request, 'metrics_started', None)
+        endpoint = request.endpoint or 'unmatched'
+        if started is None or endpoint in self.SKIP_ENDPOINTS:
+            return
+        request.metrics_started = None
+        blueprint = request.blueprint or ''
+        REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(blueprint, endpoint, request.method, status).inc()
+        stats = getattr(request, 'query_stats', None)
+        if stats is not None:
+            REQUEST_DB_TIME.labels(blueprint, endpoint).observe(stats.seconds)
+
+    def _finish_request(self, response):
+        self._record(response.status_code)
+        return response
+
+    def _teardown_request(self, exc):
+        # Only still pending when the view raised
+        self._record(500)
+
+    def view(self):
+        from flask import Response, abort, current_app, request
+        token = current_app.config.get('METRICS_TOKEN')
+        supplied = request.headers.get('Authorization', '').encode()
+        if token and not hmac.compare_digest(supplied, f"Bearer {token}".encode()):
+            abort(401)
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+metrics = MetricsExtension()
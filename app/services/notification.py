@@ -1,17 +1,190 @@
 import os
+import time
+import queue
+import atexit
+import threading
+import weakref
 import app_aws
+from app.services.metrics import NOTIFICATIONS, SNS_PUBLISH_TIME
 
 class LocalNotifier:
     def send(self, email, message):
         print(f"[LOCAL NOTIFICATION] {email}: {message}")
 
-class NotificationService:
+    def send_batch(self, messages):
+        for email, message in messages:
+            self.send(email, message)
+        return []
+
+class MemoryNotifier:
+    """Backend that records notifications in memory (tests, local benchmarks)."""
+
     def __init__(self):
-        self.sns_topic_arn = os.environ.get('SNS_TOPIC_ARN')
-        if self.sns_topic_arn:
-            self.notifier = app_aws.SNSNotifier()
-        else:
-            self.notifier = LocalNotifier()
+        self.sent = []
+        self.batches = []
+
+    def send(self, email, message):
+        self.send_batch([(email, message)])
+
+    def send_batch(self, messages):
+        self.batches.append(list(messages))
+        self.sent.extend(messages)
+        return []
+
+_STOP = object()
+
+# Live dispatchers, for the queue depth gauge
+_dispatchers = weakref.WeakSet()
+
+def queue_depth():
+    """Notifications queued across every dispatcher in this process."""
+    return sum(dispatcher.depth() for dispatcher in list(_dispatchers))
+
+class NotificationDispatcher:
+    """Delivers notifications from a bounded in-process queue on worker threads.
+
+    Workers coalesce queued messages into batches of up to `batch_size`
+    (SNS PublishBatch accepts 10) and retry failures with exponential
+    backoff. On shutdown the queue is drained before the workers exit.
+    """
+
+    def __init__(self, backend, max_queue=1000, workers=2, batch_size=10,
+                 linger=0.05, max_retries=3, base_backoff=0.5, enqueue_timeout=0.01):
+        self.backend = backend
+        self.max_queue = max_queue
+        self.workers = workers
+        self.batch_size = batch_size
+        self.linger = linger
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.enqueue_timeout = enqueue_timeout
+        self.stats = {'sent': 0, 'failed': 0, 'dropped': 0}
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._queue = None
+        self._threads = []
+        self._pid = None
+        self._closed = False
+        _dispatchers.add(self)
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so (re)start them in each process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._threads = [
+                threading.Thread(target=self._work, name=f"notify-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._pid = os.getpid()
+            self._closed = False
+
+    def submit(self, email, message):
+        """Queue a notification without waiting for delivery. Returns False if dropped."""
+        self._ensure_started()
+        if self._closed:
+            self._count('dropped')
+            return False
+        try:
+            self._queue.put((email, message), timeout=self.enqueue_timeout)
+            return True
+        except queue.Full:
+            self._count('dropped')
+            print(f"[NOTIFY] Queue full, dropping notification for {email}")
+            return False
+
+    def depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            batch, stopping = [item], False
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self._deliver(batch)
+            finally:
+                for _ in range(len(batch) + (1 if stopping else 0)):
+                    self._queue.task_done()
+            if stopping:
+                return
+
+    def _deliver(self, batch):
+        pending = batch
+        for attempt in range(self.max_retries + 1):
+            try:
+                with SNS_PUBLISH_TIME.time():
+                    retry = self.backend.send_batch(pending)
+            except Exception as e:
+                print(f"[NOTIFY] Delivery attempt {attempt + 1} failed: {e}")
+                retry = pending
+            self._count('sent', len(pending) - len(retry))
+            pending = retry
+            if not pending:
+                return
+            if attempt < self.max_retries:
+                time.sleep(self.base_backoff * (2 ** attempt))
+        self._count('failed', len(pending))
+        print(f"[NOTIFY] Giving up on {len(pending)} notification(s)")
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+        NOTIFICATIONS.labels(key).inc(amount)
+
+    def flush(self, timeout=5.0):
+        """Block until everything queued so far has been handled."""
+        if self._queue is None:
+            return True
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout=5.0):
+        """Stop accepting work, drain the queue and stop the workers."""
+        if self._pid != os.getpid() or self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+class NotificationService:
+    def __init__(self, backend=None, **dispatcher_options):
+        if backend is None:
+            self.sns_topic_arn = os.environ.get('SNS_TOPIC_ARN')
+            if self.sns_topic_arn:
+                backend = app_aws.SNSNotifier()
+            else:
+                backend = LocalNotifier()
+        self.notifier = backend
+        self.dispatcher = NotificationDispatcher(backend, **dispatcher_options)
+        atexit.register(self.dispatcher.shutdown)
 
     def send(self, email, message):
-        self.notifier.send(email, message)
\ No newline at end of file
+        """Queue a notification; delivery happens off the request thread."""
+        self.dispatcher.submit(email, message)
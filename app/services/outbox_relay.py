@@ -0,0 +1,168 @@
+import json
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from botocore.exceptions import ClientError
+from app.extensions import db
+from app.repositories.outbox_repo import OutboxRepository
+import app_aws
+from app.services.metrics import DYNAMODB_SYNC_FAILURES, DYNAMODB_SYNC_TIME
+
+# DynamoDB rejected the item itself; resending the same payload cannot succeed
+REJECTED_ERROR_CODES = ('ValidationException', 'SerializationException')
+
+def is_rejected(error):
+    """True when the failure is the event's own fault rather than an outage."""
+    if isinstance(error, ValueError):
+        # Payload is not valid JSON
+        return True
+    return isinstance(error, ClientError) and error.response.get('Error', {}).get('Code') in REJECTED_ERROR_CODES
+
+class OutboxRelay:
+    """Background worker that drains the SQL outbox into DynamoDB.
+
+    Events are grouped by target table and written with ``batch_writer``.
+    When a batch fails its events are retried one by one, so a single bad
+    event cannot hold back the rest. Each failed event is retried with
+    exponential backoff capped at ``max_backoff``; because every item is a
+    full put keyed by ``id``, replays are idempotent.
+
+    Outages (throttling, network, IAM, a missing table) are retried for as
+    long as they last; after ``alert_after`` failures the event is reported
+    and counted by the ``bookbazaar_outbox_stuck`` gauge. Only an event
+    DynamoDB rejects outright (see ``is_rejected``) is parked
+    (``dead_lettered_at``) after ``alert_after`` failures and kept, with its
+    last error, until ``app_aws.py relay --redrive`` queues it again.
+    """
+
+    def __init__(self, app, aws_instance=None, batch_size=100, poll_interval=1.0,
+                 base_backoff=2.0, max_backoff=300.0, alert_after=10):
+        self.app = app
+        self.aws = aws_instance or app_aws.aws_app
+        self.repo = OutboxRepository()
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.alert_after = alert_after
+        self.stats = {'dispatched': 0, 'failed': 0, 'stuck': 0, 'dead_lettered': 0, 'lag_seconds': 0.0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def run(self):
+        """Relay loop; runs until stop() is called."""
+        while not self._stop.is_set():
+            try:
+                dispatched = self.drain_once()
+            except Exception as e:
+                print(f"[OUTBOX] Relay error: {e}")
+                dispatched = 0
+            # Keep draining while there is a backlog, otherwise poll
+            if dispatched < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+    def backoff(self, attempts):
+        return min(self.max_backoff, self.base_backoff * (2 ** (attempts - 1)))
+
+    def drain_once(self):
+        """Dispatch one batch of due events. Returns the number written."""
+        with self.app.app_context():
+            try:
+                events = self.repo.get_due(self.batch_size)
+                by_target = defaultdict(list)
+                for event in events:
+                    by_target[event.target].append(event)
+
+                dispatched = 0
+                now = datetime.utcnow()
+                for target, batch in by_target.items():
+                    try:
+                        with DYNAMODB_SYNC_TIME.labels(target).time():
+                            self._write(target, batch)
+                    except Exception as e:
+                        print(f"DynamoDB Sync Error ({target}): {e}")
+                        dispatched += self._write_each(target, batch, e, now)
+                        continue
+                    for event in batch:
+                        db.session.delete(event)
+                    dispatched += len(batch)
+
+                db.session.commit()
+                self.stats['dispatched'] += dispatched
+                self.stats['lag_seconds'] = self._lag(now)
+                return dispatched
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _write_each(self, target, batch, error, now):
+        """Retry a failed batch event by event. Returns the number written.
+
+        Two failures in a row that are not rejected items mean the table
+        itself is unreachable, so the rest of the batch is marked failed
+        without another round trip each.
+        """
+        if len(batch) == 1:
+            self._failed(target, batch[0], error, now)
+            return 0
+        dispatched, consecutive = 0, 0
+        for event in batch:
+            if consecutive >= 2:
+                self._failed(target, event, error, now)
+                continue
+            try:
+                self._write(target, [event])
+            except Exception as e:
+                consecutive = 0 if is_rejected(e) else consecutive + 1
+                error = e
+                self._failed(target, event, e, now)
+                continue
+            consecutive = 0
+            db.session.delete(event)
+            dispatched += 1
+        return dispatched
+
+    def _failed(self, target, event, error, now):
+        self.stats['failed'] += 1
+        DYNAMODB_SYNC_FAILURES.labels(target).inc()
+        event.attempts += 1
+        event.last_error = str(error)[:1000]
+        if event.attempts >= self.alert_after and is_rejected(error):
+            event.dead_lettered_at = now
+            self.stats['dead_lettered'] += 1
+            print(f"[OUTBOX] Parked event {event.id} ({target}) after {event.attempts} attempts: {event.last_error}")
+            return
+        if event.attempts == self.alert_after:
+            self.stats['stuck'] += 1
+            print(f"[OUTBOX] Event {event.id} ({target}) still failing after {event.attempts} attempts, "
+                  f"retrying every {self.backoff(event.attempts):.0f}s: {event.last_error}")
+        event.available_at = now + timedelta(seconds=self.backoff(event.attempts))
+
+    def _write(self, target, events):
+        table = self.aws.table(target)
+        with table.batch_writer(overwrite_by_pkeys=['id']) as writer:
+            for event in events:
+                # DynamoDB rejects floats; decode numbers straight to Decimal
+                writer.put_item(Item=json.loads(event.payload, parse_float=Decimal))
+
+    def _lag(self, now):
+        oldest = self.repo.oldest_created_at()
+        return (now - oldest).total_seconds() if oldest else 0.0
+
+    def lag_seconds(self):
+        """Age of the oldest event still waiting to reach DynamoDB."""
+        with self.app.app_context():
+            return self._lag(datetime.utcnow())
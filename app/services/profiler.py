@@ -0,0 +1,210 @@
+# On-demand profiling of a live worker. Nothing runs until an admin asks
+# for a profile: the only per-request cost is one header lookup.
+import hmac
+import io
+import os
+import sys
+import time
+import uuid
+import marshal
+import pstats
+import cProfile
+import threading
+from collections import Counter, deque
+from datetime import datetime
+from flask import current_app, request
+
+PROFILE_HEADER = 'X-Profile'
+
+class StoredProfile:
+    """One finished profile, kept in memory until it is downloaded or evicted."""
+
+    def __init__(self, kind, label, seconds, samples, data):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind  # 'sample' (collapsed stacks) or 'request' (pstats)
+        self.label = label
+        self.created_at = datetime.utcnow()
+        self.seconds = seconds
+        self.samples = samples
+        self.data = data
+        self.pid = os.getpid()
+
+class StackSampler:
+    """Samples every thread's stack at a fixed interval.
+
+    Produces collapsed stacks (``thread;module:function;... count``), the
+    input format of flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+
+    @staticmethod
+    def _frame_name(frame):
+        code = frame.f_code
+        module = frame.f_globals.get('__name__', os.path.basename(code.co_filename))
+        return f"{module}:{code.co_name}".replace(';', ':')
+
+    def sample(self, seconds, stop=None):
+        """Sample for `seconds`; returns (Counter of collapsed stack -> samples, sample rounds)."""
+        own = threading.get_ident()
+        stacks = Counter()
+        rounds = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline and not (stop and stop.is_set()):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}").replace(';', ':'))
+                stacks[';'.join(reversed(stack))] += 1
+            rounds += 1
+            time.sleep(self.interval)
+        return stacks, rounds
+
+def collapsed_text(stacks):
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+class Profiler:
+    """Admin-triggered sampling of this worker, and cProfile of single requests.
+
+    - ``start_sampling(seconds)`` samples every thread in a background
+      thread and stores collapsed stacks.
+    - A request sent with an ``X-Profile`` header by a logged-in admin (or
+      carrying PROFILER_TOKEN as the header value) runs under cProfile and
+      is stored as pstats. The response carries ``X-Profile-Id``.
+
+    Profiles live in memory in the worker that made them (the last
+    PROFILER_MAX_PROFILES are kept), so with several workers a profile is
+    downloadable only from the worker that recorded it.
+    """
+
+    def __init__(self, max_profiles=20):
+        self._profiles = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+        self._sampling = None
+        self._stop = threading.Event()
+
+    def init_app(self, app):
+        if not app.config.get('PROFILER_ENABLED', True):
+            return
+        self._profiles = deque(self._profiles, maxlen=app.config.get('PROFILER_MAX_PROFILES', 20))
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+        app.extensions['profiler'] = self
+
+    # --- stored profiles ---
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles.appendleft(profile)
+        return profile
+
+    def list(self):
+        with self._lock:
+            return list(self._profiles)
+
+    def get(self, profile_id):
+        with self._lock:
+            return next((profile for profile in self._profiles if profile.id == profile_id), None)
+
+    # --- sampling ---
+
+    @property
+    def sampling(self):
+        """True while a sampling run is in progress in this worker."""
+        return self._sampling is not None and self._sampling.is_alive()
+
+    def start_sampling(self, seconds, interval=0.005, label=None):
+        """Start sampling in the background. Returns False if a run is already active."""
+        with self._lock:
+            if self.sampling:
+                return False
+            self._stop.clear()
+            self._sampling = threading.Thread(
+                target=self._sample, args=(seconds, interval, label or f"{seconds:g}s sample"),
+                name="profiler-sampler", daemon=True
+            )
+            self._sampling.start()
+        return True
+
+    def stop_sampling(self, timeout=5.0):
+        self._stop.set()
+        if self._sampling:
+            self._sampling.join(timeout)
+
+    def _sample(self, seconds, interval, label):
+        started = time.perf_counter()
+        stacks, rounds = StackSampler(interval).sample(seconds, self._stop)
+        self.add(StoredProfile('sample', label, time.perf_counter() - started, rounds, collapsed_text(stacks)))
+
+    # --- single requests ---
+
+    def _profile_requested(self):
+        value = request.headers.get(PROFILE_HEADER)
+        if not value:
+            return False
+        token = current_app.config.get('PROFILER_TOKEN')
+        if token and hmac.compare_digest(value.encode(), token.encode()):
+            return True
+        from app.services.authorization import current_principal
+        principal = current_principal()
+        return principal is not None and principal.role == 'admin'
+
+    def _start_request(self):
+        if PROFILE_HEADER not in request.headers or not self._profile_requested():
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiler (e.g. a debugger) already owns the hook
+            print(f"[PROFILER] Cannot profile {request.path}: {e}")
+            return
+        request.profiler = (profile, time.perf_counter())
+
+    def _stop_request(self):
+        running = getattr(request, 'profiler', None)
+        if running is None:
+            return None
+        request.profiler = None
+        profile, started = running
+        profile.disable()
+        return profile, time.perf_counter() - started
+
+    def _finish_request(self, response):
+        finished = self._stop_request()
+        if finished is not None:
+            profile, seconds = finished
+            stats = pstats.Stats(profile)
+            label = f"{request.method} {request.full_path.rstrip('?')}"
+            stored = self.add(StoredProfile('request', label, seconds, stats.total_calls,
+                                            marshal.dumps(stats.stats)))
+            response.headers['X-Profile-Id'] = stored.id
+        return response
+
+    def _teardown_request(self, exc):
+        # The view raised before after_request ran
+        self._stop_request()
+
+class _MarshalledStats:
+    """Lets pstats.Stats load a request profile from memory instead of a file."""
+
+    def __init__(self, data):
+        self.stats = marshal.loads(data)
+
+    def create_stats(self):
+        pass
+
+def pstats_text(stored, sort='cumulative', limit=60):
+    """Human-readable top functions of a request profile."""
+    stream = io.StringIO()
+    pstats.Stats(_MarshalledStats(stored.data), stream=stream).sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+profiler = Profiler()
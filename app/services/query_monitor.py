@@ -0,0 +1,152 @@
+import re
+import time
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from flask import current_app, request, render_template
+from sqlalchemy import event
+from app.extensions import db
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))*\s*\)')
+
+def fingerprint(statement):
+    """SQL with literals and IN-list lengths normalized, so repeats of one query compare equal."""
+    statement = _WHITESPACE_RE.sub(' ', statement).strip()
+    statement = _STRING_RE.sub('?', statement)
+    statement = _NUMBER_RE.sub('?', statement)
+    return _IN_LIST_RE.sub('(?)', statement)
+
+class NPlusOneError(AssertionError):
+    """Raised in QUERY_MONITOR_RAISE mode when a request repeats one query too often."""
+
+class QueryStats:
+    """Statements executed while one request (or capture block) was active."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold):
+        """(fingerprint, count) pairs executed at least `threshold` times, most frequent first."""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count >= threshold]
+
+class QueryMonitor:
+    """Per-request SQL statistics from engine events.
+
+    Every request gets the number of statements, their total time and the
+    statements it repeated. They are returned in X-Query-* and
+    Server-Timing headers, and shown in a toolbar on HTML pages when
+    QUERY_MONITOR_TOOLBAR is set. Requests over QUERY_BUDGET statements,
+    or repeating one statement QUERY_REPEAT_THRESHOLD times (the N+1
+    pattern), are logged. With QUERY_MONITOR_RAISE the N+1 case raises
+    NPlusOneError instead, which fails the test that made the request.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def init_app(self, app):
+        if not app.config.get('QUERY_MONITOR_ENABLED', True):
+            return
+        with app.app_context():
+            engine = db.engine
+        if not event.contains(engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+            event.listen(engine, 'handle_error', self._handle_error)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+        app.extensions['query_monitor'] = self
+
+    def _active(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self._active():
+            conn.info['query_monitor_started'] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        active = self._active()
+        started = conn.info.pop('query_monitor_started', None)
+        if not active or started is None:
+            return
+        elapsed = time.perf_counter() - started
+        for stats in active:
+            stats.record(statement, elapsed)
+
+    def _handle_error(self, context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None:
+            context.connection.info.pop('query_monitor_started', None)
+
+    @contextmanager
+    def capture(self):
+        """Collect the statements run by this thread inside the block."""
+        stats = QueryStats()
+        self._active().append(stats)
+        try:
+            yield stats
+        finally:
+            self._active().remove(stats)
+
+    def current(self):
+        """Stats of the innermost active request or capture block, or None."""
+        active = self._active()
+        return active[-1] if active else None
+
+    def _start_request(self):
+        request.query_stats = QueryStats()
+        self._active().append(request.query_stats)
+
+    def _teardown_request(self, exc):
+        stats = getattr(request, 'query_stats', None)
+        if stats is not None and stats in self._active():
+            self._active().remove(stats)
+
+    def _finish_request(self, response):
+        stats = getattr(request, 'query_stats', None)
+        if stats is None:
+            return response
+        config = current_app.config
+        threshold = config.get('QUERY_REPEAT_THRESHOLD', 5)
+        repeated = stats.repeated(threshold)
+
+        response.headers['X-Query-Count'] = str(stats.count)
+        response.headers['X-Query-Time-Ms'] = f"{stats.seconds * 1000:.1f}"
+        response.headers['X-Query-Repeated'] = str(len(repeated))
+        response.headers.add('Server-Timing', f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"')
+
+        route = f"{request.method} {request.path}"
+        budget = config.get('QUERY_BUDGET', 30)
+        if budget and stats.count > budget:
+            print(f"[QUERY] {route} ran {stats.count} queries in {stats.seconds * 1000:.1f}ms (budget {budget})")
+        if repeated:
+            sql, count = repeated[0]
+            if config.get('QUERY_MONITOR_RAISE'):
+                raise NPlusOneError(f"{route} ran the same query {count} times (N+1?): {sql}")
+            print(f"[QUERY] {route} repeated a query {count} times (N+1?): {sql[:200]}")
+
+        if config.get('QUERY_MONITOR_TOOLBAR') and response.mimetype == 'text/html' \
+                and not response.is_streamed and response.status_code == 200:
+            html = response.get_data(as_text=True)
+            if '</body>' in html:
+                toolbar = render_template('query_toolbar.html', stats=stats, repeated=repeated,
+                                          budget=budget, threshold=threshold)
+                head, tail = html.rsplit('</body>', 1)
+                response.set_data(head + toolbar + '</body>' + tail)
+        return response
+
+query_monitor = QueryMonitor()
@@ -0,0 +1,82 @@
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager, joinedload
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.repositories.keyset import keyset_paginate
+
+class SellerAnalytics:
+    """Sales and inventory figures for one seller, aggregated in SQL.
+
+    Every method is a single query filtered on ``book.seller_id`` and joined
+    to orders through ``order.book_id``, both indexed, so the cost depends on
+    the rows returned rather than on how many titles the seller has.
+    """
+
+    def inventory_summary(self, seller_id):
+        """{'book_count', 'total_stock'} across the seller's listings."""
+        book_count, total_stock = db.session.query(
+            func.count(Book.id),
+            func.coalesce(func.sum(Book.stock), 0)
+        ).filter(Book.seller_id == seller_id).one()
+        return {'book_count': book_count, 'total_stock': total_stock}
+
+    def sales_summary(self, seller_id):
+        """{'order_count', 'units_sold', 'total_revenue', 'average_order_value'}."""
+        order_count, units_sold, total_revenue = db.session.query(
+            func.count(Order.id),
+            func.coalesce(func.sum(Order.quantity), 0),
+            func.coalesce(func.sum(Order.total_price), 0)
+        ).join(Book, Order.book_id == Book.id).filter(Book.seller_id == seller_id).one()
+        return {
+            'order_count': order_count,
+            'units_sold': units_sold,
+            'total_revenue': total_revenue,
+            'average_order_value': round(total_revenue / order_count, 2) if order_count else 0
+        }
+
+    def books_page(self, seller_id, per_page, cursor=None, direction="next"):
+        """A page of the seller's listings, newest first."""
+        return keyset_paginate(
+            Book.query.filter(Book.seller_id == seller_id),
+            [Book.created_at, Book.id],
+            key=lambda book: (book.created_at, book.id),
+            per_page=per_page,
+            cursor=cursor,
+            direction=direction
+        )
+
+    def sales_page(self, seller_id, per_page, cursor=None, direction="next"):
+        """A page of orders for the seller's books, newest first, with book and customer loaded."""
+        query = (
+            Order.query
+            .join(Order.book)
+            .filter(Book.seller_id == seller_id)
+            .options(contains_eager(Order.book), joinedload(Order.user))
+        )
+        return keyset_paginate(
+            query,
+            [Order.order_date, Order.id],
+            key=lambda order: (order.order_date, order.id),
+            per_page=per_page,
+            cursor=cursor,
+            direction=direction
+        )
+
+    def book_breakdown(self, seller_id, limit=20):
+        """Per-title orders, units and revenue, best sellers first."""
+        revenue = func.coalesce(func.sum(Order.total_price), 0)
+        rows = db.session.query(
+            Book.id,
+            Book.title,
+            func.count(Order.id),
+            func.coalesce(func.sum(Order.quantity), 0),
+            revenue
+        ).join(Order, Order.book_id == Book.id).filter(
+            Book.seller_id == seller_id
+        ).group_by(Book.id, Book.title).order_by(revenue.desc(), Book.id).limit(limit).all()
+        return [
+            {'book_id': book_id, 'title': title, 'order_count': order_count,
+             'units_sold': units_sold, 'revenue': book_revenue}
+            for book_id, title, order_count, units_sold, book_revenue in rows
+        ]
@@ -0,0 +1,230 @@
+# Slow-query log: statements slower than SLOW_QUERY_THRESHOLD_MS are
+# aggregated by fingerprint and written to the slow_query table with their
+# query plan, so the admin page shows which queries need an index.
+import re
+import time
+import hashlib
+import threading
+import weakref
+from datetime import datetime
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models.slow_query import SlowQuery
+from app.services.query_monitor import fingerprint
+
+# Statements EXPLAIN can describe without running them
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+EXPLAIN_PREFIX = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'mysql': 'EXPLAIN ',
+    'mariadb': 'EXPLAIN ',
+    'postgresql': 'EXPLAIN ',
+}
+
+# Distinct statement shapes buffered between flushes; new shapes beyond this are dropped
+MAX_PENDING = 500
+
+_SQLITE_SCAN_RE = re.compile(r'^\s*SCAN (?:TABLE )?(\w+)(?!.*\bUSING\b)', re.MULTILINE)
+_SQLITE_SORT_RE = re.compile(r'USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT)')
+_MYSQL_SCAN_RE = re.compile(r'\btable=(\w+)\b.*\btype=ALL\b')
+_POSTGRES_SCAN_RE = re.compile(r'Seq Scan on (\w+)')
+
+def plan_warnings(plan):
+    """Full table scans and index-less sorts spotted in a stored plan."""
+    if not plan:
+        return []
+    warnings = [f"Full scan of {table}" for table in _SQLITE_SCAN_RE.findall(plan)]
+    warnings += [f"Full scan of {table}" for table in _MYSQL_SCAN_RE.findall(plan)]
+    warnings += [f"Full scan of {table}" for table in _POSTGRES_SCAN_RE.findall(plan)]
+    warnings += [f"Temporary sort for {clause}" for clause in _SQLITE_SORT_RE.findall(plan)]
+    return list(dict.fromkeys(warnings))
+
+def _format_sqlite_plan(rows):
+    # EXPLAIN QUERY PLAN rows are (id, parent, notused, detail); indent children under parents
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        level = depth.get(parent, -1) + 1
+        depth[node_id] = level
+        lines.append('  ' * level + detail)
+    return '\n'.join(lines)
+
+def _format_plan(dialect, result):
+    rows = result.fetchall()
+    if dialect == 'sqlite':
+        return _format_sqlite_plan(rows)
+    keys = list(result.keys())
+    if len(keys) == 1:
+        # PostgreSQL: one line of text per row
+        return '\n'.join(str(row[0]) for row in rows)
+    # MySQL: one row per table access
+    return '\n'.join(' '.join(f"{key}={value}" for key, value in zip(keys, row) if value is not None)
+                     for row in rows)
+
+class SlowQueryLog:
+    """Records statements over SLOW_QUERY_THRESHOLD_MS from engine events.
+
+    Executions are aggregated in memory (count, total and max time) and
+    written to the slow_query table by ``flush()``, which the background
+    SlowQueryFlusher calls every SLOW_QUERY_FLUSH_INTERVAL seconds. The
+    first time a statement shape is flushed its EXPLAIN (EXPLAIN QUERY PLAN
+    on SQLite) is stored with it. Bound parameters are only kept in memory
+    to run that EXPLAIN; the table holds the fingerprint and the plan.
+    """
+
+    def __init__(self):
+        self._thresholds = weakref.WeakKeyDictionary()  # engine -> seconds
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def init_app(self, app):
+        if not app.config.get('SLOW_QUERY_LOG_ENABLED', True):
+            return
+        with app.app_context():
+            engine = db.engine
+        self._thresholds[engine] = app.config.get('SLOW_QUERY_THRESHOLD_MS', 100) / 1000.0
+        if not event.contains(engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+            event.listen(engine, 'handle_error', self._handle_error)
+        app.extensions['slow_query_log'] = self
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info['slow_query_started'] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('slow_query_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        threshold = self._thresholds.get(conn.engine)
+        if threshold is None or elapsed < threshold or getattr(self._local, 'flushing', False):
+            return
+        self.record(conn.dialect.name, statement, None if executemany else parameters, elapsed)
+
+    def _handle_error(self, context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None:
+            context.connection.info.pop('slow_query_started', None)
+
+    def record(self, dialect, statement, parameters, seconds):
+        key = hashlib.sha1(fingerprint(statement).encode()).hexdigest()
+        endpoint = request.endpoint if has_request_context() else threading.current_thread().name
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                if len(self._pending) >= MAX_PENDING:
+                    return
+                entry = self._pending[key] = {
+                    'fingerprint': fingerprint(statement), 'statement': statement,
+                    'parameters': parameters, 'dialect': dialect,
+                    'count': 0, 'total': 0.0, 'max': 0.0, 'first_seen': now,
+                }
+            entry['count'] += 1
+            entry['total'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+            entry['last_seen'] = now
+            entry['endpoint'] = endpoint
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def clear(self):
+        """Drop executions not yet flushed."""
+        with self._lock:
+            self._pending = {}
+
+    def explain(self, dialect, statement, parameters):
+        """The statement's query plan as text, or None when it cannot be explained."""
+        prefix = EXPLAIN_PREFIX.get(dialect)
+        words = statement.lstrip().split(None, 1)
+        if prefix is None or not words or words[0].upper() not in EXPLAINABLE:
+            return None
+        try:
+            # Own connection, so a failed EXPLAIN cannot abort the session's transaction
+            with db.engine.connect() as conn:
+                return _format_plan(dialect, conn.exec_driver_sql(prefix + statement, parameters or ()))
+        except Exception as e:
+            return f"EXPLAIN failed: {e}"
+
+    def flush(self):
+        """Write buffered executions to slow_query. Needs an app context; returns rows touched."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        self._local.flushing = True
+        try:
+            existing = {row.fingerprint_hash: row for row in
+                        SlowQuery.query.filter(SlowQuery.fingerprint_hash.in_(list(pending)))}
+            plans = {key: self.explain(entry['dialect'], entry['statement'], entry['parameters'])
+                     for key, entry in pending.items() if key not in existing}
+            for key, entry in pending.items():
+                row = existing.get(key)
+                if row is None:
+                    row = SlowQuery(fingerprint_hash=key, fingerprint=entry['fingerprint'],
+                                    dialect=entry['dialect'], plan=plans[key], first_seen=entry['first_seen'],
+                                    count=0, total_seconds=0.0, max_seconds=0.0)
+                    db.session.add(row)
+                row.count += entry['count']
+                row.total_seconds += entry['total']
+                row.max_seconds = max(row.max_seconds, entry['max'])
+                row.last_seen = entry['last_seen']
+                row.endpoint = entry['endpoint'][:200] if entry['endpoint'] else None
+            db.session.commit()
+        except SQLAlchemyError as e:
+            # e.g. another worker inserted one of these fingerprints first, or
+            # the database was locked; keep the executions for the next flush
+            db.session.rollback()
+            self._requeue(pending)
+            print(f"[SLOW QUERY] Flush deferred: {e.__class__.__name__}")
+            return 0
+        finally:
+            self._local.flushing = False
+        return len(pending)
+
+    def _requeue(self, pending):
+        with self._lock:
+            for key, entry in pending.items():
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = entry
+                    continue
+                current['count'] += entry['count']
+                current['total'] += entry['total']
+                current['max'] = max(current['max'], entry['max'])
+                current['first_seen'] = min(current['first_seen'], entry['first_seen'])
+
+class SlowQueryFlusher:
+    """Periodically writes buffered slow queries to the database."""
+
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="slow-query-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    slow_query_log.flush()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[SLOW QUERY] Flush failed: {e}")
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,198 @@
+import json
+import threading
+from collections import Counter
+from sqlalchemy import event, func, case, inspect, select
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+from app.repositories.statistics_repo import StatisticsRepository, stock_bucket, REFRESHED_AT
+
+repo = StatisticsRepository()
+
+class StatisticsService:
+    """Admin dashboard aggregates kept in the store_statistic summary table.
+
+    Counters are adjusted incrementally once ORM writes to users, books
+    and orders commit, and fully recomputed by `refresh()` (on a schedule
+    and after bulk operations that bypass the ORM). The dashboard reads
+    everything back with a single query.
+    """
+    TOP_BOOKS = 5
+
+    def refresh(self):
+        """Recompute every statistic from the base tables."""
+        values = Counter()
+
+        for role, count in db.session.query(User.role, func.count(User.id)).group_by(User.role):
+            values[f'users.{role or "buyer"}'] += count
+
+        total, in_stock, out_of_stock = db.session.query(
+            func.count(Book.id),
+            func.sum(case((Book.stock > 0, 1), else_=0)),
+            func.sum(case((func.coalesce(Book.stock, 0) == 0, 1), else_=0))
+        ).one()
+        values['books.total'] = total or 0
+        values['books.in_stock'] = in_stock or 0
+        values['books.out_of_stock'] = out_of_stock or 0
+
+        values['orders.total'] = 0
+        values['orders.revenue'] = 0
+        for status, count, revenue in db.session.query(
+            Order.status, func.count(Order.id), func.sum(Order.total_price)
+        ).group_by(Order.status):
+            values['orders.total'] += count
+            values['orders.revenue'] += revenue or 0
+            values[f'orders.status.{status or "Placed"}'] += count
+
+        top_books = db.session.query(
+            Book.title,
+            Book.author,
+            func.count(Order.id).label('order_count')
+        ).join(Order).group_by(Book.id).order_by(func.count(Order.id).desc()).limit(self.TOP_BOOKS).all()
+
+        repo.replace_all(values, {
+            'books.top': json.dumps([
+                {'title': title, 'author': author, 'order_count': count}
+                for title, author, count in top_books
+            ])
+        })
+
+    def snapshot(self):
+        """Read all dashboard aggregates. Returns (stats, top_books, order_status_counts)."""
+        rows = repo.get_all()
+        if not any(row.name == REFRESHED_AT for row in rows):
+            self.refresh()
+            rows = repo.get_all()
+
+        values = {row.name: row.value for row in rows}
+        payloads = {row.name: row.payload for row in rows}
+        refreshed_at = next(row.updated_at for row in rows if row.name == REFRESHED_AT)
+
+        stats = {
+            'total_users': int(values.get('users.buyer', 0)),
+            'total_sellers': int(values.get('users.seller', 0)),
+            'total_books': int(values.get('books.total', 0)),
+            'total_orders': int(values.get('orders.total', 0)),
+            'total_revenue': values.get('orders.revenue', 0),
+            'out_of_stock': int(values.get('books.out_of_stock', 0)),
+            'in_stock': int(values.get('books.in_stock', 0)),
+            'refreshed_at': refreshed_at
+        }
+        top_books = json.loads(payloads.get('books.top') or '[]')
+        prefix = 'orders.status.'
+        order_status_counts = [
+            {'status': name[len(prefix):], 'count': int(value)}
+            for name, value in sorted(values.items())
+            if name.startswith(prefix) and value > 0
+        ]
+        return stats, top_books, order_status_counts
+
+statistics = StatisticsService()
+
+
+def _apply(obj, sign, deltas):
+    if isinstance(obj, User):
+        deltas[f'users.{obj.role or "buyer"}'] += sign
+    elif isinstance(obj, Book):
+        deltas['books.total'] += sign
+        bucket = stock_bucket(obj.stock)
+        if bucket:
+            deltas[bucket] += sign
+    elif isinstance(obj, Order):
+        deltas['orders.total'] += sign
+        deltas['orders.revenue'] += sign * (obj.total_price or 0)
+        deltas[f'orders.status.{obj.status or "Placed"}'] += sign
+
+
+def _old_and_new(session, obj, attribute):
+    """(old, new) for a changed attribute, or None if it is unchanged."""
+    state = inspect(obj)
+    history = state.attrs[attribute].history
+    if not history.added:
+        return None
+    if history.deleted:
+        old = history.deleted[0]
+    else:
+        # Assigned while expired (e.g. after a commit); read the stored value
+        column = state.mapper.columns[attribute]
+        old = session.connection().execute(
+            select(column).where(state.mapper.primary_key[0] == state.identity[0])
+        ).scalar()
+    new = history.added[0]
+    return None if old == new else (old, new)
+
+
+def _apply_changes(session, obj, deltas):
+    if isinstance(obj, User):
+        change = _old_and_new(session, obj, 'role')
+        if change:
+            deltas[f'users.{change[0] or "buyer"}'] -= 1
+            deltas[f'users.{change[1] or "buyer"}'] += 1
+    elif isinstance(obj, Book):
+        change = _old_and_new(session, obj, 'stock')
+        if change:
+            for bucket, sign in ((stock_bucket(change[0]), -1), (stock_bucket(change[1]), 1)):
+                if bucket:
+                    deltas[bucket] += sign
+    elif isinstance(obj, Order):
+        change = _old_and_new(session, obj, 'status')
+        if change:
+            deltas[f'orders.status.{change[0] or "Placed"}'] -= 1
+            deltas[f'orders.status.{change[1] or "Placed"}'] += 1
+        change = _old_and_new(session, obj, 'total_price')
+        if change:
+            deltas['orders.revenue'] += (change[1] or 0) - (change[0] or 0)
+
+
+@event.listens_for(db.session, 'before_flush')
+def _track_changes(session, flush_context, instances):
+    """Fold ORM writes into the dashboard counters once the transaction commits."""
+    deltas = Counter()
+    for obj in session.new:
+        _apply(obj, 1, deltas)
+    for obj in session.deleted:
+        _apply(obj, -1, deltas)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            _apply_changes(session, obj, deltas)
+    if deltas:
+        repo.defer(deltas, session)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_deferred(session):
+    repo.apply_deferred(session)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_deferred(session):
+    repo.discard_deferred(session)
+
+
+class StatisticsRefresher:
+    """Periodically recomputes all statistics to fold in changes made outside the ORM."""
+
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="stats-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    statistics.refresh()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[STATS] Refresh failed: {e}")
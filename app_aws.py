@@ -1,10 +1,11 @@
 import boto3
 import os
 import sys
+import threading
 import argparse
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 from decimal import Decimal
-from werkzeug.security import generate_password_hash
 # Hardcoded Configuration (Edit these directly)
 AWS_REGION = "us-east-1"
 SNS_TOPIC_ARN = "arn:aws:sns:us-east-1:148761657981:bookstore_notification"
@@ -14,15 +15,90 @@ DYNAMODB_BOOKS_TABLE = "BookBazaarBooks"
 DYNAMODB_USERS_TABLE = "BookBazaarUsers"
 DYNAMODB_ORDERS_TABLE = "BookBazaarOrders"
 
+# DynamoDB Global Secondary Indexes
+USERS_EMAIL_INDEX = "EmailIndex"
+ORDERS_SELLER_DATE_INDEX = "SellerDateIndex"
+
+# botocore connection tuning (shared by every client in the process)
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", 50))
+AWS_RETRY_MODE = os.environ.get("AWS_RETRY_MODE", "adaptive")
+AWS_MAX_ATTEMPTS = int(os.environ.get("AWS_MAX_ATTEMPTS", 5))
+AWS_CONNECT_TIMEOUT = float(os.environ.get("AWS_CONNECT_TIMEOUT", 2))
+AWS_READ_TIMEOUT = float(os.environ.get("AWS_READ_TIMEOUT", 5))
+
 class AWSApp:
-    """Central point for AWS resource management."""
+    """Central point for AWS resource management.
+    
+    One instance is shared by the whole process. Low-level clients are
+    thread-safe and shared; boto3 resources are not, so each thread gets its
+    own DynamoDB resource and table handles, all of which send through the
+    shared DynamoDB client. The process therefore has one connection pool
+    per service (AWS_MAX_POOL_CONNECTIONS) however many threads use it.
+    Everything is created once and reused, so requests stop paying for
+    client setup and TLS handshakes.
+    After a fork (gunicorn workers) the child drops the parent's
+    connections and lazily builds its own.
+    """
     
     def __init__(self):
         self.region = AWS_REGION
-        self._dynamodb = None
-        self._sns = None
-        self._sns = None
+        self.config = BotoConfig(
+            region_name=self.region,
+            max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            connect_timeout=AWS_CONNECT_TIMEOUT,
+            read_timeout=AWS_READ_TIMEOUT,
+            retries={'mode': AWS_RETRY_MODE, 'max_attempts': AWS_MAX_ATTEMPTS}
+        )
+        self.reset()
+    
+    def reset(self):
+        """Forget every session, client and handle (used after fork)."""
+        self._lock = threading.Lock()  # may have been held by another thread at fork time
+        self._pid = os.getpid()
+        self._session = None
+        self._clients = {}
+        self._local = threading.local()
         self._iam = None
+    
+    def _ensure_process(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self.reset()
+    
+    def _get_session(self):
+        # Callers hold self._lock; boto3 sessions are not thread-safe
+        if self._session is None:
+            self._session = boto3.session.Session(region_name=self.region)
+        return self._session
+    
+    def client(self, service_name):
+        """Process-wide, thread-safe low-level client for a service."""
+        self._ensure_process()
+        client = self._clients.get(service_name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(service_name)
+                if client is None:
+                    client = self._get_session().client(service_name, config=self.config)
+                    self._clients[service_name] = client
+        return client
+    
+    def table(self, table_name):
+        """Cached DynamoDB Table handle for the calling thread."""
+        tables = self._thread_state().setdefault('tables', {})
+        table = tables.get(table_name)
+        if table is None:
+            table = tables[table_name] = self.dynamodb.Table(table_name)
+        return table
+    
+    def _thread_state(self):
+        self._ensure_process()
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            state = self._local.state = {}
+        return state
 
     def check_iam_permission(self, user_role, resource):
         """Simulate IAM policy check."""
@@ -36,19 +112,30 @@ class AWSApp:
         
     @property
     def dynamodb(self):
-        if self._dynamodb is None:
-            self._dynamodb = boto3.resource('dynamodb', region_name=self.region)
-        return self._dynamodb
+        """DynamoDB resource for the calling thread, backed by the shared client."""
+        state = self._thread_state()
+        resource = state.get('dynamodb')
+        if resource is None:
+            with self._lock:
+                resource = self._get_session().resource('dynamodb', config=self.config)
+            # Tables created from the resource inherit its client; swap in the
+            # process-wide one so threads share its connection pool. The
+            # resource's own client is never used, so it opens no connections.
+            resource.meta.client = self.client('dynamodb')
+            state['dynamodb'] = resource
+        return resource
         
     @property
     def sns(self):
-        if self._sns is None:
-            self._sns = boto3.client('sns', region_name=self.region)
-        return self._sns
+        return self.client('sns')
 
 # Global instance for easy access
 aws_app = AWSApp()
 
+# Forked workers must not reuse the parent's sockets
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=aws_app.reset)
+
 class SNSNotifier:
     """AWS SNS implementation for notifications."""
     
@@ -77,6 +164,50 @@ class SNSNotifier:
             print(f"[AWS SNS] Notification sent to {email}")
         except ClientError as e:
             print(f"[AWS SNS ERROR] {e.response['Error']['Message']}")
+    
+    def send_batch(self, messages):
+        """Publish up to 10 (email, message) pairs with a single PublishBatch call.
+        
+        Returns the pairs that failed with a retryable (server-side) error.
+        Transport errors propagate so the caller can retry the whole batch.
+        """
+        if not self.topic_arn:
+            for email, message in messages:
+                print(f"[AWS SNS MOCK] No Topic ARN found. Notification for {email}: {message}")
+            return []
+        
+        entries = [
+            {
+                'Id': str(i),
+                'Message': message,
+                'Subject': "BookBazaar Order Update",
+                'MessageAttributes': {
+                    'email': {
+                        'DataType': 'String',
+                        'StringValue': email
+                    }
+                }
+            }
+            for i, (email, message) in enumerate(messages)
+        ]
+        response = self.aws.sns.publish_batch(TopicArn=self.topic_arn, PublishBatchRequestEntries=entries)
+        
+        retry = []
+        for failure in response.get('Failed', []):
+            pair = messages[int(failure['Id'])]
+            if failure.get('SenderFault'):
+                print(f"[AWS SNS ERROR] Dropping notification for {pair[0]}: {failure.get('Message')}")
+            else:
+                retry.append(pair)
+        return retry
+
+def is_missing_index_error(error):
+    """True if a query failed because the table has no such GSI yet."""
+    details = error.response.get('Error', {})
+    return (
+        details.get('Code') in ('ValidationException', 'ResourceNotFoundException')
+        and 'index' in details.get('Message', '').lower()
+    )
 
 class DynamoBookRepository:
     """AWS DynamoDB implementation for Book repository."""
@@ -84,7 +215,7 @@ class DynamoBookRepository:
     def __init__(self, aws_instance=None):
         self.aws = aws_instance or aws_app
         self.table_name = DYNAMODB_BOOKS_TABLE
-        self.table = self.aws.dynamodb.Table(self.table_name)
+        self.table = self.aws.table(self.table_name)
         
     def get_paginated(self, limit=8, last_key=None):
         """Query Books table using TypeIndex for efficient pagination."""
@@ -124,18 +255,38 @@ class DynamoUserRepository:
     def __init__(self, aws_instance=None):
         self.aws = aws_instance or aws_app
         self.table_name = DYNAMODB_USERS_TABLE
-        self.table = self.aws.dynamodb.Table(self.table_name)
+        self.table = self.aws.table(self.table_name)
         
     def get_by_email(self, email):
-        """Get user by email (Global Secondary Index or scan)."""
+        """Get user by email with a single-item query on the EmailIndex GSI."""
         try:
-            # Assuming email is a unique attribute, but not the primary key (id is PK)
-            # For simplicity in this demo, we'll use scan. In production, use GSI.
-            response = self.table.scan(
-                FilterExpression=boto3.dynamodb.conditions.Attr('email').eq(email)
+            response = self.table.query(
+                IndexName=USERS_EMAIL_INDEX,
+                KeyConditionExpression=boto3.dynamodb.conditions.Key('email').eq(email),
+                Limit=1
             )
             items = response.get('Items', [])
             return items[0] if items else None
+        except ClientError as e:
+            if not is_missing_index_error(e):
+                print(f"Error fetching user from DynamoDB: {e.response['Error']['Message']}")
+                return None
+            # Table predates the index: run `python app_aws.py migrate`
+            print(f"[WARN] {USERS_EMAIL_INDEX} missing on {self.table_name}, falling back to scan.")
+            return self._scan_by_email(email)
+    
+    def _scan_by_email(self, email):
+        """Paginated scan; only used until the EmailIndex GSI exists."""
+        try:
+            scan_params = {'FilterExpression': boto3.dynamodb.conditions.Attr('email').eq(email)}
+            while True:
+                response = self.table.scan(**scan_params)
+                items = response.get('Items', [])
+                if items:
+                    return items[0]
+                if 'LastEvaluatedKey' not in response:
+                    return None
+                scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
         except ClientError as e:
             print(f"Error fetching user from DynamoDB: {e.response['Error']['Message']}")
             return None
@@ -155,7 +306,7 @@ class DynamoOrderRepository:
     def __init__(self, aws_instance=None):
         self.aws = aws_instance or aws_app
         self.table_name = DYNAMODB_ORDERS_TABLE
-        self.table = self.aws.dynamodb.Table(self.table_name)
+        self.table = self.aws.table(self.table_name)
         
     def add(self, order_data):
         """Put order into DynamoDB."""
@@ -168,14 +319,67 @@ class DynamoOrderRepository:
             print(f"Error adding order to DynamoDB: {e.response['Error']['Message']}")
             return False
             
+    def query_by_seller(self, seller_id, limit=50, last_key=None, start_date=None, end_date=None):
+        """Orders for one seller, newest first, via the SellerDateIndex GSI.
+        
+        `start_date`/`end_date` are inclusive ISO-8601 bounds on order_date.
+        Pass the returned LastEvaluatedKey back as `last_key` for the next page.
+        """
+        Key = boto3.dynamodb.conditions.Key
+        condition = Key('seller_id').eq(seller_id)
+        if start_date and end_date:
+            condition = condition & Key('order_date').between(start_date, end_date)
+        elif start_date:
+            condition = condition & Key('order_date').gte(start_date)
+        elif end_date:
+            condition = condition & Key('order_date').lte(end_date)
+        
+        query_params = {
+            'IndexName': ORDERS_SELLER_DATE_INDEX,
+            'KeyConditionExpression': condition,
+            'ScanIndexForward': False,
+            'Limit': limit
+        }
+        if last_key:
+            query_params['ExclusiveStartKey'] = last_key
+        
+        response = self.table.query(**query_params)
+        return {
+            'Items': response.get('Items', []),
+            'LastEvaluatedKey': response.get('LastEvaluatedKey')
+        }
+    
     def get_by_seller_id(self, seller_id):
-        """Scan for orders belonging to books owned by a seller."""
-        # Note: In production, use GSI on seller_id for performance
+        """All orders for books owned by a seller, newest first."""
         try:
-            response = self.table.scan(
-                FilterExpression=boto3.dynamodb.conditions.Attr('seller_id').eq(seller_id)
-            )
-            return response.get('Items', [])
+            items, last_key = [], None
+            while True:
+                page = self.query_by_seller(seller_id, limit=500, last_key=last_key)
+                items.extend(page['Items'])
+                last_key = page['LastEvaluatedKey']
+                if not last_key:
+                    return items
+        except ClientError as e:
+            if not is_missing_index_error(e):
+                print(f"Error fetching seller orders: {e.response['Error']['Message']}")
+                return []
+            # Table predates the index: run `python app_aws.py migrate`
+            print(f"[WARN] {ORDERS_SELLER_DATE_INDEX} missing on {self.table_name}, falling back to scan.")
+            return self._scan_by_seller(seller_id)
+    
+    def _scan_by_seller(self, seller_id):
+        """Paginated scan; only used until the SellerDateIndex GSI exists."""
+        try:
+            scan_params = {'FilterExpression': boto3.dynamodb.conditions.Attr('seller_id').eq(seller_id)}
+            items = []
+            while True:
+                response = self.table.scan(**scan_params)
+                items.extend(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            items.sort(key=lambda item: item.get('order_date', ''), reverse=True)
+            return items
         except ClientError as e:
             print(f"Error fetching seller orders: {e.response['Error']['Message']}")
             return []
@@ -219,11 +423,26 @@ def setup_aws():
         table = aws_app.dynamodb.create_table(
             TableName='BookBazaarOrders',
             KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
-            AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+            AttributeDefinitions=[
+                {'AttributeName': 'id', 'AttributeType': 'S'},
+                {'AttributeName': 'seller_id', 'AttributeType': 'S'},
+                {'AttributeName': 'order_date', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    'IndexName': ORDERS_SELLER_DATE_INDEX,
+                    'KeySchema': [
+                        {'AttributeName': 'seller_id', 'KeyType': 'HASH'},
+                        {'AttributeName': 'order_date', 'KeyType': 'RANGE'}
+                    ],
+                    'Projection': {'ProjectionType': 'ALL'},
+                    'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+                }
+            ],
             ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
         )
         table.wait_until_exists()
-        print("✓ Orders table created.")
+        print("✓ Orders table created with SellerDateIndex.")
     except Exception as e:
         print(f"Orders table: {e}")
 
@@ -242,17 +461,125 @@ def setup_aws():
         table = aws_app.dynamodb.create_table(
             TableName='BookBazaarUsers',
             KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
-            AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+            AttributeDefinitions=[
+                {'AttributeName': 'id', 'AttributeType': 'S'},
+                {'AttributeName': 'email', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    'IndexName': USERS_EMAIL_INDEX,
+                    'KeySchema': [{'AttributeName': 'email', 'KeyType': 'HASH'}],
+                    'Projection': {'ProjectionType': 'ALL'},
+                    'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+                }
+            ],
             ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
         )
         table.wait_until_exists()
-        print("✓ Users table created.")
+        print("✓ Users table created with EmailIndex.")
     except Exception as e:
         print(f"Users table: {e}")
 
 
     print("\nAWS environment setup complete.")
 
+def ensure_gsi(table_name, index_name, key_schema, attribute_definitions, timeout=600):
+    """Add a GSI to an existing table and wait until DynamoDB has backfilled it."""
+    import time
+    client = aws_app.client('dynamodb')
+    description = client.describe_table(TableName=table_name)['Table']
+    existing = {i['IndexName'] for i in description.get('GlobalSecondaryIndexes', [])}
+    
+    if index_name in existing:
+        print(f"  {table_name}.{index_name} already exists.")
+    else:
+        create = {
+            'IndexName': index_name,
+            'KeySchema': key_schema,
+            'Projection': {'ProjectionType': 'ALL'}
+        }
+        billing = description.get('BillingModeSummary', {}).get('BillingMode', 'PROVISIONED')
+        if billing == 'PROVISIONED':
+            create['ProvisionedThroughput'] = {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+        client.update_table(
+            TableName=table_name,
+            AttributeDefinitions=attribute_definitions,
+            GlobalSecondaryIndexUpdates=[{'Create': create}]
+        )
+        print(f"  Creating {table_name}.{index_name}...")
+    
+    # DynamoDB backfills existing items into a new GSI on its own; wait for it
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        indexes = client.describe_table(TableName=table_name)['Table'].get('GlobalSecondaryIndexes', [])
+        index = next((i for i in indexes if i['IndexName'] == index_name), None)
+        if index and index.get('IndexStatus') == 'ACTIVE' and not index.get('Backfilling'):
+            print(f"✓ {table_name}.{index_name} is active.")
+            return True
+        time.sleep(5)
+    print(f"[WARN] {table_name}.{index_name} still building after {timeout}s; re-run migrate to keep waiting.")
+    return False
+
+def migrate_aws():
+    """Bring tables created by older versions of `setup` up to the current index layout."""
+    print("Migrating DynamoDB tables...")
+    try:
+        ensure_gsi(
+            DYNAMODB_USERS_TABLE, USERS_EMAIL_INDEX,
+            key_schema=[{'AttributeName': 'email', 'KeyType': 'HASH'}],
+            attribute_definitions=[{'AttributeName': 'email', 'AttributeType': 'S'}]
+        )
+    except Exception as e:
+        print(f"Users table: {e}")
+    try:
+        backfill_order_sellers()
+        ensure_gsi(
+            DYNAMODB_ORDERS_TABLE, ORDERS_SELLER_DATE_INDEX,
+            key_schema=[
+                {'AttributeName': 'seller_id', 'KeyType': 'HASH'},
+                {'AttributeName': 'order_date', 'KeyType': 'RANGE'}
+            ],
+            attribute_definitions=[
+                {'AttributeName': 'seller_id', 'AttributeType': 'S'},
+                {'AttributeName': 'order_date', 'AttributeType': 'S'}
+            ]
+        )
+    except Exception as e:
+        print(f"Orders table: {e}")
+    print("\nMigration complete.")
+
+def backfill_order_sellers():
+    """Copy seller_id from the book onto orders written without one.
+    
+    Orders missing seller_id are invisible to the SellerDateIndex GSI.
+    """
+    orders = aws_app.table(DYNAMODB_ORDERS_TABLE)
+    books = aws_app.table(DYNAMODB_BOOKS_TABLE)
+    seller_by_book = {}
+    updated = 0
+    
+    scan_params = {
+        'FilterExpression': boto3.dynamodb.conditions.Attr('seller_id').not_exists(),
+        'ProjectionExpression': 'id, book_id'
+    }
+    while True:
+        response = orders.scan(**scan_params)
+        for item in response.get('Items', []):
+            book_id = item.get('book_id')
+            if book_id not in seller_by_book:
+                book = books.get_item(Key={'id': book_id}).get('Item', {}) if book_id else {}
+                seller_by_book[book_id] = str(book.get('seller_id') or 'system')
+            orders.update_item(
+                Key={'id': item['id']},
+                UpdateExpression='SET seller_id = :s',
+                ExpressionAttributeValues={':s': seller_by_book[book_id]}
+            )
+            updated += 1
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    print(f"  Backfilled seller_id on {updated} orders.")
+
 def verify_aws():
     """Verify AWS connectivity and configuration."""
     print("Verifying AWS Integration")
@@ -286,90 +613,149 @@ def verify_aws():
     except Exception as e:
         print(f"FAILED ({e})")
 
-def seed_db():
-    """Seed DynamoDB tables from CSV files."""
+SEED_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+# Concurrent batch writers per large table; each keeps one BatchWriteItem in flight
+SEED_WRITERS_PER_TABLE = 4
+SEED_SHARD_MIN_ITEMS = 1000
+
+def read_seed_csv(path):
     import csv
-    import os
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+def batch_write(table_name, items):
+    """Write items with BatchWriteItem (25 per request, unprocessed items retried)."""
+    count = 0
+    # Resource handles are per thread, so this is safe to run from a pool worker
+    with aws_app.table(table_name).batch_writer(overwrite_by_pkeys=['id']) as batch:
+        for item in items:
+            batch.put_item(Item=item)
+            count += 1
+    return count
+
+def seed_db(data_dir=SEED_DATA_DIR, workers=None, writers=SEED_WRITERS_PER_TABLE, fast_hash=False):
+    """Seed DynamoDB tables from CSV files.
     
-    # Path setup
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(base_path, 'data')
+    Ids and relationships are resolved from the CSVs up front, so the three
+    tables are written concurrently through batch writers; large tables are
+    split across `writers` threads. Returns the number of items written per
+    table.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import datetime
+    from app.services.passwords import hash_passwords
     
     if not os.path.exists(data_dir):
         print(f"[ERROR] Data directory not found at {data_dir}")
-        return
+        return None
 
     print(f"Seeding data from {data_dir}...")
-    user_repo = DynamoUserRepository()
-    book_repo = DynamoBookRepository()
-    order_repo = DynamoOrderRepository()
+    users = read_seed_csv(os.path.join(data_dir, 'users.csv'))
+    books = read_seed_csv(os.path.join(data_dir, 'books.csv'))
+    orders = read_seed_csv(os.path.join(data_dir, 'orders.csv'))
 
-    # 1. Seed Users
     user_map = {} # username -> id mapping for relationships
-    try:
-        with open(os.path.join(data_dir, 'users.csv'), 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for i, row in enumerate(reader, 1):
-                user_id = f"u{i}"
-                user_data = {
-                    'id': user_id,
-                    'username': row['username'],
-                    'email': row['email'],
-                    'role': row['role'],
-                    'is_validated': row['is_validated'].lower() == 'true',
-                    'password_hash': generate_password_hash(row['password'])
-                }
-                user_repo.add(user_data)
-                user_map[row['username']] = user_id
-                print(f"  Added user: {row['username']}")
-        print("✓ Users seeded.")
-    except Exception as e:
-        print(f"Error seeding users: {e}")
+    for i, row in enumerate(users, 1):
+        user_map.setdefault(row['username'], f"u{i}")
 
-    # 2. Seed Books
-    book_map = {} # title -> id
-    try:
-        with open(os.path.join(data_dir, 'books.csv'), 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for i, row in enumerate(reader, 1):
-                book_id = f"b{i}"
-                seller_id = user_map.get(row['seller_username'], 'u1')
-                book_data = {
-                    'id': book_id,
-                    'title': row['title'],
-                    'author': row['author'],
-                    'description': row['description'],
-                    'price': float(row['price']),
-                    'stock': int(row['stock']),
-                    'image_url': row['image_url'],
-                    'seller_id': seller_id
-                }
-                book_repo.add(book_data)
-                book_map[row['title']] = book_id
-        print("✓ Books seeded.")
-    except Exception as e:
-        print(f"Error seeding books: {e}")
+    book_map = {} # title -> (id, seller_id)
+    book_items = []
+    for i, row in enumerate(books, 1):
+        book_id = f"b{i}"
+        seller_id = user_map.get(row['seller_username'], 'u1')
+        book_map.setdefault(row['title'], (book_id, seller_id))
+        book_items.append({
+            'id': book_id,
+            'type': 'book',
+            'title': row['title'],
+            'author': row['author'],
+            'description': row['description'],
+            'price': Decimal(row['price']),
+            'stock': int(row['stock']),
+            'image_url': row['image_url'],
+            'seller_id': seller_id
+        })
 
-    # 3. Seed Orders
-    try:
-        with open(os.path.join(data_dir, 'orders.csv'), 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for i, row in enumerate(reader, 1):
-                order_data = {
-                    'id': f"o{i}",
-                    'user_id': user_map.get(row['buyer_username'], 'u1'),
-                    'book_id': book_map.get(row['book_title'], 'b1'),
-                    'quantity': int(row['quantity']),
-                    'total_price': float(row['total_price']),
-                    'status': row['status'],
-                    'order_date': row['order_date']
-                }
-                order_repo.add(order_data)
-        print("✓ Orders seeded.")
-    except Exception as e:
-        print(f"Error seeding orders: {e}")
+    order_items = []
+    for i, row in enumerate(orders, 1):
+        book_id, seller_id = book_map.get(row['book_title'], ('b1', 'u1'))
+        order_items.append({
+            'id': f"o{i}",
+            'user_id': user_map.get(row['buyer_username'], 'u1'),
+            'book_id': book_id,
+            # Without seller_id the order is invisible to the SellerDateIndex GSI
+            'seller_id': seller_id,
+            'quantity': int(row['quantity']),
+            'total_price': Decimal(row['total_price']),
+            'status': row['status'],
+            'order_date': datetime.fromisoformat(row['order_date']).isoformat()
+        })
+
+    def user_items():
+        hashes = hash_passwords((row['password'] for row in users), workers, fast_hash)
+        for i, (row, password_hash) in enumerate(zip(users, hashes), 1):
+            yield {
+                'id': f"u{i}",
+                'username': row['username'],
+                'email': row['email'],
+                'role': row['role'],
+                'is_validated': row['is_validated'].lower() == 'true',
+                'password_hash': password_hash
+            }
+
+    def shards(items):
+        count = max(1, min(writers, len(items) // SEED_SHARD_MIN_ITEMS))
+        return [items[i::count] for i in range(count)]
+
+    jobs = {
+        'users': (DYNAMODB_USERS_TABLE, [user_items()]),
+        'books': (DYNAMODB_BOOKS_TABLE, shards(book_items)),
+        'orders': (DYNAMODB_ORDERS_TABLE, shards(order_items))
+    }
+    counts = {}
+    with ThreadPoolExecutor(max_workers=sum(len(parts) for _, parts in jobs.values())) as pool:
+        futures = {name: [pool.submit(batch_write, table_name, part) for part in parts]
+                   for name, (table_name, parts) in jobs.items()}
+        for name, parts in futures.items():
+            try:
+                counts[name] = sum(future.result() for future in parts)
+                print(f"✓ {name.capitalize()} seeded ({counts[name]}).")
+            except Exception as e:
+                counts[name] = 0
+                print(f"Error seeding {name}: {e}")
     
     print("\n✓ DynamoDB Seeding complete!")
+    return counts
+
+def run_relay(redrive=False):
+    """Drain the SQL outbox to DynamoDB in the foreground (no web server).
+    
+    With `redrive`, parked events are queued again for whichever relay is
+    running and the command exits.
+    """
+    project_root = os.path.dirname(os.path.abspath(__file__))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    
+    from app import create_app
+    from app.services.outbox_relay import OutboxRelay
+    app = create_app()
+    if redrive:
+        from app.repositories.outbox_repo import OutboxRepository
+        with app.app_context():
+            print(f"Re-queued {OutboxRepository().redrive()} parked outbox events.")
+        return
+    relay = OutboxRelay(
+        app,
+        batch_size=app.config.get('OUTBOX_BATCH_SIZE', 100),
+        poll_interval=app.config.get('OUTBOX_POLL_INTERVAL', 1.0),
+        alert_after=app.config.get('OUTBOX_ALERT_AFTER', 10)
+    )
+    print("Outbox relay running. Press Ctrl+C to stop.")
+    try:
+        relay.run()
+    except KeyboardInterrupt:
+        print(f"\nStopped. Dispatched {relay.stats['dispatched']} events, lag {relay.stats['lag_seconds']:.1f}s.")
 
 def run_server():
     """Start the Flask web server."""
@@ -383,7 +769,7 @@ def run_server():
 
     try:
         from app import create_app
-        app = create_app()
+        app = create_app(background_tasks=True)
         # Ensure it listens on 0.0.0.0 for EC2 access
         app.run(host='0.0.0.0', port=5000, debug=False)
     except ImportError as e:
@@ -399,17 +785,31 @@ def run_server():
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="BookBazaar AWS Utility")
-    parser.add_argument("command", choices=["setup", "verify", "run", "seed"], 
+    parser.add_argument("command", choices=["setup", "migrate", "verify", "run", "seed", "relay"], 
                         nargs='?', default="run",
-                        help="Command to run (setup, verify, run, seed). Default is 'run'.")
+                        help="Command to run (setup, migrate, verify, run, seed, relay). Default is 'run'.")
+    parser.add_argument("--data-dir", default=SEED_DATA_DIR,
+                        help="seed: directory containing users.csv, books.csv and orders.csv")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="seed: processes used to hash passwords (default: CPU count)")
+    parser.add_argument("--writers", type=int, default=SEED_WRITERS_PER_TABLE,
+                        help=f"seed: concurrent batch writers per large table (default {SEED_WRITERS_PER_TABLE})")
+    parser.add_argument("--fast-hash", action="store_true",
+                        help="seed: cheap password hashes for synthetic/staging data (never for real accounts)")
+    parser.add_argument("--redrive", action="store_true",
+                        help="relay: queue parked outbox events for delivery again and exit")
     
     args = parser.parse_args()
     
     if args.command == "setup":
         setup_aws()
+    elif args.command == "migrate":
+        migrate_aws()
     elif args.command == "verify":
         verify_aws()
     elif args.command == "run":
         run_server()
     elif args.command == "seed":
-        seed_db()
+        seed_db(args.data_dir, args.workers, args.writers, args.fast_hash)
+    elif args.command == "relay":
+        run_relay(args.redrive)
@@ -0,0 +1,125 @@
+"""Compare the legacy per-row ORM catalog import with the bulk Core importer.
+
+Usage: python benchmarks/bench_import.py [--rows 50000] [--workers N]
+
+Runs against a throwaway SQLite database and prints rows/sec and the
+speedup over the legacy loop for an append-only load, an upsert load and
+a re-import of the same feed.
+
+Both sides run with the same engine listeners. The ORM hook that keeps
+dashboard statistics up to date is switched off for the legacy loop, which
+predates it; the importer's timings include its closing statistics
+refresh instead.
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def write_feed(path, rows):
+    random.seed(42)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['title', 'author', 'description', 'price', 'image_url'])
+        for i in range(rows):
+            writer.writerow([
+                f"  Benchmark Title {i} ",
+                f"Author {random.randint(1, 5000)}",
+                "A generated description used to size rows realistically. " * 3,
+                f"{random.uniform(50, 2000):.2f}",
+                f"https://example.com/covers/{i}.jpg" if i % 3 else ""
+            ])
+
+@contextmanager
+def without_statistics_hook():
+    from sqlalchemy import event
+    from app.extensions import db
+    from app.services.statistics import _track_changes
+    event.remove(db.session, 'before_flush', _track_changes)
+    try:
+        yield
+    finally:
+        event.listen(db.session, 'before_flush', _track_changes)
+
+def legacy_import(csv_file_path):
+    """The previous import_books.py loop: one ORM object per row, commit every 100."""
+    from app.extensions import db
+    from app.models.book import Book
+    count = 0
+    with open(csv_file_path, mode='r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            try:
+                price = float(row.get('price', 0))
+            except (ValueError, TypeError):
+                price = 0.0
+            image_url = row.get('image_url', '').strip()
+            db.session.add(Book(
+                title=row.get('title', 'Unknown Title').strip(),
+                author=row.get('author', 'Unknown Author').strip(),
+                description=row.get('description', '').strip(),
+                price=price,
+                stock=50,
+                image_url=image_url if image_url else None
+            ))
+            count += 1
+            if count % 100 == 0:
+                db.session.commit()
+    db.session.commit()
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="parse/validate processes for the bulk importer (default: CPU count)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_import_")
+    feed = os.path.join(workdir, "feed.csv")
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, "bench.db")
+    write_feed(feed, args.rows)
+
+    from app import create_app
+    from app.extensions import db
+    from app.services.catalog_import import CatalogImporter
+
+    app = create_app()
+    with app.app_context():
+        with without_statistics_hook():
+            started = time.perf_counter()
+            legacy_rows = legacy_import(feed)
+            legacy_seconds = time.perf_counter() - started
+
+        # Start the bulk run from an empty schema too
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+        importer = CatalogImporter(workers=args.workers, mode='insert', report=lambda message: None)
+        bulk = importer.import_file(feed)
+
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+        importer = CatalogImporter(workers=args.workers, mode='upsert', report=lambda message: None)
+        upsert = importer.import_file(feed)
+        # Nightly re-import of an unchanged feed
+        reimport = importer.import_file(feed)
+
+    legacy_rate = legacy_rows / legacy_seconds
+    print(f"rows:     {args.rows}")
+    print(f"legacy:   {legacy_seconds:8.2f}s {legacy_rate:12,.0f} rows/sec")
+    for label, result in (("insert", bulk), ("upsert", upsert), ("reimport", reimport)):
+        print(f"{label + ':':9} {result['seconds']:8.2f}s {result['rows_per_second']:12,.0f} rows/sec "
+              f"{result['rows_per_second'] / legacy_rate:6.1f}x")
+
+if __name__ == "__main__":
+    main()
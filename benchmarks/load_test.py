@@ -0,0 +1,355 @@
+"""Drive the core user journeys concurrently against a seeded database.
+
+Usage: python benchmarks/load_test.py [--users 500] [--books 5000] [--orders 20000]
+                                      [--concurrency 8] [--duration 30] [--database-url URL]
+                                      [--output results.json] [--baseline previous.json]
+
+Boots create_app() against a throwaway SQLite database (or --database-url,
+e.g. MySQL), seeds it with generate_data.py and runs virtual users, each
+with its own test client and session cookie:
+
+  buyer:  login, browse /books pages, search, add to cart, view cart, checkout
+  admin:  login, dashboard, orders list
+  seller: login, dashboard, sales
+
+DynamoDB (outbox relay) and SNS (order notifications) run against moto,
+so no network or AWS account is needed. Reports throughput, p50/p95/p99
+latency and SQL queries per request for every step and writes them as
+JSON; pass an earlier result as --baseline to print the change.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Share of virtual-user journeys per role
+JOURNEY_MIX = {'buyer': 0.9, 'admin': 0.05, 'seller': 0.05}
+SEARCH_TERMS = ['river', 'library', 'golden', 'midnight', 'habits', 'secret island', 'paper', 'machine']
+BROWSE_PAGES = 3
+
+_NEXT_CURSOR_RE = re.compile(r'href="(/books\?cursor=[^"]+)"[^>]*class="page-link next-link"')
+
+class QueryCounter:
+    """Counts SQL statements executed by the current thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def reset(self):
+        self._local.count = 0
+
+    def value(self):
+        return getattr(self._local, 'count', 0)
+
+class Recorder:
+    """Latency and query samples per journey step."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.journeys = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, step, seconds, queries, ok):
+        with self._lock:
+            self.samples[step].append((seconds, queries))
+            if not ok:
+                self.errors[step] += 1
+
+    def journey(self, role):
+        with self._lock:
+            self.journeys[role] += 1
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+class VirtualUser:
+    def __init__(self, app, counter, recorder, accounts, book_ids, book_weights, rng):
+        self.app = app
+        self.counter = counter
+        self.recorder = recorder
+        self.accounts = accounts
+        self.book_ids = book_ids
+        self.book_weights = book_weights
+        self.rng = rng
+        self.client = None
+
+    def request(self, step, method, url, expect=(200, 302), **kwargs):
+        self.counter.reset()
+        started = time.perf_counter()
+        response = self.client.open(url, method=method, **kwargs)
+        body = response.get_data(as_text=True)
+        elapsed = time.perf_counter() - started
+        self.recorder.add(step, elapsed, self.counter.value(), response.status_code in expect)
+        return response, body
+
+    def login(self, role):
+        email, password = self.rng.choice(self.accounts[role])
+        self.client = self.app.test_client()
+        response, _ = self.request('login', 'POST', '/login', data={'email': email, 'password': password},
+                                   expect=(302,))
+        return response.status_code == 302
+
+    def run(self, role):
+        if self.login(role):
+            getattr(self, f'{role}_journey')()
+        self.recorder.journey(role)
+
+    def buyer_journey(self):
+        url = '/books'
+        for _ in range(BROWSE_PAGES):
+            _, body = self.request('browse', 'GET', url)
+            match = _NEXT_CURSOR_RE.search(body)
+            if not match:
+                break
+            url = match.group(1).replace('&amp;', '&')
+        self.request('search', 'GET', '/books', query_string={'q': self.rng.choice(SEARCH_TERMS)})
+        # Popular books get most of the cart adds, like in the seeded orders
+        for book_id in self.rng.choices(self.book_ids, cum_weights=self.book_weights, k=self.rng.randint(1, 3)):
+            self.request('cart_add', 'POST', f'/cart/add/{book_id}', expect=(302,))
+        self.request('cart', 'GET', '/cart')
+        self.request('checkout_review', 'GET', '/checkout')
+        self.request('checkout', 'POST', '/checkout', expect=(302,))
+        self.request('order_history', 'GET', '/dashboard')
+
+    def admin_journey(self):
+        self.request('admin_dashboard', 'GET', '/admin/dashboard')
+        self.request('admin_orders', 'GET', '/admin/orders')
+
+    def seller_journey(self):
+        self.request('seller_dashboard', 'GET', '/seller/dashboard')
+        self.request('seller_sales', 'GET', '/seller/sales')
+
+def start_aws():
+    """Start moto and create the DynamoDB tables and SNS topic the app writes to."""
+    for name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SECURITY_TOKEN', 'AWS_SESSION_TOKEN'):
+        os.environ[name] = 'testing'
+    os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+    from moto import mock_aws
+    import app_aws
+    mock = mock_aws()
+    mock.start()
+    app_aws.aws_app = app_aws.AWSApp()
+    app_aws.setup_aws()
+    topic_arn = app_aws.aws_app.sns.create_topic(Name='bookstore_notification')['TopicArn']
+    app_aws.SNS_TOPIC_ARN = topic_arn
+    os.environ['SNS_TOPIC_ARN'] = topic_arn
+    return mock
+
+def seed(app, args):
+    import seed_data
+    from generate_data import DataGenerator
+    from app.services.statistics import statistics
+    generator = DataGenerator(args.users, args.books, args.orders, seed=args.seed)
+    with app.app_context():
+        started = time.perf_counter()
+        seed_data.load_users(generator.users())
+        seed_data.load_books(generator.books())
+        seed_data.load_orders(generator.orders())
+        statistics.refresh()
+    return time.perf_counter() - started
+
+def load_fixtures(app):
+    """Login accounts per role and book ids in popularity order."""
+    from generate_data import PASSWORDS, zipf_cum_weights
+    from app.extensions import db
+    from app.models.book import Book
+    from app.models.order import Order
+    from app.models.user import User
+    from sqlalchemy import func
+    with app.app_context():
+        accounts = {role: [] for role in JOURNEY_MIX}
+        for email, role, validated in db.session.query(User.email, User.role, User.is_validated):
+            if role in accounts and (role != 'seller' or validated):
+                accounts[role].append((email, PASSWORDS[role]))
+        popular = [book_id for book_id, in db.session.query(Order.book_id)
+                   .group_by(Order.book_id).order_by(func.count().desc()).limit(1000)]
+        book_ids = popular or [book_id for book_id, in db.session.query(Book.id).limit(1000)]
+    missing = [role for role, found in accounts.items() if not found]
+    if missing:
+        raise SystemExit(f"No {', '.join(missing)} accounts with known passwords in the database")
+    return accounts, book_ids, zipf_cum_weights(len(book_ids), 1.0)
+
+def run_load(app, args, accounts, book_ids, book_weights):
+    from sqlalchemy import event
+    from app.extensions import db
+    counter, recorder = QueryCounter(), Recorder()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', counter)
+    roles, role_weights = list(JOURNEY_MIX), list(JOURNEY_MIX.values())
+    deadline = time.perf_counter() + args.duration
+
+    def worker(index):
+        rng = random.Random(f"{args.seed}:{index}")
+        user = VirtualUser(app, counter, recorder, accounts, book_ids, book_weights, rng)
+        while time.perf_counter() < deadline:
+            user.run(rng.choices(roles, weights=role_weights)[0])
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"vu-{i}") for i in range(args.concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    event.remove(engine, 'before_cursor_execute', counter)
+    return recorder, elapsed
+
+def summarize(recorder, elapsed):
+    steps = {}
+    all_latencies = []
+    total_requests = total_queries = total_errors = 0
+    for step, samples in sorted(recorder.samples.items()):
+        latencies = sorted(seconds * 1000 for seconds, _ in samples)
+        queries = [count for _, count in samples]
+        all_latencies.extend(latencies)
+        total_requests += len(samples)
+        total_queries += sum(queries)
+        total_errors += recorder.errors[step]
+        steps[step] = {
+            'requests': len(samples),
+            'errors': recorder.errors[step],
+            'requests_per_second': round(len(samples) / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'queries_per_request': round(sum(queries) / len(samples), 2),
+            'max_queries': max(queries)
+        }
+    all_latencies.sort()
+    return {
+        'requests': total_requests,
+        'errors': total_errors,
+        'journeys': dict(recorder.journeys),
+        'requests_per_second': round(total_requests / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(all_latencies, 50), 2),
+        'p95_ms': round(percentile(all_latencies, 95), 2),
+        'p99_ms': round(percentile(all_latencies, 99), 2),
+        'queries_per_request': round(total_queries / total_requests, 2) if total_requests else 0.0
+    }, steps
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(result, baseline=None):
+    def delta(current, previous, key):
+        if not previous or key not in previous or not previous[key]:
+            return ''
+        return f" ({(current[key] - previous[key]) / previous[key]:+.0%})"
+
+    total = result['total']
+    previous_total = baseline['total'] if baseline else None
+    print(f"\n{total['requests']} requests, {total['errors']} errors in {result['seconds']:.1f}s: "
+          f"{total['requests_per_second']:.1f} req/s{delta(total, previous_total, 'requests_per_second')}, "
+          f"p95 {total['p95_ms']:.1f}ms{delta(total, previous_total, 'p95_ms')}, "
+          f"{total['queries_per_request']:.1f} queries/request")
+    print(f"{'step':18} {'reqs':>6} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+    for step, stats in result['steps'].items():
+        previous = (baseline or {}).get('steps', {}).get(step)
+        print(f"{step:18} {stats['requests']:6} {stats['errors']:4} {stats['requests_per_second']:8.1f} "
+              f"{stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f} "
+              f"{stats['queries_per_request']:8.1f}{delta(stats, previous, 'p95_ms')}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500, help="seeded users (default 500)")
+    parser.add_argument("--books", type=int, default=5000, help="seeded books (default 5000)")
+    parser.add_argument("--orders", type=int, default=20000, help="seeded orders (default 20000)")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent virtual users (default 8)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to generate load (default 30)")
+    parser.add_argument("--database-url", default=None,
+                        help="database to test against (default: a throwaway SQLite file)")
+    parser.add_argument("--no-seed", action="store_true", help="use the data already in --database-url")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for data and journeys (default 42)")
+    parser.add_argument("--output", default=None,
+                        help="where to write JSON results (default: benchmarks/results/load_test-<commit>.json)")
+    parser.add_argument("--baseline", default=None, help="earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(workdir, "load.db")
+    os.environ['FLASK_ENV'] = 'production'
+    os.environ.setdefault('SECRET_KEY', 'load-test')
+    os.environ['OUTBOX_RELAY_ENABLED'] = 'true'
+    os.environ['STATS_REFRESH_INTERVAL'] = '0'
+    # The app's own SQL settings would point MySQL users at their real database
+    for name in ('MYSQL_HOST', 'MYSQL_USER', 'MYSQL_PASSWORD', 'MYSQL_DB'):
+        os.environ.pop(name, None)
+
+    mock = start_aws()
+    try:
+        from app import create_app
+        # Like the web server: the outbox relay drains to (mocked) DynamoDB during the run
+        app = create_app(background_tasks=True)
+        seed_seconds = 0.0 if args.no_seed else seed(app, args)
+        accounts, book_ids, book_weights = load_fixtures(app)
+        print(f"Seeded in {seed_seconds:.1f}s; running {args.concurrency} virtual users for {args.duration:.0f}s...")
+        recorder, elapsed = run_load(app, args, accounts, book_ids, book_weights)
+
+        relay = app.extensions.get('outbox_relay')
+        if relay:
+            relay.stop()
+        from app.routes.bookstore import notifier
+        notifier.dispatcher.flush()
+        total, steps = summarize(recorder, elapsed)
+        with app.app_context():
+            from app.extensions import db
+            dialect = db.engine.dialect.name
+    finally:
+        mock.stop()
+
+    result = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'database': dialect,
+        'dataset': {'users': args.users, 'books': args.books, 'orders': args.orders,
+                    'seed': args.seed, 'seeded': not args.no_seed},
+        'concurrency': args.concurrency,
+        'seconds': round(elapsed, 2),
+        'total': total,
+        'steps': steps,
+        'side_effects': {
+            'outbox_dispatched': relay.stats['dispatched'] if relay else 0,
+            'notifications_sent': notifier.dispatcher.stats['sent']
+        }
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"load_test-{result['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,60 @@ class Config:
             
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Catalog listing: the total book count is served from a cache this many
+    # seconds old at most instead of running COUNT(*) on every page view
+    CATALOG_COUNT_TTL = int(os.environ.get('CATALOG_COUNT_TTL', 60))
+    
+    # DynamoDB mirror writes go through a SQL outbox drained by a background relay
+    OUTBOX_RELAY_ENABLED = os.environ.get('OUTBOX_RELAY_ENABLED', 'true').lower() == 'true'
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 100))
+    OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', 1.0))
+    # Failures after which an outbox event is reported as stuck (it keeps
+    # being retried), or parked when DynamoDB rejects the item itself
+    OUTBOX_ALERT_AFTER = int(os.environ.get('OUTBOX_ALERT_AFTER', 10))
+    
+    # Admin dashboard counters are updated on every write and fully
+    # recomputed this often (seconds, 0 disables the background refresh)
+    STATS_REFRESH_INTERVAL = int(os.environ.get('STATS_REFRESH_INTERVAL', 900))
+    
+    # Roles checked by admin_required/seller_required are cached in-process
+    # for this many seconds (0 disables the cache)
+    ROLE_CACHE_TTL = int(os.environ.get('ROLE_CACHE_TTL', 30))
+    # Replaced on every role change so all workers drop their cached roles;
+    # defaults to a per-database file in the temp directory (must be shared
+    # storage when workers run on several hosts)
+    ROLE_CACHE_SIGNAL_FILE = os.environ.get('ROLE_CACHE_SIGNAL_FILE')
+    
+    # Per-request SQL statistics (X-Query-* headers). Requests running more
+    # than QUERY_BUDGET statements, or one statement QUERY_REPEAT_THRESHOLD
+    # times (N+1), are logged
+    QUERY_MONITOR_ENABLED = os.environ.get('QUERY_MONITOR_ENABLED', 'true').lower() == 'true'
+    QUERY_BUDGET = int(os.environ.get('QUERY_BUDGET', 30))
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 5))
+    QUERY_MONITOR_TOOLBAR = os.environ.get('QUERY_MONITOR_TOOLBAR', 'false').lower() == 'true'
+    QUERY_MONITOR_RAISE = False
+    
+    # /metrics (Prometheus text format); with METRICS_TOKEN set, scrapers
+    # must send "Authorization: Bearer <token>". With METRICS_REQUIRE_TOKEN
+    # the endpoint is not served at all until a token is set
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_REQUIRE_TOKEN = False
+    
+    # Admin profiler: sampling runs are capped at PROFILER_MAX_SECONDS; a
+    # request with "X-Profile: <PROFILER_TOKEN>" is profiled without an admin session
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'true').lower() == 'true'
+    PROFILER_TOKEN = os.environ.get('PROFILER_TOKEN')
+    PROFILER_MAX_SECONDS = int(os.environ.get('PROFILER_MAX_SECONDS', 60))
+    PROFILER_MAX_PROFILES = int(os.environ.get('PROFILER_MAX_PROFILES', 20))
+    
+    # Slow-query log (/admin/slow-queries): statements slower than
+    # SLOW_QUERY_THRESHOLD_MS are stored with their EXPLAIN output, written
+    # every SLOW_QUERY_FLUSH_INTERVAL seconds (0 disables the background flush)
+    SLOW_QUERY_LOG_ENABLED = os.environ.get('SLOW_QUERY_LOG_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+    SLOW_QUERY_FLUSH_INTERVAL = float(os.environ.get('SLOW_QUERY_FLUSH_INTERVAL', 5))
+    
     # Session settings
     SESSION_TYPE = 'filesystem'
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
@@ -37,17 +91,28 @@ class DevelopmentConfig(Config):
     """Development environment configuration."""
     DEBUG = True
     TESTING = False
+    QUERY_MONITOR_TOOLBAR = os.environ.get('QUERY_MONITOR_TOOLBAR', 'true').lower() == 'true'
 
 class ProductionConfig(Config):
     """Production environment configuration."""
     DEBUG = False
     TESTING = False
     # In production, SECRET_KEY must be set via environment variable
+    # X-Query-*/Server-Timing headers describe the database to every client
+    QUERY_MONITOR_ENABLED = os.environ.get('QUERY_MONITOR_ENABLED', 'false').lower() == 'true'
+    METRICS_REQUIRE_TOKEN = True
     
 class TestingConfig(Config):
     """Testing environment configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    CATALOG_COUNT_TTL = 0
+    OUTBOX_RELAY_ENABLED = False
+    STATS_REFRESH_INTERVAL = 0
+    ROLE_CACHE_TTL = 0
+    SLOW_QUERY_FLUSH_INTERVAL = 0
+    # Fail any test whose request repeats one query QUERY_REPEAT_THRESHOLD times
+    QUERY_MONITOR_RAISE = True
 
 # Configuration dictionary
 config = {
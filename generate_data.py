@@ -0,0 +1,263 @@
+"""
+Synthetic data generator for scale testing.
+
+Produces N users, M books and K orders with production-like shapes:
+  - a seller mix: a small share of users are sellers (most of them
+    validated) and a few large sellers own most of the catalog;
+  - Zipfian book popularity: a handful of bestsellers take most orders;
+  - seasonal order dates: a holiday peak, weekend and evening bumps,
+    written in chronological order like a real order table.
+
+Output is either CSV files in the format read by `seed_data.py` and
+`app_aws.py seed`, or rows bulk-inserted straight into the configured
+database (SQLite/MySQL). The same options always produce the same data;
+order dates default to the year ending 2025-12-31, not today.
+
+Usage:
+  python generate_data.py --users 10000 --books 100000 --orders 500000 --out data/large
+  python generate_data.py --users 10000 --books 100000 --orders 500000 --db
+"""
+import argparse
+import csv
+import os
+import random
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+USER_COLUMNS = ['username', 'email', 'password', 'role', 'is_validated']
+BOOK_COLUMNS = ['title', 'author', 'description', 'price', 'stock', 'image_url', 'seller_username', 'isbn']
+ORDER_COLUMNS = ['buyer_username', 'book_title', 'quantity', 'total_price', 'status', 'order_date']
+
+# Every generated account of a role shares its password so load tests can log in
+PASSWORDS = {'admin': 'admin123', 'seller': 'seller123', 'buyer': 'buyer123'}
+
+SELLER_SHARE = 0.02
+VALIDATED_SELLER_SHARE = 0.85
+ZIPF_EXPONENT = 1.1
+CANCELLED_SHARE = 0.04
+DAYS = 365
+# Fixed so the same --seed gives the same data on any day
+DEFAULT_END = date(2025, 12, 31)
+
+# Relative order volume per month (holiday peak) and per hour of day
+MONTH_WEIGHTS = {1: 0.8, 2: 0.75, 3: 0.85, 4: 0.85, 5: 0.9, 6: 0.95,
+                 7: 1.0, 8: 1.05, 9: 0.9, 10: 1.0, 11: 1.4, 12: 1.7}
+WEEKEND_WEIGHT = 1.25
+HOUR_WEIGHTS = [0.2, 0.1, 0.1, 0.1, 0.1, 0.2, 0.4, 0.7, 0.9, 1.0, 1.1, 1.2,
+                1.4, 1.3, 1.1, 1.0, 1.0, 1.1, 1.3, 1.6, 1.8, 1.7, 1.2, 0.6]
+QUANTITY_WEIGHTS = {1: 80, 2: 14, 3: 4, 4: 2}
+
+FIRST_NAMES = ['aarav', 'priya', 'rohan', 'ananya', 'vikram', 'meera', 'arjun', 'kavya', 'john', 'jane',
+               'alice', 'bob', 'maria', 'chen', 'fatima', 'lucas', 'sofia', 'omar', 'yuki', 'noah']
+LAST_NAMES = ['sharma', 'patel', 'iyer', 'khan', 'reddy', 'gupta', 'singh', 'smith', 'garcia', 'kim',
+              'nguyen', 'silva', 'muller', 'rossi', 'ali', 'tanaka', 'brown', 'das', 'roy', 'mehta']
+TITLE_ADJECTIVES = ['Silent', 'Hidden', 'Last', 'Broken', 'Golden', 'Midnight', 'Forgotten', 'Crimson',
+                    'Endless', 'Quiet', 'Burning', 'Distant', 'Secret', 'Wild', 'Paper', 'Glass']
+TITLE_NOUNS = ['River', 'Library', 'Kingdom', 'Garden', 'Algorithm', 'Empire', 'Monsoon', 'Harbor',
+               'Orchard', 'Machine', 'Mountain', 'Letters', 'Habits', 'Compass', 'Station', 'Island']
+GENRES = ['novel', 'thriller', 'memoir', 'history', 'self-help guide', 'fantasy saga', 'biography',
+          'science book', 'mystery', 'business book']
+
+def zipf_cum_weights(count, exponent):
+    """Cumulative Zipf weights for ranks 1..count, for random.choices(cum_weights=...)."""
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+def isbn13(serial):
+    """A valid ISBN-13 in the 978 range, unique per serial."""
+    digits = f"978{serial % 10**9:09d}"
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return digits + str((10 - total % 10) % 10)
+
+class DataGenerator:
+    """Deterministic generator of user, book and order records.
+
+    Records use the column names of the seed CSV files and reference each
+    other by username and title. Users and books are kept in memory (orders
+    sample from them); orders are streamed, so K can exceed memory.
+    """
+
+    def __init__(self, users, books, orders, seller_share=SELLER_SHARE, zipf=ZIPF_EXPONENT,
+                 start=None, end=None, seed=42):
+        if users < 2 or books < 1 or orders < 0:
+            raise ValueError("Need at least 2 users (an admin and a seller), 1 book and 0 orders")
+        self.user_count = users
+        self.book_count = books
+        self.order_count = orders
+        self.seller_count = min(users - 1, max(1, round(users * seller_share)))
+        self.zipf = zipf
+        self.end = end or DEFAULT_END
+        self.start = start or self.end - timedelta(days=DAYS - 1)
+        if self.start > self.end:
+            raise ValueError("start date is after end date")
+        self.seed = seed
+        self._users = None
+        self._books = None
+
+    def users(self):
+        """One admin, then sellers, then buyers."""
+        if self._users is None:
+            rng = random.Random(f"{self.seed}:users")
+            users = [{'username': 'admin', 'email': 'admin@bookbazaar.com',
+                      'password': PASSWORDS['admin'], 'role': 'admin', 'is_validated': 'True'}]
+            for i in range(1, self.user_count):
+                role = 'seller' if i <= self.seller_count else 'buyer'
+                username = f"{rng.choice(FIRST_NAMES)}_{rng.choice(LAST_NAMES)}_{i}"
+                validated = role == 'seller' and rng.random() < VALIDATED_SELLER_SHARE
+                users.append({
+                    'username': username,
+                    'email': f"{username}@example.com",
+                    'password': PASSWORDS[role],
+                    'role': role,
+                    'is_validated': str(validated)
+                })
+            self._users = users
+        return self._users
+
+    def books(self):
+        """Books with unique titles; a few big sellers own most of the catalog."""
+        if self._books is None:
+            rng = random.Random(f"{self.seed}:books")
+            sellers = [user['username'] for user in self.users() if user['role'] == 'seller']
+            seller_weights = zipf_cum_weights(len(sellers), 1.0)
+            authors = [f"{rng.choice(FIRST_NAMES).title()} {rng.choice(LAST_NAMES).title()}"
+                       for _ in range(max(1, self.book_count // 4))]
+            author_weights = zipf_cum_weights(len(authors), 0.8)
+            books = []
+            for i in range(1, self.book_count + 1):
+                title = f"The {rng.choice(TITLE_ADJECTIVES)} {rng.choice(TITLE_NOUNS)} {i}"
+                # Log-normal prices around ₹450, ending in .00 or .99
+                price = min(5000, max(99, int(rng.lognormvariate(6.1, 0.5)))) + rng.choice((0.0, 0.99))
+                books.append({
+                    'title': title,
+                    'author': rng.choices(authors, cum_weights=author_weights)[0],
+                    'description': f"A {rng.choice(GENRES)} about the {title[4:].rsplit(' ', 1)[0].lower()}.",
+                    'price': f"{price:.2f}",
+                    'stock': str(0 if rng.random() < 0.05 else rng.randint(1, 200)),
+                    'image_url': '',
+                    'seller_username': rng.choices(sellers, cum_weights=seller_weights)[0],
+                    'isbn': isbn13(i)
+                })
+            self._books = books
+        return self._books
+
+    def _orders_per_day(self):
+        """Split order_count over the date range by seasonal weight (largest remainder)."""
+        days = [self.start + timedelta(days=n) for n in range((self.end - self.start).days + 1)]
+        weights = [MONTH_WEIGHTS[day.month] * (WEEKEND_WEIGHT if day.weekday() >= 5 else 1.0)
+                   for day in days]
+        total = sum(weights)
+        shares = [self.order_count * weight / total for weight in weights]
+        counts = [int(share) for share in shares]
+        remainders = sorted(range(len(days)), key=lambda n: counts[n] - shares[n])
+        for n in remainders[:self.order_count - sum(counts)]:
+            counts[n] += 1
+        return zip(days, counts)
+
+    def orders(self):
+        """Yield orders in chronological order."""
+        rng = random.Random(f"{self.seed}:orders")
+        books = self.books()
+        buyers = [user['username'] for user in self.users() if user['role'] == 'buyer'] or \
+            [user['username'] for user in self.users()]
+        # Popularity rank is independent of listing order
+        ranked_books = books[:]
+        rng.shuffle(ranked_books)
+        book_weights = zipf_cum_weights(len(ranked_books), self.zipf)
+        buyer_weights = zipf_cum_weights(len(buyers), 0.6)
+        hour_weights = list(accumulate(HOUR_WEIGHTS))
+        quantities, quantity_weights = list(QUANTITY_WEIGHTS), list(accumulate(QUANTITY_WEIGHTS.values()))
+
+        for day, count in self._orders_per_day():
+            if not count:
+                continue
+            picked_books = rng.choices(ranked_books, cum_weights=book_weights, k=count)
+            picked_buyers = rng.choices(buyers, cum_weights=buyer_weights, k=count)
+            hours = rng.choices(range(24), cum_weights=hour_weights, k=count)
+            seconds = sorted(hour * 3600 + rng.randrange(3600) for hour in hours)
+            age = (self.end - day).days
+            for book, buyer, second in zip(picked_books, picked_buyers, seconds):
+                quantity = rng.choices(quantities, cum_weights=quantity_weights)[0]
+                yield {
+                    'buyer_username': buyer,
+                    'book_title': book['title'],
+                    'quantity': str(quantity),
+                    'total_price': f"{float(book['price']) * quantity:.2f}",
+                    'status': self._status(rng, age),
+                    'order_date': (datetime.combine(day, datetime.min.time())
+                                   + timedelta(seconds=second)).strftime('%Y-%m-%d %H:%M:%S')
+                }
+
+    @staticmethod
+    def _status(rng, age):
+        if rng.random() < CANCELLED_SHARE:
+            return 'Cancelled'
+        if age < 1:
+            return 'Placed'
+        if age < 3:
+            return 'Processing'
+        if age < 7:
+            return 'Shipped'
+        return 'Delivered'
+
+def write_csv(path, columns, records):
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    return count
+
+def write_csvs(generator, out_dir):
+    """Write users.csv, books.csv and orders.csv into `out_dir`."""
+    os.makedirs(out_dir, exist_ok=True)
+    for name, columns, records in (('users', USER_COLUMNS, generator.users()),
+                                   ('books', BOOK_COLUMNS, generator.books()),
+                                   ('orders', ORDER_COLUMNS, generator.orders())):
+        count = write_csv(os.path.join(out_dir, f"{name}.csv"), columns, records)
+        print(f"✓ Wrote {count} {name} to {os.path.join(out_dir, name + '.csv')}")
+
+def write_database(generator, batch_size=None):
+    """Bulk insert into the database configured for the app."""
+    import seed_data
+    from app import create_app
+    from app.services.statistics import statistics
+
+    batch_size = batch_size or seed_data.BATCH_SIZE
+    app = create_app()
+    with app.app_context():
+        print("Inserting users...")
+        # Synthetic accounts with known passwords; scrypt would dominate the run
+        seed_data.load_users(generator.users(), batch_size, fast_hash=True)
+        print("Inserting books...")
+        seed_data.load_books(generator.books(), batch_size)
+        print("Inserting orders...")
+        seed_data.load_orders(generator.orders(), batch_size)
+        statistics.refresh()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic users, books and orders for scale testing.")
+    parser.add_argument("--users", type=int, default=1000, help="number of users, including one admin (default 1000)")
+    parser.add_argument("--books", type=int, default=10000, help="number of books (default 10000)")
+    parser.add_argument("--orders", type=int, default=50000, help="number of orders (default 50000)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="write users.csv, books.csv and orders.csv to this directory")
+    target.add_argument("--db", action="store_true", help="bulk insert into the configured database")
+    parser.add_argument("--seller-share", type=float, default=SELLER_SHARE,
+                        help=f"share of users that are sellers (default {SELLER_SHARE})")
+    parser.add_argument("--zipf", type=float, default=ZIPF_EXPONENT,
+                        help=f"Zipf exponent of book popularity (default {ZIPF_EXPONENT})")
+    parser.add_argument("--start", type=date.fromisoformat, default=None,
+                        help=f"first order date, YYYY-MM-DD (default {DAYS} days before --end)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help=f"last order date (default {DEFAULT_END})")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default 42)")
+    parser.add_argument("--batch-size", type=int, default=None, help="rows per INSERT batch with --db")
+    args = parser.parse_args()
+
+    generator = DataGenerator(args.users, args.books, args.orders, seller_share=args.seller_share,
+                              zipf=args.zipf, start=args.start, end=args.end, seed=args.seed)
+    if args.db:
+        write_database(generator, args.batch_size)
+    else:
+        write_csvs(generator, args.out)
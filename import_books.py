@@ -1,60 +1,40 @@
-import csv
+import argparse
 import os
 from app import create_app
-from app.extensions import db
-from app.models.book import Book
+from app.services.catalog_import import CatalogImporter, BATCH_SIZE
 
-def import_books(csv_file_path):
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'books.csv')
+
+def import_books(csv_file_path, batch_size=BATCH_SIZE, workers=None, reject_path=None, mode='upsert'):
     app = create_app()
     with app.app_context():
         print(f"Starting import from {csv_file_path}...")
-        
+
         try:
-            with open(csv_file_path, mode='r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                
-                count = 0
-                for row in reader:
-                    # Basic cleaning
-                    title = row.get('title', 'Unknown Title').strip()
-                    author = row.get('author', 'Unknown Author').strip()
-                    description = row.get('description', '').strip()
-                    
-                    try:
-                        price = float(row.get('price', 0))
-                    except (ValueError, TypeError):
-                        price = 0.0
-                        
-                    image_url = row.get('image_url', '').strip()
-                    
-                    # Create book object
-                    book = Book(
-                        title=title,
-                        author=author,
-                        description=description,
-                        price=price,
-                        stock=50,  # Default stock
-                        image_url=image_url if image_url else None
-                    )
-                    
-                    db.session.add(book)
-                    count += 1
-                    
-                    # Commit in batches for performance
-                    if count % 100 == 0:
-                        db.session.commit()
-                        print(f"Imported {count} books...")
-                
-                db.session.commit()
-                print(f"Finished! Total books imported: {count}")
-                
+            importer = CatalogImporter(batch_size=batch_size, workers=workers, mode=mode)
+            result = importer.import_file(csv_file_path, reject_path=reject_path)
+            print(f"Finished! Total books imported: {result['rows']} "
+                  f"({result['inserted']} new, {result['updated']} updated, {result['unchanged']} unchanged) "
+                  f"in {result['seconds']:.1f}s ({result['rows_per_second']:,.0f} rows/sec)")
+            return result
         except FileNotFoundError:
             print(f"Error: File not found at {csv_file_path}")
         except Exception as e:
             print(f"An error occurred: {e}")
-            db.session.rollback()
 
 if __name__ == "__main__":
-    # Use absolute path for reliability
-    data_path = r"d:\Projects Unknown\capstone_bookstore-Libraria-\data\books_final.csv"
-    import_books(data_path)
+    parser = argparse.ArgumentParser(description="Bulk import books from a CSV feed.")
+    parser.add_argument("csv_file", nargs="?", default=DEFAULT_CSV,
+                        help="CSV with title, author, description, price and image_url columns")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"rows per INSERT batch (default {BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes used to parse and validate rows (default: CPU count)")
+    parser.add_argument("--rejects", default=None,
+                        help="where to write rows that fail validation (default: <csv_file>.rejects.csv)")
+    parser.add_argument("--mode", choices=CatalogImporter.MODES, default="upsert",
+                        help="upsert: match existing books on ISBN or title+author (default); "
+                             "insert: append only, for loading an empty catalog")
+    args = parser.parse_args()
+    import_books(args.csv_file, batch_size=args.batch_size, workers=args.workers,
+                 reject_path=args.rejects, mode=args.mode)
@@ -1,93 +1,161 @@
+import argparse
 import csv
 import os
 from datetime import datetime
+from sqlalchemy import insert
 from app import create_app
 from app.extensions import db
 from app.models.user import User
 from app.models.book import Book
 from app.models.order import Order
+from app.services.catalog_feed import validate_row
+from app.services.passwords import hash_passwords
+from app.services.catalog_import import CatalogImporter, bulk_load_pragmas, chunked
+from app.services.statistics import statistics
 
-def seed_users(csv_file):
+DEFAULT_DATA_DIR = os.environ.get('SEED_DATA_DIR') or \
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+BATCH_SIZE = 5000
+
+def read_csv(csv_file):
+    with open(csv_file, mode='r', encoding='utf-8', newline='') as f:
+        yield from csv.DictReader(f)
+
+def user_ids():
+    """username -> id for every user, in one query."""
+    return dict(db.session.query(User.username, User.id).order_by(User.id.desc()))
+
+def book_ids():
+    """title -> id for every book, in one query (the oldest book wins for duplicate titles)."""
+    return dict(db.session.query(Book.title, Book.id).order_by(Book.id.desc()))
+
+def bulk_insert(table, rows, batch_size=BATCH_SIZE):
+    """Insert row dicts with Core executemany, committing every `batch_size` rows."""
+    count = 0
+    with db.engine.connect() as connection, bulk_load_pragmas(connection):
+        for batch in chunked(rows, batch_size):
+            connection.execute(insert(table), batch)
+            connection.commit()
+            count += len(batch)
+            if count % (batch_size * 20) == 0:
+                print(f"  {count} rows...")
+    return count
+
+def seed_users(csv_file, batch_size=BATCH_SIZE, workers=None, fast_hash=False):
     print(f"Seeding users from {csv_file}...")
-    with open(csv_file, mode='r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if User.query.filter_by(username=row['username']).first():
-                print(f"User {row['username']} already exists, skipping.")
-                continue
-            
-            user = User(
-                username=row['username'],
-                email=row['email'],
-                role=row['role'],
-                is_validated=row['is_validated'].lower() == 'true'
-            )
-            user.set_password(row['password'])
-            db.session.add(user)
-    db.session.commit()
-    print("✓ Users seeded.")
-
-def seed_books(csv_file):
+    load_users(read_csv(csv_file), batch_size, workers, fast_hash)
+
+def load_users(records, batch_size=BATCH_SIZE, workers=None, fast_hash=False):
+    """Insert user records (users.csv columns), skipping existing usernames and emails."""
+    existing = set()
+    for username, email in db.session.query(User.username, User.email):
+        existing.update((username, email))
+    new_users = []
+    for row in records:
+        if row['username'] in existing or row['email'] in existing:
+            print(f"User {row['username']} already exists, skipping.")
+            continue
+        existing.update((row['username'], row['email']))
+        new_users.append(row)
+    hashes = hash_passwords((row['password'].strip() for row in new_users), workers, fast_hash)
+    now = datetime.utcnow()
+
+    rows = (
+        {
+            'username': row['username'],
+            'email': row['email'],
+            'password_hash': password_hash,
+            'role': row['role'],
+            'is_validated': row['is_validated'].lower() == 'true',
+            'created_at': now
+        }
+        for row, password_hash in zip(new_users, hashes)
+    )
+    count = bulk_insert(User.__table__, rows, batch_size)
+    print(f"✓ Users seeded ({count} new).")
+
+def seed_books(csv_file, batch_size=BATCH_SIZE):
     print(f"Seeding books from {csv_file}...")
-    with open(csv_file, mode='r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if Book.query.filter_by(title=row['title']).first():
-                print(f"Book '{row['title']}' already exists, skipping.")
-                continue
-            
-            seller = User.query.filter_by(username=row['seller_username']).first()
-            if not seller:
-                print(f"Warning: Seller {row['seller_username']} not found for book {row['title']}. Skipping.")
-                continue
-                
-            book = Book(
-                title=row['title'],
-                author=row['author'],
-                description=row['description'],
-                price=float(row['price']),
-                stock=int(row['stock']),
-                image_url=row['image_url'] if row['image_url'] else None,
-                seller_id=seller.id
-            )
-            db.session.add(book)
-    db.session.commit()
-    print("✓ Books seeded.")
-
-def seed_orders(csv_file):
+    load_books(read_csv(csv_file), batch_size)
+
+def load_books(records, batch_size=BATCH_SIZE):
+    """Upsert book records (books.csv columns) owned by existing sellers."""
+    sellers = user_ids()
+    rows = []
+    for row in records:
+        seller_id = sellers.get(row['seller_username'])
+        if not seller_id:
+            print(f"Warning: Seller {row['seller_username']} not found for book {row['title']}. Skipping.")
+            continue
+
+        values, reason = validate_row(row)
+        if reason:
+            print(f"Warning: {reason} for book {row['title']}. Skipping.")
+            continue
+        values['stock'] = int(row['stock'])
+        values['seller_id'] = seller_id
+        rows.append(values)
+
+    # Upsert on the natural key so re-seeding updates books instead of duplicating them
+    importer = CatalogImporter(batch_size=batch_size, mode='upsert', report=lambda message: None)
+    result = importer.import_rows(rows)
+    print(f"✓ Books seeded ({result['inserted']} new, {result['updated']} updated, "
+          f"{result['unchanged']} unchanged).")
+
+def seed_orders(csv_file, batch_size=BATCH_SIZE):
     print(f"Seeding orders from {csv_file}...")
-    with open(csv_file, mode='r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            buyer = User.query.filter_by(username=row['buyer_username']).first()
-            book = Book.query.filter_by(title=row['book_title']).first()
-            
-            if not buyer or not book:
-                print(f"Warning: Buyer or Book not found for order. Skipping.")
+    load_orders(read_csv(csv_file), batch_size)
+
+def load_orders(records, batch_size=BATCH_SIZE):
+    """Insert order records (orders.csv columns) for existing buyers and books."""
+    buyers = user_ids()
+    books = book_ids()
+    skipped = 0
+
+    def rows():
+        nonlocal skipped
+        for row in records:
+            buyer_id = buyers.get(row['buyer_username'])
+            book_id = books.get(row['book_title'])
+            if not buyer_id or not book_id:
+                skipped += 1
                 continue
-                
-            order = Order(
-                user_id=buyer.id,
-                book_id=book.id,
-                quantity=int(row['quantity']),
-                total_price=float(row['total_price']),
-                status=row['status'],
-                order_date=datetime.strptime(row['order_date'], '%Y-%m-%d %H:%M:%S')
-            )
-            db.session.add(order)
-    db.session.commit()
-    print("✓ Orders seeded.")
-
-def run_seeder():
+            yield {
+                'user_id': buyer_id,
+                'book_id': book_id,
+                'quantity': int(row['quantity']),
+                'total_price': float(row['total_price']),
+                'status': row['status'],
+                'order_date': datetime.fromisoformat(row['order_date'])
+            }
+
+    count = bulk_insert(Order.__table__, rows(), batch_size)
+    if skipped:
+        print(f"Warning: Buyer or Book not found for {skipped} orders. Skipped.")
+    print(f"✓ Orders seeded ({count} new).")
+
+def run_seeder(data_dir=DEFAULT_DATA_DIR, batch_size=BATCH_SIZE, workers=None, fast_hash=False):
     app = create_app()
     with app.app_context():
-        base_path = r"d:\Projects Unknown\capstone_bookstore-Libraria-\data"
-        
-        seed_users(os.path.join(base_path, "users.csv"))
-        seed_books(os.path.join(base_path, "books.csv"))
-        seed_orders(os.path.join(base_path, "orders.csv"))
-        
+        seed_users(os.path.join(data_dir, "users.csv"), batch_size, workers, fast_hash)
+        seed_books(os.path.join(data_dir, "books.csv"), batch_size)
+        seed_orders(os.path.join(data_dir, "orders.csv"), batch_size)
+
+        # Bulk inserts bypass the ORM hooks that maintain dashboard statistics
+        statistics.refresh()
+
         print("\nAll data seeded successfully! 🚀")
 
 if __name__ == "__main__":
-    run_seeder()
+    parser = argparse.ArgumentParser(description="Seed users, books and orders from CSV files.")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR,
+                        help="directory containing users.csv, books.csv and orders.csv "
+                             "(default: $SEED_DATA_DIR or ./data)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"rows per INSERT batch (default {BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes hashing passwords (default: CPU count)")
+    parser.add_argument("--fast-hash", action="store_true",
+                        help="cheap password hashes for synthetic/staging data (never for real accounts)")
+    args = parser.parse_args()
+    run_seeder(args.data_dir, args.batch_size, args.workers, args.fast_hash)
@@ -0,0 +1,42 @@
+import os
+import pytest
+from moto import mock_aws
+
+os.environ.setdefault("FLASK_ENV", "testing")
+
+import app_aws
+from app import create_app
+from app.extensions import db
+
+
+@pytest.fixture
+def app():
+    """Flask app bound to a fresh in-memory SQLite database."""
+    os.environ["FLASK_ENV"] = "testing"
+    app = create_app()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    """Fake credentials, so boto3 can never reach a real AWS account."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+@pytest.fixture
+def mock_aws_app(aws_credentials, monkeypatch):
+    """A fresh AWSApp on moto's in-memory AWS, patched in as app_aws.aws_app."""
+    with mock_aws():
+        fresh = app_aws.AWSApp()
+        monkeypatch.setattr(app_aws, "aws_app", fresh)
+        yield fresh
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+from app.repositories.order_repo import OrderRepository
+
+
+def _seed(count):
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role="admin")
+    buyer = User(username="buyer", email="buyer@example.com", password_hash="x")
+    seller = User(username="seller", email="seller@example.com", password_hash="x", role="seller")
+    db.session.add_all([admin, buyer, seller])
+    db.session.flush()
+    books = [Book(title=f"Book {i}", author="A", price=10.0, stock=5, seller_id=seller.id) for i in range(3)]
+    db.session.add_all(books)
+    db.session.flush()
+    base = datetime(2024, 3, 1)
+    for i in range(count):
+        db.session.add(Order(user_id=buyer.id, book_id=books[i % 3].id, total_price=10.0,
+                             status="Cancelled" if i % 4 == 0 else "Placed",
+                             order_date=base + timedelta(days=i // 2)))
+    db.session.commit()
+    return admin.id
+
+
+def test_list_for_admin_filters_and_pages(app):
+    with app.app_context():
+        _seed(10)
+        repo = OrderRepository()
+
+        first = repo.list_for_admin(4, status="Placed")
+        assert len(first.items) == 4
+        assert all(o.status == "Placed" for o in first.items)
+        rest = repo.list_for_admin(4, cursor=first.next_cursor, status="Placed")
+        assert len(rest.items) == 3 and not rest.has_next
+
+        in_range = repo.list_for_admin(50, start=datetime(2024, 3, 2), end=datetime(2024, 3, 4))
+        assert {o.order_date.day for o in in_range.items} == {2, 3}
+
+
+def _count_queries(app, client, url):
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            response = client.get(url)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    return len(statements), response
+
+
+def test_orders_page_query_count_is_constant(app, client):
+    with app.app_context():
+        admin_id = _seed(60)
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_id
+
+    small, _ = _count_queries(app, client, "/admin/orders?status=Cancelled")
+    full, response = _count_queries(app, client, "/admin/orders")
+
+    assert small == full
+    assert b"Next" in response.data and b"seller" in response.data
+
+
+def test_status_filter_offers_every_order_status(app, client):
+    with app.app_context():
+        admin_id = _seed(1)
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_id
+
+    response = client.get("/admin/orders?status=Shipped")
+    assert response.status_code == 200
+    for status in (b"Placed", b"Processing", b"Shipped", b"Delivered", b"Cancelled"):
+        assert b'value="' + status + b'"' in response.data
@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from app.models.user import User
+from app.services.authorization import RoleCache, role_cache
+
+
+@pytest.fixture
+def cached(app, tmp_path):
+    app.config['ROLE_CACHE_TTL'] = 60
+    app.config['ROLE_CACHE_SIGNAL_FILE'] = str(tmp_path / "roles.signal")
+    with app.app_context():
+        role_cache.invalidate()
+    yield
+    with app.app_context():
+        role_cache.invalidate()
+
+
+def _user_lookups(app, fn):
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            fn()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+    return [s for s in statements if 'FROM "user"' in s or "FROM user" in s]
+
+
+def _make_users(app):
+    with app.app_context():
+        admin = User(username="admin", email="admin@example.com", password_hash="x", role="admin")
+        buyer = User(username="buyer", email="buyer@example.com", password_hash="x")
+        db.session.add_all([admin, buyer])
+        db.session.commit()
+        return admin.id, buyer.id
+
+
+def test_role_is_looked_up_once_within_ttl(app, client, cached):
+    admin_id, _ = _make_users(app)
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_id
+
+    first = _user_lookups(app, lambda: client.get("/admin/books"))
+    again = _user_lookups(app, lambda: client.get("/admin/books"))
+
+    assert len(first) == 1
+    assert again == []
+
+
+def test_role_changes_apply_immediately(app, client, cached):
+    admin_id, buyer_id = _make_users(app)
+    with client.session_transaction() as sess:
+        sess['user_id'] = buyer_id
+    assert client.get("/seller/dashboard").status_code == 302
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_id
+    client.post(f"/admin/users/promote_seller/{buyer_id}")
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = buyer_id
+    assert client.get("/seller/dashboard").status_code == 200
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_id
+    client.post("/admin/users/bulk_reset_buyers")
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = buyer_id
+    assert client.get("/seller/dashboard").status_code == 302
+
+
+def test_lru_evicts_oldest_entry(app, cached):
+    admin_id, buyer_id = _make_users(app)
+    with app.app_context():
+        role_cache.max_size = 1
+        try:
+            assert role_cache.get(admin_id).role == "admin"
+            assert role_cache.get(buyer_id).role == "buyer"
+            assert list(role_cache._entries) == [buyer_id]
+        finally:
+            role_cache.max_size = 10000
+
+
+def test_invalidation_reaches_other_workers(app, cached):
+    admin_id, _ = _make_users(app)
+    other_worker = RoleCache()
+    with app.app_context():
+        assert other_worker.get(admin_id).role == "admin"
+
+        db.session.get(User, admin_id).role = "buyer"
+        db.session.commit()
+        # This worker handled the revoke; the other one must not keep serving "admin"
+        role_cache.invalidate(admin_id)
+
+        assert other_worker.get(admin_id).role == "buyer"
+        # Cached again until the next change
+        assert _user_lookups(app, lambda: other_worker.get(admin_id)) == []
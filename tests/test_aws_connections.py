@@ -0,0 +1,39 @@
+import threading
+from app_aws import DynamoBookRepository
+
+
+def test_clients_and_table_handles_are_reused(mock_aws_app):
+    aws = mock_aws_app
+    assert aws.sns is aws.sns
+    assert aws.client('dynamodb') is aws.client('dynamodb')
+    assert aws.table('BookBazaarBooks') is aws.table('BookBazaarBooks')
+    assert DynamoBookRepository(aws).table is DynamoBookRepository(aws).table
+    assert aws.sns.meta.config.max_pool_connections == aws.config.max_pool_connections
+
+
+def test_resources_are_per_thread_and_clients_shared(mock_aws_app):
+    aws = mock_aws_app
+    seen = {}
+
+    def worker(name):
+        seen[name] = (aws.dynamodb, aws.sns, aws.table('BookBazaarBooks').meta.client)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert seen[0][0] is not seen[1][0]
+    assert seen[0][1] is seen[1][1]
+    # Per-thread table handles still share one client and connection pool
+    assert seen[0][2] is seen[1][2] is aws.client('dynamodb')
+
+
+def test_reinitializes_after_fork(mock_aws_app):
+    aws = mock_aws_app
+    sns = aws.sns
+    table = aws.table('BookBazaarBooks')
+    aws._pid = -1  # what a forked child observes
+    assert aws.sns is not sns
+    assert aws.table('BookBazaarBooks') is not table
@@ -0,0 +1,70 @@
+from app_aws import DynamoUserRepository, DynamoOrderRepository, ensure_gsi, migrate_aws, setup_aws
+
+
+def test_get_by_email_queries_the_email_index(mock_aws_app, mocker):
+    setup_aws()
+    repo = DynamoUserRepository(mock_aws_app)
+    repo.add({'id': 'u1', 'username': 'alice', 'email': 'alice@example.com'})
+    repo.add({'id': 'u2', 'username': 'bob', 'email': 'bob@example.com'})
+
+    scan = mocker.spy(repo.table, 'scan')
+    assert repo.get_by_email('bob@example.com')['username'] == 'bob'
+    assert repo.get_by_email('nobody@example.com') is None
+    scan.assert_not_called()
+
+
+def test_legacy_table_falls_back_to_scan_until_migrated(mock_aws_app):
+    mock_aws_app.dynamodb.create_table(
+        TableName='BookBazaarUsers',
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    repo = DynamoUserRepository(mock_aws_app)
+    repo.add({'id': 'u1', 'username': 'alice', 'email': 'alice@example.com'})
+    assert repo.get_by_email('alice@example.com')['username'] == 'alice'
+
+    assert ensure_gsi(
+        'BookBazaarUsers', 'EmailIndex',
+        key_schema=[{'AttributeName': 'email', 'KeyType': 'HASH'}],
+        attribute_definitions=[{'AttributeName': 'email', 'AttributeType': 'S'}]
+    )
+    indexes = mock_aws_app.client('dynamodb').describe_table(TableName='BookBazaarUsers')['Table']['GlobalSecondaryIndexes']
+    assert [i['IndexName'] for i in indexes] == ['EmailIndex']
+
+
+def test_query_by_seller_is_newest_first_and_paginated(mock_aws_app, mocker):
+    setup_aws()
+    repo = DynamoOrderRepository(mock_aws_app)
+    for day in range(1, 6):
+        repo.add({'id': f'o{day}', 'seller_id': 's1', 'order_date': f'2024-01-0{day}T10:00:00', 'total_price': 10.0})
+    repo.add({'id': 'other', 'seller_id': 's2', 'order_date': '2024-01-03T10:00:00', 'total_price': 10.0})
+
+    first = repo.query_by_seller('s1', limit=2)
+    assert [o['id'] for o in first['Items']] == ['o5', 'o4']
+    second = repo.query_by_seller('s1', limit=2, last_key=first['LastEvaluatedKey'])
+    assert [o['id'] for o in second['Items']] == ['o3', 'o2']
+
+    window = repo.query_by_seller('s1', start_date='2024-01-02', end_date='2024-01-04T23:59:59')
+    assert [o['id'] for o in window['Items']] == ['o4', 'o3', 'o2']
+
+    scan = mocker.spy(repo.table, 'scan')
+    assert [o['id'] for o in repo.get_by_seller_id('s1')] == ['o5', 'o4', 'o3', 'o2', 'o1']
+    scan.assert_not_called()
+
+
+def test_migrate_backfills_seller_on_legacy_orders(mock_aws_app):
+    for name in ('BookBazaarOrders', 'BookBazaarBooks', 'BookBazaarUsers'):
+        mock_aws_app.dynamodb.create_table(
+            TableName=name,
+            KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+    mock_aws_app.table('BookBazaarBooks').put_item(Item={'id': 'b1', 'seller_id': 'u7'})
+    mock_aws_app.table('BookBazaarOrders').put_item(Item={'id': 'o1', 'book_id': 'b1', 'order_date': '2024-01-01 10:00:00'})
+
+    migrate_aws()
+
+    repo = DynamoOrderRepository(mock_aws_app)
+    assert [o['id'] for o in repo.query_by_seller('u7')['Items']] == ['o1']
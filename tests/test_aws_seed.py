@@ -0,0 +1,71 @@
+import csv
+import pytest
+from werkzeug.security import check_password_hash
+import app_aws
+from app_aws import DynamoOrderRepository, seed_db, setup_aws
+
+
+@pytest.fixture
+def aws(mock_aws_app):
+    setup_aws()
+    return mock_aws_app
+
+
+def write_csv(path, header, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    write_csv(tmp_path / 'users.csv', ['username', 'email', 'password', 'role', 'is_validated'], [
+        ['sam_seller', 'sam@example.com', 'seller123', 'seller', 'True'],
+        ['bea_buyer', 'bea@example.com', 'buyer123', 'buyer', 'False'],
+    ])
+    write_csv(tmp_path / 'books.csv',
+              ['title', 'author', 'description', 'price', 'stock', 'image_url', 'seller_username'],
+              [[f'Book {i}', 'Author', '', '9.99', '5', '', 'sam_seller'] for i in range(60)])
+    write_csv(tmp_path / 'orders.csv',
+              ['buyer_username', 'book_title', 'quantity', 'total_price', 'status', 'order_date'], [
+        ['bea_buyer', 'Book 3', '2', '19.98', 'Placed', '2024-01-15 10:30:00'],
+    ])
+    return tmp_path
+
+
+def test_seed_batch_writes_all_three_tables(aws, data_dir, mocker):
+    batch_write = mocker.spy(app_aws, 'batch_write')
+
+    assert seed_db(str(data_dir), workers=1) == {'users': 2, 'books': 60, 'orders': 1}
+    assert sorted(call.args[0] for call in batch_write.call_args_list) == [
+        'BookBazaarBooks', 'BookBazaarOrders', 'BookBazaarUsers']
+
+    books = aws.table('BookBazaarBooks').scan()['Items']
+    assert len(books) == 60
+    assert {book['type'] for book in books} == {'book'}
+    assert {str(book['price']) for book in books} == {'9.99'}
+
+    user = aws.table('BookBazaarUsers').get_item(Key={'id': 'u2'})['Item']
+    assert user['username'] == 'bea_buyer' and user['is_validated'] is False
+    assert check_password_hash(user['password_hash'], 'buyer123')
+
+    # Orders carry the book's seller so the SellerDateIndex can find them
+    orders = DynamoOrderRepository(aws).query_by_seller('u1')['Items']
+    assert [(o['book_id'], o['order_date']) for o in orders] == [('b4', '2024-01-15T10:30:00')]
+
+
+def test_reseeding_overwrites_instead_of_duplicating(aws, data_dir):
+    seed_db(str(data_dir), workers=1)
+    seed_db(str(data_dir), workers=1)
+    assert aws.table('BookBazaarBooks').scan(Select='COUNT')['Count'] == 60
+
+
+def test_large_tables_are_split_across_writers(aws, data_dir, mocker, monkeypatch):
+    monkeypatch.setattr(app_aws, 'SEED_SHARD_MIN_ITEMS', 20)
+    batch_write = mocker.spy(app_aws, 'batch_write')
+
+    assert seed_db(str(data_dir), workers=1, writers=4)['books'] == 60
+    book_writes = [call for call in batch_write.call_args_list if call.args[0] == 'BookBazaarBooks']
+    assert len(book_writes) == 3
+    assert aws.table('BookBazaarBooks').scan(Select='COUNT')['Count'] == 60
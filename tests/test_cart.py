@@ -0,0 +1,26 @@
+from sqlalchemy import event
+from app.extensions import db
+from app.models.book import Book
+from app.services.cart import price_cart
+
+
+def test_price_cart_loads_books_in_one_query(app):
+    with app.app_context():
+        books = [Book(title=f"Book {i}", author="A", price=10.0 * (i + 1), stock=5) for i in range(5)]
+        db.session.add_all(books)
+        db.session.commit()
+        cart = {str(b.id): 2 for b in books}
+        cart["9999"] = 1  # removed from the catalog since it was added
+        db.session.expunge_all()
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            cart_items, total = price_cart(cart)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+        assert len(statements) == 1
+        assert [item['book'].title for item in cart_items] == [f"Book {i}" for i in range(5)]
+        assert total == 2 * (10 + 20 + 30 + 40 + 50)
@@ -0,0 +1,209 @@
+import csv
+import sqlite3
+from sqlalchemy import create_engine
+from app.extensions import db
+from app.models.book import Book
+from app.models.statistic import StoreStatistic
+from app.repositories.book_repo import BookRepository
+from app.services.catalog_import import CatalogImporter, bulk_load_pragmas
+
+
+def _write_feed(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["title", "author", "description", "price", "image_url"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_bulk_import_inserts_in_batches(app, tmp_path):
+    feed = tmp_path / "books.csv"
+    _write_feed(feed, [
+        {"title": f" Title {i} ", "author": "Author", "description": "", "price": "12.5",
+         "image_url": "" if i % 2 else f"https://example.com/{i}.jpg"}
+        for i in range(25)
+    ])
+    messages = []
+
+    with app.app_context():
+        result = CatalogImporter(batch_size=10, workers=1, report=messages.append).import_file(str(feed))
+
+        assert result["rows"] == 25
+        assert result["rejected"] == 0 and result["reject_file"] is None
+        assert len(messages) == 3 and "rows/sec" in messages[-1]
+        books = Book.query.order_by(Book.id).all()
+        assert len(books) == 25
+        assert books[0].title == "Title 0"
+        assert books[0].stock == 50 and books[0].price == 12.5
+        assert books[1].image_url is None
+        assert all(book.created_at is not None for book in books)
+        # Statistics are recomputed after bypassing the ORM
+        assert db.session.get(StoreStatistic, "books.total").value == 25
+
+
+def test_bulk_import_keeps_search_index_in_sync(app, tmp_path):
+    feed = tmp_path / "books.csv"
+    _write_feed(feed, [
+        {"title": "Zebra Handbook", "author": "Quill", "description": "", "price": "1", "image_url": ""},
+        {"title": "Other", "author": "Someone", "description": "", "price": "1", "image_url": ""},
+    ])
+
+    with app.app_context():
+        CatalogImporter(workers=1, report=lambda message: None).import_file(str(feed))
+        assert [b.title for b in BookRepository().search_paginated("zebra", 1, 10).items] == ["Zebra Handbook"]
+
+        # Per-row indexing is back on for ordinary writes
+        db.session.add(Book(title="Zebra Sequel", author="Quill", price=1.0))
+        db.session.commit()
+        assert BookRepository().search_paginated("zebra", 1, 10).total == 2
+
+
+def test_interrupted_bulk_load_is_indexed_on_next_install(app):
+    from sqlalchemy import text
+    from app.repositories.search_index import search_index
+
+    with app.app_context():
+        # A load killed inside deferred(): trigger dropped, rows never indexed
+        with db.engine.begin() as conn:
+            conn.execute(text("DROP TRIGGER book_fts_ai"))
+            conn.execute(text("INSERT INTO book (title, author, price, stock, created_at) "
+                              "VALUES ('Zebra Lost', 'Quill', 1, 1, '2024-01-01 00:00:00')"))
+        assert BookRepository().search_paginated("zebra", 1, 10).total == 0
+
+        search_index.install()
+        assert BookRepository().search_paginated("zebra", 1, 10).total == 1
+        db.session.add(Book(title="Zebra Found", author="Quill", price=1.0))
+        db.session.commit()
+        assert BookRepository().search_paginated("zebra", 1, 10).total == 2
+
+
+def test_invalid_rows_go_to_reject_file(app, tmp_path):
+    feed = tmp_path / "books.csv"
+    _write_feed(feed, [
+        {"title": "Good", "author": "A", "description": "", "price": "1,250.50", "image_url": "www.example.com/a.jpg"},
+        {"title": "", "author": "A", "description": "", "price": "10", "image_url": ""},
+        {"title": "Free?", "author": "A", "description": "", "price": "n/a", "image_url": ""},
+        {"title": "Negative", "author": "A", "description": "", "price": "-3", "image_url": ""},
+        {"title": "Bad cover", "author": "A", "description": "", "price": "3", "image_url": "ftp://x/y.jpg"},
+    ])
+    rejects = tmp_path / "rejects.csv"
+
+    with app.app_context():
+        result = CatalogImporter(workers=1, report=lambda message: None).import_file(str(feed), reject_path=str(rejects))
+
+        assert result["rows"] == 1 and result["rejected"] == 4
+        book = Book.query.one()
+        assert book.price == 1250.5
+        assert book.image_url == "https://www.example.com/a.jpg"
+
+    with open(rejects, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["line", "reason", "fields"]
+    assert [(r[0], r[1]) for r in rows[1:]] == [
+        ("3", "missing title"),
+        ("4", "invalid price 'n/a'"),
+        ("5", "price out of range '-3'"),
+        ("6", "invalid image_url 'ftp://x/y.jpg'"),
+    ]
+
+
+def test_process_pool_preserves_file_order(app, tmp_path):
+    feed = tmp_path / "books.csv"
+    _write_feed(feed, [
+        {"title": f"Book {i}", "author": "A", "description": "", "price": "" if i % 7 == 0 else "5", "image_url": ""}
+        for i in range(60)
+    ])
+
+    with app.app_context():
+        importer = CatalogImporter(workers=2, chunk_rows=8, batch_size=16, report=lambda message: None)
+        result = importer.import_file(str(feed))
+
+        assert result["rejected"] == 9
+        titles = [b.title for b in Book.query.order_by(Book.id)]
+        assert titles == [f"Book {i}" for i in range(60) if i % 7]
+
+
+def _upsert(app, feed):
+    with app.app_context():
+        return CatalogImporter(workers=1, report=lambda message: None).import_file(str(feed))
+
+
+def test_upsert_reimport_is_idempotent(app, tmp_path):
+    feed = tmp_path / "books.csv"
+    rows = [
+        {"title": "The Alchemist", "author": "Paulo Coelho", "description": "", "price": "450", "image_url": ""},
+        {"title": "Dune", "author": "Frank Herbert", "description": "", "price": "500", "image_url": ""},
+    ]
+    _write_feed(feed, rows)
+
+    first = _upsert(app, feed)
+    assert (first["inserted"], first["updated"], first["unchanged"]) == (2, 0, 0)
+
+    with app.app_context():
+        dune = Book.query.filter_by(title="Dune").one()
+        dune.stock = 3
+        db.session.commit()
+
+    # Same books with different spacing/case, one price change
+    rows[0]["title"], rows[0]["author"] = "the  alchemist", "PAULO COELHO"
+    rows[1]["price"] = "525"
+    _write_feed(feed, rows)
+    second = _upsert(app, feed)
+
+    assert (second["inserted"], second["updated"], second["unchanged"]) == (0, 2, 0)
+    with app.app_context():
+        assert Book.query.count() == 2
+        dune = Book.query.filter_by(title="Dune").one()
+        assert dune.price == 525 and dune.stock == 3
+
+    third = _upsert(app, feed)
+    assert (third["inserted"], third["updated"], third["unchanged"]) == (0, 0, 2)
+
+
+def test_upsert_prefers_isbn_and_dedupes_within_batch(app, tmp_path):
+    feed = tmp_path / "books.csv"
+    with open(feed, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "author", "description", "price", "image_url", "isbn"])
+        writer.writerow(["Old Title", "A", "", "10", "", "978-0-06-112241-5"])
+        writer.writerow(["New Title", "A", "", "12", "", "9780061122415"])
+
+    result = _upsert(app, feed)
+
+    assert result["inserted"] == 1 and result["duplicates"] == 1
+    with app.app_context():
+        book = Book.query.one()
+        assert (book.title, book.isbn, book.natural_key) == ("New Title", "9780061122415", "isbn:9780061122415")
+
+
+def test_ensure_columns_upgrades_existing_book_table(tmp_path):
+    from sqlalchemy import create_engine, inspect, text
+    from app.repositories.schema import ensure_columns, ensure_indexes
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE book (id INTEGER PRIMARY KEY, title VARCHAR(150) NOT NULL, "
+                          "author VARCHAR(200) NOT NULL, description TEXT, price FLOAT NOT NULL, "
+                          "stock INTEGER, seller_id INTEGER, image_url VARCHAR(500), created_at DATETIME)"))
+
+    # What create_app does: create_all skips the existing book table
+    db.metadata.create_all(engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+
+    inspector = inspect(engine)
+    assert {"isbn", "natural_key"} <= {c["name"] for c in inspector.get_columns("book")}
+    assert "ux_book_natural_key" in {i["name"] for i in inspector.get_indexes("book")}
+
+
+def test_bulk_load_keeps_wal_while_another_connection_is_open(tmp_path):
+    path = tmp_path / "shop.db"
+    engine = create_engine(f"sqlite:///{path}")
+    other = sqlite3.connect(path)
+    try:
+        with engine.connect() as connection:
+            with bulk_load_pragmas(connection):
+                other.execute("SELECT 1 FROM sqlite_master").fetchall()
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+    finally:
+        other.close()
+        engine.dispose()
@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.outbox import OutboxEvent
+from app.models.user import User
+from app.services.cart import price_cart
+from app.services.checkout import CheckoutService, InsufficientStockError
+
+
+@pytest.fixture
+def buyer(app):
+    with app.app_context():
+        user = User(username="buyer", email="buyer@example.com", password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def _books(*stocks):
+    books = [Book(title=f"Book {i}", author="A", price=100.0, stock=stock) for i, stock in enumerate(stocks)]
+    db.session.add_all(books)
+    db.session.commit()
+    return [b.id for b in books]
+
+
+def test_checkout_commits_once_and_decrements_stock(app, buyer):
+    with app.app_context():
+        ids = _books(5, 3)
+        cart_items, _ = price_cart({str(ids[0]): 2, str(ids[1]): 3})
+
+        commits = []
+        record = lambda session: commits.append(session)
+        event.listen(db.session, "after_commit", record)
+        try:
+            orders = CheckoutService().place_order(buyer, cart_items)
+        finally:
+            event.remove(db.session, "after_commit", record)
+
+        assert len(commits) == 1
+        assert len(orders) == 2
+        assert {b.id: b.stock for b in Book.query.all()} == {ids[0]: 3, ids[1]: 0}
+        assert Order.query.count() == 2
+        assert OutboxEvent.query.count() == 2
+
+
+def test_checkout_rolls_back_whole_basket(app, buyer):
+    with app.app_context():
+        ids = _books(5, 1)
+        cart_items, _ = price_cart({str(ids[0]): 2, str(ids[1]): 2})
+
+        with pytest.raises(InsufficientStockError) as exc:
+            CheckoutService().place_order(buyer, cart_items)
+
+        assert exc.value.book_id == ids[1]
+        assert {b.id: b.stock for b in Book.query.all()} == {ids[0]: 5, ids[1]: 1}
+        assert Order.query.count() == 0
+        assert OutboxEvent.query.count() == 0
+
+
+def test_stock_decrement_is_conditional(app):
+    with app.app_context():
+        from app.repositories.book_repo import BookRepository
+        (book_id,) = _books(1)
+        repo = BookRepository()
+        assert repo.decrement_stock(book_id, 1) is True
+        assert repo.decrement_stock(book_id, 1) is False
+        db.session.commit()
+        assert db.session.get(Book, book_id).stock == 0
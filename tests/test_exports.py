@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+from app.services import exports
+
+
+def _seed(app):
+    with app.app_context():
+        admin = User(username="admin", email="admin@example.com", password_hash="x", role="admin")
+        buyer = User(username="buyer", email="buyer@example.com", password_hash="x")
+        seller = User(username="seller", email="seller@example.com", password_hash="x", role="seller")
+        db.session.add_all([admin, buyer, seller])
+        db.session.flush()
+        mine = Book(title="Mine, \"quoted\"", author="A", price=10.0, stock=5, seller_id=seller.id)
+        system = Book(title="System book", author="B", price=20.0, stock=5)
+        db.session.add_all([mine, system])
+        db.session.flush()
+        base = datetime(2024, 3, 1)
+        for i in range(30):
+            book = mine if i % 2 else system
+            db.session.add(Order(user_id=buyer.id, book_id=book.id, total_price=book.price,
+                                 order_date=base + timedelta(hours=i)))
+        db.session.commit()
+        return admin.id, seller.id
+
+
+def _login(client, user_id):
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+
+
+def test_admin_csv_export_streams_all_orders(app, client, monkeypatch):
+    admin_id, _ = _seed(app)
+    _login(client, admin_id)
+    monkeypatch.setattr(exports, "CHUNK_SIZE", 256)
+
+    response = client.get("/admin/orders/export?format=csv")
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "text/csv"
+    assert 'filename="orders.csv"' in response.headers["Content-Disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 30
+    assert rows[0]["order_date"] > rows[-1]["order_date"]
+    assert {r["seller"] for r in rows} == {"seller", "System"}
+    assert 'Mine, "quoted"' in {r["book_title"] for r in rows}
+
+
+def test_seller_ndjson_export_only_includes_own_books(app, client):
+    _, seller_id = _seed(app)
+    _login(client, seller_id)
+
+    response = client.get("/seller/sales/export?format=ndjson&end=2024-03-01")
+
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(lines) == 12
+    assert all(line["seller"] == "seller" for line in lines)
+
+
+def test_iter_rows_fetches_in_batches(app):
+    _seed(app)
+    with app.app_context():
+        rows = list(exports.iter_rows(exports.order_export_statement(), fetch_size=7))
+        assert len(rows) == 30
+        assert set(rows[0].keys()) == set(exports.ORDER_EXPORT_COLUMNS)
+
+
+def test_csv_export_neutralizes_formulas_and_keeps_orphaned_orders(app, client):
+    admin_id, _ = _seed(app)
+    with app.app_context():
+        book = Book(title="=HYPERLINK(\"http://evil\")", author="C", price=5.0, stock=5)
+        gone = User(username="gone", email="gone@example.com", password_hash="x")
+        db.session.add_all([book, gone])
+        db.session.flush()
+        db.session.add(Order(user_id=gone.id, book_id=book.id, total_price=-5.0,
+                             order_date=datetime(2024, 4, 1)))
+        db.session.commit()
+        # Customer deleted without cascading to their orders
+        db.session.execute(User.__table__.delete().where(User.id == gone.id))
+        db.session.commit()
+    _login(client, admin_id)
+
+    rows = list(csv.DictReader(io.StringIO(client.get("/admin/orders/export").get_data(as_text=True))))
+
+    assert len(rows) == 31
+    assert rows[0]["book_title"] == "'=HYPERLINK(\"http://evil\")"
+    assert rows[0]["customer"] == ""
+    # Only text cells are escaped; a negative amount stays a number
+    assert rows[0]["total_price"] == "-5.0"
@@ -0,0 +1,67 @@
+import csv
+from collections import Counter
+from datetime import date
+import pytest
+import seed_data
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+from generate_data import DEFAULT_END, DataGenerator, isbn13, write_csvs
+
+
+@pytest.fixture
+def generator():
+    return DataGenerator(200, 500, 5000, start=date(2024, 1, 1), end=date(2024, 12, 31), seed=7)
+
+
+def test_same_seed_produces_same_data(generator):
+    again = DataGenerator(200, 500, 5000, start=date(2024, 1, 1), end=date(2024, 12, 31), seed=7)
+    assert generator.books() == again.books()
+    assert list(generator.orders()) == list(again.orders())
+
+
+def test_default_dates_do_not_depend_on_today():
+    generator = DataGenerator(10, 10, 50, seed=7)
+    assert generator.end == DEFAULT_END
+    assert generator.start == date(2025, 1, 1)
+
+
+def test_shapes_of_the_generated_data(generator):
+    users = generator.users()
+    assert len(users) == 200 and users[0]['role'] == 'admin'
+    assert Counter(user['role'] for user in users)['seller'] == 4
+    assert len({user['email'] for user in users}) == 200
+
+    books = generator.books()
+    assert len({book['title'] for book in books}) == 500
+
+    orders = list(generator.orders())
+    assert len(orders) == 5000
+    dates = [order['order_date'] for order in orders]
+    assert dates == sorted(dates)
+    # Zipf: the 5 most popular books (1%) take a large share of orders
+    popular = Counter(order['book_title'] for order in orders).most_common(5)
+    assert sum(count for _, count in popular) > 0.25 * len(orders)
+    # Holiday peak
+    months = Counter(order['order_date'][5:7] for order in orders)
+    assert months['12'] > 1.5 * months['02']
+
+
+def test_isbn13_check_digit():
+    assert isbn13(0) == '9780000000002'
+    assert isbn13(30640615) == '9780306406157'
+
+
+def test_csv_output_loads_with_seed_data(app, generator, tmp_path):
+    write_csvs(generator, str(tmp_path))
+    with open(tmp_path / 'orders.csv', encoding='utf-8') as f:
+        assert next(csv.reader(f)) == ['buyer_username', 'book_title', 'quantity',
+                                       'total_price', 'status', 'order_date']
+
+    with app.app_context():
+        seed_data.seed_users(str(tmp_path / 'users.csv'), fast_hash=True)
+        seed_data.seed_books(str(tmp_path / 'books.csv'))
+        seed_data.seed_orders(str(tmp_path / 'orders.csv'))
+        assert User.query.count() == 200
+        assert Book.query.count() == 500
+        assert Order.query.count() == 5000
@@ -0,0 +1,115 @@
+import re
+import pytest
+from flask import Flask
+from app.extensions import db
+from app.models.book import Book
+from app.models.user import User
+from app.services.cart import price_cart
+from app.services.checkout import CheckoutService, InsufficientStockError
+from app.services.metrics import MetricsExtension, MetricsRegistry
+
+
+def _sample(text, name, **labels):
+    """Value of one series in a Prometheus text payload, or None."""
+    label_text = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = '^' + re.escape(name + (f'{{{label_text}}}' if labels else '')) + r' (\S+)$'
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram('demo_seconds', 'Demo.', ['route'], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.labels('/books').observe(value)
+    text = registry.render()
+
+    assert '# TYPE demo_seconds histogram' in text
+    assert _sample(text, 'demo_seconds_bucket', route='/books', le='0.1') == 1
+    assert _sample(text, 'demo_seconds_bucket', route='/books', le='1') == 3
+    assert _sample(text, 'demo_seconds_bucket', route='/books', le='+Inf') == 4
+    assert _sample(text, 'demo_seconds_count', route='/books') == 4
+    assert _sample(text, 'demo_seconds_sum', route='/books') == pytest.approx(4.25)
+
+
+def test_counter_labels_are_escaped_and_checked():
+    registry = MetricsRegistry()
+    errors = registry.counter('demo_errors_total', 'Demo.', ['reason'])
+    errors.labels('say "hi"').inc(2)
+    assert 'demo_errors_total{reason="say \\"hi\\""} 2' in registry.render()
+    with pytest.raises(ValueError):
+        errors.labels('a', 'b')
+
+
+def test_metrics_endpoint_reports_route_latency(app, client):
+    client.get('/login')
+    text = client.get('/metrics').get_data(as_text=True)
+
+    labels = dict(blueprint='auth', endpoint='auth.login', method='GET')
+    assert _sample(text, 'bookbazaar_http_request_duration_seconds_count', **labels) >= 1
+    assert _sample(text, 'bookbazaar_http_requests_total', **labels, status='200') >= 1
+    assert _sample(text, 'bookbazaar_http_request_db_seconds_count', blueprint='auth', endpoint='auth.login') >= 1
+    assert _sample(text, 'bookbazaar_outbox_pending') == 0
+    assert _sample(text, 'bookbazaar_notification_queue_depth') is not None
+    assert 'endpoint="metrics"' not in text
+
+
+def test_checkout_counts_orders_and_stock_outs(app, client):
+    with app.app_context():
+        buyer = User(username="buyer", email="buyer@example.com", password_hash="x")
+        books = [Book(title="Last copy", author="A", price=10.0, stock=1),
+                 Book(title="Plenty", author="A", price=10.0, stock=9)]
+        db.session.add(buyer)
+        db.session.add_all(books)
+        db.session.commit()
+        last_copy, plenty = books[0].id, books[1].id
+
+        before = client.get('/metrics').get_data(as_text=True)
+        CheckoutService().place_order(buyer.id, price_cart({str(last_copy): 1, str(plenty): 2})[0])
+        with pytest.raises(InsufficientStockError):
+            CheckoutService().place_order(buyer.id, price_cart({str(plenty): 8})[0])
+        after = client.get('/metrics').get_data(as_text=True)
+
+    def delta(name, **labels):
+        return (_sample(after, name, **labels) or 0) - (_sample(before, name, **labels) or 0)
+
+    assert delta('bookbazaar_orders_placed_total') == 2
+    assert delta('bookbazaar_stock_outs_total', reason='sold_out') == 1
+    assert delta('bookbazaar_stock_outs_total', reason='insufficient_stock') == 1
+
+
+def test_rolled_back_baskets_do_not_count_as_sold_out(app, client):
+    with app.app_context():
+        buyer = User(username="buyer", email="buyer@example.com", password_hash="x")
+        books = [Book(title="Last copy", author="A", price=10.0, stock=1),
+                 Book(title="Scarce", author="A", price=10.0, stock=1)]
+        db.session.add(buyer)
+        db.session.add_all(books)
+        db.session.commit()
+        cart = price_cart({str(books[0].id): 1, str(books[1].id): 1})[0]
+        cart[1]['quantity'] = 2
+
+        before = client.get('/metrics').get_data(as_text=True)
+        with pytest.raises(InsufficientStockError):
+            CheckoutService().place_order(buyer.id, cart)
+        after = client.get('/metrics').get_data(as_text=True)
+        assert db.session.get(Book, books[0].id).stock == 1
+
+    sold_out = lambda text: _sample(text, 'bookbazaar_stock_outs_total', reason='sold_out') or 0
+    assert sold_out(after) == sold_out(before)
+
+
+def test_metrics_token_is_required_when_configured(app, client):
+    app.config['METRICS_TOKEN'] = 's3cret'
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+
+def test_metrics_are_not_served_without_a_required_token():
+    app = Flask(__name__)
+    app.config.update(METRICS_REQUIRE_TOKEN=True, METRICS_TOKEN=None)
+    MetricsExtension().init_app(app)
+    assert 'metrics' not in app.extensions
+    assert 'metrics' not in app.view_functions
@@ -0,0 +1,59 @@
+import time
+from app.services.notification import MemoryNotifier, NotificationDispatcher, NotificationService
+from app_aws import SNSNotifier
+
+
+def test_send_returns_before_delivery_and_batches():
+    backend = MemoryNotifier()
+    service = NotificationService(backend=backend, workers=1, linger=0.2)
+    for i in range(25):
+        service.send(f"user{i}@example.com", f"Order {i}")
+    assert service.dispatcher.flush(timeout=5)
+
+    assert len(backend.sent) == 25
+    assert max(len(batch) for batch in backend.batches) == 10
+    assert service.dispatcher.stats['sent'] == 25
+    service.dispatcher.shutdown()
+
+
+def test_failed_batches_are_retried():
+    class FlakyBackend(MemoryNotifier):
+        calls = 0
+
+        def send_batch(self, messages):
+            self.calls += 1
+            if self.calls == 1:
+                raise ConnectionError("boom")
+            return super().send_batch(messages)
+
+    backend = FlakyBackend()
+    dispatcher = NotificationDispatcher(backend, workers=1, base_backoff=0.01)
+    dispatcher.submit("a@example.com", "hi")
+    assert dispatcher.flush(timeout=5)
+    assert backend.sent == [("a@example.com", "hi")]
+    assert dispatcher.stats == {'sent': 1, 'failed': 0, 'dropped': 0}
+    dispatcher.shutdown()
+
+
+def test_shutdown_drains_queue():
+    class SlowBackend(MemoryNotifier):
+        def send_batch(self, messages):
+            time.sleep(0.05)
+            return super().send_batch(messages)
+
+    backend = SlowBackend()
+    dispatcher = NotificationDispatcher(backend, workers=1, batch_size=1, linger=0)
+    for i in range(5):
+        dispatcher.submit("a@example.com", str(i))
+    dispatcher.shutdown(timeout=5)
+    assert [m for _, m in backend.sent] == ["0", "1", "2", "3", "4"]
+    assert dispatcher.submit("a@example.com", "late") is False
+
+
+def test_sns_notifier_publishes_in_batches(mock_aws_app):
+    aws = mock_aws_app
+    notifier = SNSNotifier(aws_instance=aws)
+    notifier.topic_arn = aws.sns.create_topic(Name="BookBazaarNotifications")["TopicArn"]
+
+    messages = [(f"u{i}@example.com", f"Order {i}") for i in range(10)]
+    assert notifier.send_batch(messages) == []
@@ -0,0 +1,155 @@
+import pytest
+from decimal import Decimal
+from app.extensions import db
+from app.models.book import Book
+from app.models.outbox import OutboxEvent
+from app.models.user import User
+from app.repositories.book_repo import BookRepository
+from app.repositories.user_repo import UserRepository
+from app.services.outbox_relay import OutboxRelay
+from app import create_app
+from app.repositories.outbox_repo import OutboxRepository
+
+
+@pytest.fixture
+def dynamodb(mock_aws_app):
+    resource = mock_aws_app.dynamodb
+    for name in ("BookBazaarBooks", "BookBazaarUsers"):
+        resource.create_table(
+            TableName=name,
+            KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+    return resource
+
+
+def test_writes_stage_outbox_events_in_the_same_transaction(app):
+    with app.app_context():
+        book = BookRepository().add(Book(title="Dune", author="Frank Herbert", price=12.5, stock=3))
+        UserRepository().create(User(username="u", email="u@example.com", password_hash="x"))
+
+        events = OutboxEvent.query.order_by(OutboxEvent.id).all()
+        assert [e.target for e in events] == ["BookBazaarBooks", "BookBazaarUsers"]
+        assert f'"id": "{book.id}"' in events[0].payload
+
+
+def test_relay_drains_outbox_to_dynamodb(app, dynamodb):
+    with app.app_context():
+        book = BookRepository().add(Book(title="Dune", author="Frank Herbert", price=12.5, stock=3))
+        book_id = str(book.id)
+
+    relay = OutboxRelay(app)
+    assert relay.drain_once() == 1
+
+    item = dynamodb.Table("BookBazaarBooks").get_item(Key={'id': book_id})['Item']
+    assert item['title'] == "Dune"
+    assert item['price'] == Decimal("12.5")
+    assert item['type'] == "book"
+    with app.app_context():
+        assert OutboxEvent.query.count() == 0
+    assert relay.stats['dispatched'] == 1
+    assert relay.lag_seconds() == 0.0
+
+
+def test_relay_backs_off_on_failure(app, dynamodb):
+    with app.app_context():
+        db.session.add(OutboxEvent(target="MissingTable", payload='{"id": "1"}'))
+        db.session.commit()
+
+    relay = OutboxRelay(app, base_backoff=60)
+    assert relay.drain_once() == 0
+    assert relay.stats['failed'] == 1
+    # Not due again until the backoff has elapsed
+    assert relay.drain_once() == 0
+    assert relay.stats['failed'] == 1
+
+    with app.app_context():
+        event = OutboxEvent.query.one()
+        assert event.attempts == 1
+        assert event.last_error
+    assert relay.lag_seconds() >= 0.0
+
+
+def test_bad_event_does_not_hold_back_its_batch(app, dynamodb):
+    with app.app_context():
+        db.session.add(OutboxEvent(target="BookBazaarBooks", payload='{"id": "1", "title": "ok"}'))
+        # DynamoDB rejects an empty key
+        db.session.add(OutboxEvent(target="BookBazaarBooks", payload='{"id": ""}'))
+        db.session.add(OutboxEvent(target="BookBazaarBooks", payload='{"id": "3", "title": "ok"}'))
+        db.session.commit()
+
+    relay = OutboxRelay(app, base_backoff=60)
+    assert relay.drain_once() == 2
+
+    assert dynamodb.Table("BookBazaarBooks").get_item(Key={'id': '3'})['Item']['title'] == "ok"
+    with app.app_context():
+        event = OutboxEvent.query.one()
+        assert event.payload == '{"id": ""}'
+        assert event.attempts == 1 and event.last_error
+
+
+def test_outage_is_retried_past_the_alert_threshold(app, dynamodb):
+    with app.app_context():
+        db.session.add(OutboxEvent(target="MissingTable", payload='{"id": "1"}'))
+        db.session.commit()
+
+    relay = OutboxRelay(app, base_backoff=0, alert_after=3)
+    for _ in range(5):
+        relay.drain_once()
+
+    assert relay.stats['failed'] == 5
+    assert relay.stats['stuck'] == 1
+    assert relay.stats['dead_lettered'] == 0
+    with app.app_context():
+        event = OutboxEvent.query.one()
+        assert event.attempts == 5
+        assert event.dead_lettered_at is None
+        repo = OutboxRepository()
+        assert repo.pending_count() == 1
+        assert repo.stuck_count(3) == 1
+
+
+def test_rejected_event_is_parked_and_can_be_redriven(app, dynamodb):
+    with app.app_context():
+        # DynamoDB rejects an empty key
+        db.session.add(OutboxEvent(target="BookBazaarBooks", payload='{"id": ""}'))
+        db.session.commit()
+
+    relay = OutboxRelay(app, base_backoff=0, alert_after=3)
+    for _ in range(5):
+        relay.drain_once()
+
+    assert relay.stats['failed'] == 3
+    assert relay.stats['dead_lettered'] == 1
+    with app.app_context():
+        event = OutboxEvent.query.one()
+        assert event.dead_lettered_at is not None
+        repo = OutboxRepository()
+        assert repo.pending_count() == 0
+        assert repo.dead_letter_count() == 1
+        assert repo.oldest_created_at() is None
+
+        # An operator fixes the payload, then re-drives the parked events
+        event.payload = '{"id": "1", "title": "Fixed"}'
+        db.session.commit()
+        assert repo.redrive() == 1
+        event = OutboxEvent.query.one()
+        assert (event.attempts, event.dead_lettered_at) == (0, None)
+
+    assert relay.drain_once() == 1
+    assert dynamodb.Table("BookBazaarBooks").get_item(Key={'id': '1'})['Item']['title'] == "Fixed"
+    with app.app_context():
+        assert OutboxEvent.query.count() == 0
+
+
+def test_relay_only_starts_for_the_web_server(monkeypatch):
+    from config import TestingConfig
+    monkeypatch.setattr(TestingConfig, "OUTBOX_RELAY_ENABLED", True)
+    monkeypatch.setattr(TestingConfig, "OUTBOX_POLL_INTERVAL", 60.0)
+
+    # CLI scripts (import_books.py, seed_data.py, ...) call create_app() like this
+    assert 'outbox_relay' not in create_app().extensions
+
+    relay = create_app(background_tasks=True).extensions['outbox_relay']
+    relay.stop()
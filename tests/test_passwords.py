@@ -0,0 +1,24 @@
+from werkzeug.security import check_password_hash
+from app.services import passwords
+from app.services.passwords import hash_passwords
+
+
+def test_hash_passwords_salts_every_password(mocker):
+    hasher = mocker.spy(passwords, 'generate_password_hash')
+    hashes = hash_passwords(['a', 'b', 'a'], workers=1)
+    assert hasher.call_count == 3
+    assert len(set(hashes)) == 3
+    assert [check_password_hash(h, p) for h, p in zip(hashes, 'aba')] == [True] * 3
+
+
+def test_hash_passwords_uses_the_pool_for_small_sets():
+    hashes = hash_passwords(['a', 'a'], workers=2)
+    assert hashes[0] != hashes[1]
+    assert all(check_password_hash(h, 'a') for h in hashes)
+
+
+def test_fast_hashes_are_salted_and_verifiable():
+    hashes = hash_passwords(['a', 'a'], workers=4, fast=True)
+    assert all(h.startswith('pbkdf2:sha256:1000$') for h in hashes)
+    assert hashes[0] != hashes[1]
+    assert all(check_password_hash(h, 'a') for h in hashes)
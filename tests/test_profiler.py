@@ -0,0 +1,79 @@
+import marshal
+import threading
+import pytest
+from app.extensions import db
+from app.models.user import User
+from app.services.profiler import StackSampler, profiler
+
+
+@pytest.fixture
+def admin_client(app, client):
+    with app.app_context():
+        admin = User(username="admin", email="admin@example.com", password_hash="x", role="admin")
+        db.session.add(admin)
+        db.session.commit()
+        admin_id = admin.id
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_id
+    return client
+
+
+def _busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collapses_thread_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy")
+    worker.start()
+    try:
+        stacks, rounds = StackSampler(interval=0.001).sample(0.2)
+    finally:
+        stop.set()
+        worker.join()
+    assert rounds > 0
+    busy = [stack for stack in stacks if stack.startswith('busy;')]
+    # A sample may land inside a callee such as Event.is_set
+    assert busy and all('test_profiler:_busy_loop' in stack for stack in busy)
+
+
+def test_admin_samples_the_worker_and_downloads_collapsed_stacks(admin_client):
+    response = admin_client.post('/admin/profiler/sample', data={'seconds': '0.2'})
+    assert response.status_code == 302
+    profiler.stop_sampling()
+
+    page = admin_client.get('/admin/profiler').get_data(as_text=True)
+    sample = next(p for p in profiler.list() if p.kind == 'sample')
+    assert sample.id in page
+
+    download = admin_client.get(f'/admin/profiler/{sample.id}')
+    assert download.status_code == 200
+    assert 'collapsed' in download.headers['Content-Disposition']
+    for line in download.get_data(as_text=True).splitlines():
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) > 0 and stack
+
+
+def test_marked_request_is_profiled_for_admins(admin_client):
+    response = admin_client.get('/admin/dashboard', headers={'X-Profile': '1'})
+    profile = profiler.get(response.headers['X-Profile-Id'])
+    assert profile.kind == 'request' and profile.label == 'GET /admin/dashboard'
+    assert any(func == 'dashboard' for _, _, func in marshal.loads(profile.data))
+
+    text = admin_client.get(f'/admin/profiler/{profile.id}?format=text').get_data(as_text=True)
+    assert 'function calls' in text
+
+
+def test_profile_header_is_ignored_for_other_users(app, client):
+    assert 'X-Profile-Id' not in client.get('/login', headers={'X-Profile': '1'}).headers
+
+    app.config['PROFILER_TOKEN'] = 'let-me-in'
+    assert 'X-Profile-Id' not in client.get('/login', headers={'X-Profile': 'wrong'}).headers
+    assert 'X-Profile-Id' in client.get('/login', headers={'X-Profile': 'let-me-in'}).headers
+
+
+def test_profiler_pages_require_admin(client):
+    assert client.get('/admin/profiler').status_code == 302
+    assert client.post('/admin/profiler/sample', data={'seconds': '1'}).status_code == 302
+    assert not profiler.sampling
@@ -0,0 +1,108 @@
+import pytest
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+from app.services.query_monitor import NPlusOneError, fingerprint, query_monitor
+
+
+def _seed_orders(count):
+    buyer = User(username="buyer", email="buyer@example.com", password_hash="x")
+    db.session.add(buyer)
+    db.session.flush()
+    for i in range(count):
+        seller = User(username=f"seller{i}", email=f"seller{i}@example.com", password_hash="x", role="seller")
+        db.session.add(seller)
+        db.session.flush()
+        book = Book(title=f"Book {i}", author="A", price=10.0, stock=5, seller_id=seller.id)
+        db.session.add(book)
+        db.session.flush()
+        db.session.add(Order(user_id=buyer.id, book_id=book.id, total_price=10.0))
+    db.session.commit()
+    return buyer.id
+
+
+def _login(client, user_id):
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+
+
+def test_fingerprint_ignores_literals_and_in_list_length():
+    assert fingerprint("SELECT * FROM book WHERE id = 7") == fingerprint("SELECT *\n FROM book WHERE id = 12")
+    assert fingerprint("SELECT * FROM book WHERE id IN (?, ?, ?)") == "SELECT * FROM book WHERE id IN (?)"
+    assert fingerprint("SELECT * FROM user WHERE email = 'a@b.c'") == "SELECT * FROM user WHERE email = ?"
+
+
+def test_headers_report_queries_per_request(app, client):
+    with app.app_context():
+        buyer_id = _seed_orders(2)
+    _login(client, buyer_id)
+
+    response = client.get('/dashboard')
+    assert response.status_code == 200
+    assert int(response.headers['X-Query-Count']) >= 1
+    assert float(response.headers['X-Query-Time-Ms']) >= 0
+    assert response.headers['X-Query-Repeated'] == '0'
+    assert 'db;dur=' in response.headers['Server-Timing']
+
+
+def test_order_history_has_no_n_plus_one(app, client):
+    with app.app_context():
+        buyer_id = _seed_orders(8)
+    _login(client, buyer_id)
+
+    # QUERY_MONITOR_RAISE is on under testing, so a lazy load per order fails here
+    response = client.get('/dashboard')
+    assert response.status_code == 200
+    assert int(response.headers['X-Query-Count']) <= 4
+
+
+def test_raise_mode_fails_on_repeated_queries(app, client):
+    with app.app_context():
+        buyer_id = _seed_orders(6)
+
+    @app.route('/lazy-orders')
+    def lazy_orders():
+        orders = Order.query.all()
+        return ', '.join(order.book.seller.username for order in orders)
+
+    _login(client, buyer_id)
+    with pytest.raises(NPlusOneError, match='same query 6 times'):
+        client.get('/lazy-orders')
+
+    app.config['QUERY_MONITOR_RAISE'] = False
+    response = client.get('/lazy-orders')
+    assert response.status_code == 200
+    assert response.headers['X-Query-Repeated'] == '2'
+
+
+def test_toolbar_is_injected_into_html_pages(app, client):
+    app.config['QUERY_MONITOR_TOOLBAR'] = True
+    with app.app_context():
+        buyer_id = _seed_orders(1)
+    _login(client, buyer_id)
+
+    html = client.get('/dashboard').get_data(as_text=True)
+    assert 'class="query-toolbar"' in html
+    assert html.index('query-toolbar') < html.index('</body>')
+
+
+def test_capture_collects_queries_outside_requests(app):
+    with app.app_context():
+        _seed_orders(3)
+        with query_monitor.capture() as stats:
+            for order in Order.query.all():
+                order.book.title
+        assert stats.count == 4
+        assert stats.repeated(3)[0][1] == 3
+
+
+def test_failed_statements_leave_no_timer_behind(app):
+    with app.app_context():
+        with query_monitor.capture() as stats:
+            with db.engine.connect() as conn:
+                with pytest.raises(Exception):
+                    conn.exec_driver_sql("SELECT * FROM no_such_table")
+                assert 'query_monitor_started' not in conn.info
+                conn.exec_driver_sql("SELECT 1")
+        assert stats.count == 1
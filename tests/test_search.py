@@ -0,0 +1,65 @@
+from sqlalchemy.dialects import mysql
+from app.extensions import db
+from app.models.book import Book
+from app.repositories.book_repo import BookRepository
+from app.repositories.search_index import search_index
+
+
+def _add_books(*rows):
+    for title, author, description in rows:
+        db.session.add(Book(title=title, author=author, description=description, price=100.0, stock=5))
+    db.session.commit()
+
+
+def test_search_ranks_title_matches_first(app):
+    with app.app_context():
+        _add_books(
+            ("Cooking for One", "Ann Lee", "A book that mentions dune only in passing."),
+            ("Dune", "Frank Herbert", "Desert planet epic."),
+            ("Gardening", "Bob Ray", "Plants."),
+        )
+        page = BookRepository().search_paginated("dune", 1, 10)
+        titles = [b.title for b in page.items]
+        assert titles == ["Dune", "Cooking for One"]
+        assert page.total == 2
+
+
+def test_search_matches_prefixes_across_columns(app):
+    with app.app_context():
+        _add_books(("Dune", "Frank Herbert", "Desert planet epic."))
+        assert [b.title for b in BookRepository().search_paginated("herb", 1, 10).items] == ["Dune"]
+        assert [b.title for b in BookRepository().search_paginated("desert plan", 1, 10).items] == ["Dune"]
+
+
+def test_search_index_follows_updates_and_deletes(app):
+    with app.app_context():
+        _add_books(("Dune", "Frank Herbert", ""))
+        repo = BookRepository()
+        book = Book.query.first()
+        book.title = "Children of Dune"
+        db.session.commit()
+        assert [b.title for b in repo.search_paginated("children", 1, 10).items] == ["Children of Dune"]
+
+        db.session.delete(book)
+        db.session.commit()
+        assert repo.search_paginated("dune", 1, 10).items == []
+
+
+def test_search_ignores_query_operators(app):
+    with app.app_context():
+        _add_books(("Dune", "Frank Herbert", ""))
+        page = BookRepository().search_paginated('dune" *)(', 1, 10)
+        assert [b.title for b in page.items] == ["Dune"]
+
+
+def test_mysql_search_drops_terms_it_cannot_require(app, mocker):
+    with app.app_context():
+        mocker.patch.object(search_index, "dialect", return_value="mysql")
+        mocker.patch.object(search_index, "mysql_min_token_size", return_value=3)
+
+        # Only stopwords and short tokens: the repository falls back to ILIKE
+        assert search_index.search_statement("the c++ of") is None
+
+        statement = search_index.search_statement("The Lord of the Rings")
+        params = statement.compile(dialect=mysql.dialect()).params
+        assert "+Lord* +Rings*" in params.values()
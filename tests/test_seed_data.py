@@ -0,0 +1,60 @@
+import shutil
+import os
+from sqlalchemy import event
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+import seed_data
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def _seed(data_dir):
+    seed_data.seed_users(os.path.join(data_dir, "users.csv"))
+    seed_data.seed_books(os.path.join(data_dir, "books.csv"))
+    seed_data.seed_orders(os.path.join(data_dir, "orders.csv"))
+
+
+def test_seed_uses_preloaded_maps(app, tmp_path):
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir)
+    with open(data_dir / "orders.csv", "a", encoding="utf-8") as f:
+        for _ in range(300):
+            f.write("alice_buyer,1984,1,400.00,Placed,2024-03-01 10:00:00\n")
+
+    with app.app_context():
+        statements = []
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            _seed(str(data_dir))
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+        assert User.query.count() == 4
+        assert Book.query.count() == 6
+        assert Order.query.count() == 304
+        # Lookups no longer scale with the number of CSV rows
+        assert len(statements) < 60
+
+
+def test_reseeding_does_not_duplicate_users_or_books(app):
+    with app.app_context():
+        _seed(DATA_DIR)
+        _seed(DATA_DIR)
+        assert User.query.count() == 4
+        assert Book.query.count() == 6
+
+
+def test_users_sharing_a_password_get_their_own_salt(app):
+    records = [
+        {"username": f"reader{i}", "email": f"reader{i}@example.com", "password": "secret ",
+         "role": "Buyer", "is_validated": "true"}
+        for i in range(3)
+    ]
+    with app.app_context():
+        seed_data.load_users(records, workers=1)
+        users = User.query.filter(User.username.like("reader%")).all()
+        assert len({user.password_hash for user in users}) == 3
+        assert all(user.check_password("secret") for user in users)
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+from app.services.seller_analytics import SellerAnalytics
+
+
+def _seed(app, titles=3, orders=8):
+    with app.app_context():
+        buyer = User(username="buyer", email="buyer@example.com", password_hash="x")
+        seller = User(username="seller", email="seller@example.com", password_hash="x", role="seller")
+        other = User(username="other", email="other@example.com", password_hash="x", role="seller")
+        db.session.add_all([buyer, seller, other])
+        db.session.flush()
+        mine = [Book(title=f"Mine {i}", author="A", price=10.0 * (i + 1), stock=i, seller_id=seller.id)
+                for i in range(titles)]
+        theirs = Book(title="Theirs", author="B", price=99.0, stock=50, seller_id=other.id)
+        db.session.add_all(mine + [theirs])
+        db.session.flush()
+        base = datetime(2024, 1, 1)
+        for i in range(orders):
+            book = mine[i % titles]
+            db.session.add(Order(user_id=buyer.id, book_id=book.id, quantity=2,
+                                 total_price=book.price * 2, order_date=base + timedelta(hours=i)))
+        db.session.add(Order(user_id=buyer.id, book_id=theirs.id, total_price=99.0, order_date=base))
+        db.session.commit()
+        return seller.id
+
+
+def test_summaries_are_scoped_to_the_seller(app):
+    seller_id = _seed(app)
+    with app.app_context():
+        analytics = SellerAnalytics()
+        assert analytics.inventory_summary(seller_id) == {'book_count': 3, 'total_stock': 3}
+
+        summary = analytics.sales_summary(seller_id)
+        assert summary['order_count'] == 8
+        assert summary['units_sold'] == 16
+        # 3 orders of book 0, 3 of book 1, 2 of book 2
+        assert summary['total_revenue'] == 3 * 20 + 3 * 40 + 2 * 60
+        assert summary['average_order_value'] == 37.5
+
+        breakdown = analytics.book_breakdown(seller_id)
+        assert [row['title'] for row in breakdown] == ["Mine 1", "Mine 2", "Mine 0"]
+        assert breakdown[0]['order_count'] == 3 and breakdown[0]['revenue'] == 120
+
+
+def test_sales_page_is_keyset_paginated(app):
+    seller_id = _seed(app)
+    with app.app_context():
+        analytics = SellerAnalytics()
+        first = analytics.sales_page(seller_id, 5)
+        second = analytics.sales_page(seller_id, 5, cursor=first.next_cursor)
+        ids = [o.id for o in first.items + second.items]
+        assert len(ids) == 8 and len(set(ids)) == 8
+        assert not second.has_next
+
+
+def _queries(app, client, url):
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            response = client.get(url)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_seller_pages_use_constant_queries(app, client):
+    seller_id = _seed(app, titles=12, orders=40)
+    with client.session_transaction() as sess:
+        sess['user_id'] = seller_id
+
+    assert _queries(app, client, "/seller/sales") <= 6
+    assert _queries(app, client, "/seller/dashboard") <= 5
@@ -0,0 +1,111 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from app.extensions import db
+from app.models.book import Book
+from app.models.user import User
+from app.models.slow_query import SlowQuery
+from app.services.slow_query_log import slow_query_log, plan_warnings
+
+
+@pytest.fixture
+def slow_app(app):
+    """App whose slow-query log records every statement."""
+    app.config['SLOW_QUERY_THRESHOLD_MS'] = 0
+    slow_query_log.init_app(app)
+    slow_query_log.clear()
+    yield app
+    slow_query_log.clear()
+
+
+def test_flush_stores_plan_once_per_fingerprint(slow_app):
+    with slow_app.app_context():
+        slow_query_log.flush()
+        SlowQuery.query.delete()
+        db.session.commit()
+        slow_query_log.clear()
+
+        for author in ("Ann", "Bob", "Cy"):
+            Book.query.filter_by(author=author).all()
+        assert slow_query_log.flush() >= 1
+
+        rows = [row for row in SlowQuery.query.all() if 'WHERE book.author = ?' in row.fingerprint]
+        assert len(rows) == 1
+        row = rows[0]
+        assert row.count == 3
+        assert row.dialect == 'sqlite'
+        assert row.max_seconds <= row.total_seconds
+        # No index on author: SQLite scans the table
+        assert 'SCAN book' in row.plan
+        assert 'Full scan of book' in plan_warnings(row.plan)
+
+        Book.query.filter_by(author="Dee").all()
+        slow_query_log.flush()
+        db.session.refresh(row)
+        assert row.count == 4
+
+
+def test_indexed_lookup_has_no_warning(slow_app):
+    with slow_app.app_context():
+        Book.query.filter(Book.stock < 5).all()
+        slow_query_log.flush()
+        row = next(row for row in SlowQuery.query.all() if 'WHERE book.stock < ?' in row.fingerprint)
+        assert 'USING INDEX ix_book_stock' in row.plan
+        assert plan_warnings(row.plan) == []
+
+
+def test_fast_statements_are_ignored(app):
+    slow_query_log.clear()
+    with app.app_context():
+        Book.query.filter_by(author="Ann").all()
+    assert slow_query_log.pending_count() == 0
+
+
+def test_failed_statements_leave_no_timer_behind(slow_app):
+    with slow_app.app_context():
+        with db.engine.connect() as conn:
+            with pytest.raises(Exception):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+            assert 'slow_query_started' not in conn.info
+
+
+def test_failed_flush_keeps_executions_pending(slow_app, mocker):
+    with slow_app.app_context():
+        slow_query_log.flush()
+        Book.query.filter_by(author="Ann").all()
+        pending = slow_query_log.pending_count()
+        locked = OperationalError("COMMIT", {}, Exception("database is locked"))
+        mocker.patch.object(db.session, "commit", side_effect=locked)
+
+        assert slow_query_log.flush() == 0
+        assert slow_query_log.pending_count() == pending
+
+
+def test_plan_warnings_for_other_dialects():
+    assert plan_warnings("id=1 select_type=SIMPLE table=order type=ALL rows=5000") == ["Full scan of order"]
+    assert plan_warnings("Seq Scan on book  (cost=0.00..35.50 rows=10 width=4)") == ["Full scan of book"]
+    assert plan_warnings(None) == []
+
+
+def test_admin_page_lists_and_clears(slow_app, client):
+    with slow_app.app_context():
+        admin = User(username="admin", email="admin@example.com", password_hash="x", role="admin")
+        db.session.add(admin)
+        db.session.commit()
+        admin_id = admin.id
+        slow_query_log.clear()
+        Book.query.filter_by(author="Ann").all()
+        slow_query_log.flush()
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_id
+
+    page = client.get('/admin/slow-queries?sort=count')
+    assert page.status_code == 200
+    html = page.get_data(as_text=True)
+    assert 'WHERE book.author = ?' in html
+    assert 'Full scan of book' in html
+
+    response = client.post('/admin/slow-queries/clear')
+    assert response.status_code == 302
+    with slow_app.app_context():
+        slow_query_log.clear()
+        assert SlowQuery.query.count() == 0
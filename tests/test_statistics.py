@@ -0,0 +1,165 @@
+from sqlalchemy import event
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.statistic import StoreStatistic
+from app.models.user import User
+from app.services.cart import price_cart
+from app.services.checkout import CheckoutService
+from app.services.statistics import statistics
+from app.repositories.statistics_repo import StatisticsRepository
+
+
+def _seed():
+    buyer = User(username="buyer", email="buyer@example.com", password_hash="x")
+    seller = User(username="seller", email="seller@example.com", password_hash="x", role="seller")
+    books = [Book(title=f"Book {i}", author="A", price=50.0, stock=stock) for i, stock in enumerate([2, 0, 7])]
+    db.session.add_all([buyer, seller] + books)
+    db.session.commit()
+    return buyer, books
+
+
+def _values():
+    return {row.name: row.value for row in StoreStatistic.query.all()}
+
+
+def test_snapshot_refreshes_empty_table(app):
+    with app.app_context():
+        _seed()
+        assert db.session.get(StoreStatistic, 'stats.refreshed_at') is None
+
+        stats, top_books, status_counts = statistics.snapshot()
+
+        assert stats['total_users'] == 1
+        assert stats['total_sellers'] == 1
+        assert stats['total_books'] == 3
+        assert (stats['in_stock'], stats['out_of_stock']) == (2, 1)
+        assert stats['total_orders'] == 0
+        assert top_books == []
+        assert status_counts == []
+
+
+def test_orm_writes_update_counters_incrementally(app):
+    with app.app_context():
+        buyer, books = _seed()
+        statistics.refresh()
+
+        db.session.add(Book(title="New", author="B", price=10.0, stock=0))
+        books[2].stock = 0
+        buyer.role = "seller"
+        db.session.add(Order(user_id=buyer.id, book_id=books[0].id, quantity=1, total_price=50.0))
+        db.session.commit()
+
+        values = _values()
+        assert values['books.total'] == 4
+        assert values['books.in_stock'] == 1
+        assert values['books.out_of_stock'] == 3
+        assert values['users.buyer'] == 0
+        assert values['users.seller'] == 2
+        assert values['orders.total'] == 1
+        assert values['orders.revenue'] == 50.0
+        assert values['orders.status.Placed'] == 1
+
+
+def test_checkout_moves_sold_out_books_between_buckets(app):
+    with app.app_context():
+        buyer, books = _seed()
+        statistics.refresh()
+
+        cart_items, _ = price_cart({str(books[0].id): 2})
+        CheckoutService().place_order(buyer.id, cart_items)
+
+        values = _values()
+        assert values['books.in_stock'] == 1
+        assert values['books.out_of_stock'] == 2
+        assert values['orders.total'] == 1
+        assert values['orders.revenue'] == 100.0
+
+
+def test_counters_match_full_refresh(app):
+    with app.app_context():
+        buyer, books = _seed()
+        statistics.refresh()
+        for book in books[:2]:
+            db.session.add(Order(user_id=buyer.id, book_id=book.id, total_price=50.0, status='Shipped'))
+        db.session.delete(books[2])
+        db.session.commit()
+        incremental = _values()
+
+        statistics.refresh()
+        refreshed = _values()
+
+        incremental.pop('stats.refreshed_at')
+        refreshed.pop('stats.refreshed_at')
+        assert incremental == refreshed
+
+
+def test_dashboard_reads_snapshot_in_one_query(app, client):
+    with app.app_context():
+        admin = User(username="admin", email="admin@example.com", password_hash="x", role="admin")
+        db.session.add(admin)
+        db.session.commit()
+        statistics.refresh()
+        admin_id = admin.id
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_id
+
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            response = client.get("/admin/dashboard")
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    stat_reads = [s for s in statements if "store_statistic" in s]
+    assert len(stat_reads) == 1
+    assert not any("count(" in s.lower() for s in statements)
+
+
+def test_counters_change_only_after_commit(app):
+    with app.app_context():
+        buyer, books = _seed()
+        statistics.refresh()
+
+        db.session.add(Book(title="Rolled back", author="B", price=10.0, stock=1))
+        db.session.flush()
+        assert _values()['books.total'] == 3
+        db.session.rollback()
+        assert _values()['books.total'] == 3
+
+        db.session.add(Book(title="Kept", author="B", price=10.0, stock=1))
+        db.session.commit()
+        assert _values()['books.total'] == 4
+
+
+def test_increment_creates_counters_another_worker_added(app):
+    with app.app_context():
+        _seed()
+        statistics.refresh()
+        repo = StatisticsRepository()
+        # Both workers see a new status for the first time
+        repo.increment({'orders.status.Refunded': 1})
+        repo.increment({'orders.status.Refunded': 2})
+        db.session.commit()
+        assert _values()['orders.status.Refunded'] == 3
+
+
+def test_refresh_updates_rows_in_place(app):
+    with app.app_context():
+        buyer, books = _seed()
+        db.session.add(Order(user_id=buyer.id, book_id=books[0].id, total_price=50.0, status='Shipped'))
+        db.session.commit()
+        statistics.refresh()
+        Order.query.delete()
+        db.session.commit()
+
+        statistics.refresh()
+
+        values = _values()
+        assert values['orders.status.Shipped'] == 0
+        assert values['orders.total'] == 0
+        assert values['books.total'] == 3